@@ -1,5 +1,26 @@
 __all__ = ("celery_app", "settings", "urls", "wsgi")
-try:
-    from .celery import app as celery_app
-except ImportError:
+
+from importlib.util import find_spec
+
+
+class LazyCeleryApp(object):
+    """
+        celery app, celery is imported on first attribute access
+        (celery is slow to import and not required by most processes)
+    """
+    _app = None
+
+    def _setup(self):
+        if not self._app:
+            from .celery import app
+            self._app = app
+        return self._app
+
+    def __getattr__(self, name):
+        return getattr(self._setup(), name)
+
+
+if find_spec("celery"):
+    celery_app = LazyCeleryApp()
+else:
     celery_app = None
@@ -5,8 +5,6 @@ import logging
 from datetime import timedelta
 from urllib.parse import urljoin
 
-from rdflib import RDF, XSD, Graph, Literal, URIRef
-
 from django.conf import settings
 from django.contrib import messages
 from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
@@ -26,7 +24,8 @@ from spkcspider.utils.settings import get_settings_func
 from spkcspider.utils.urls import merge_get_url
 
 from ..conf import get_anchor_domain
-from ..serializing import paginate_stream, serialize_stream
+
+# rdflib and serializing are imported in the rdf methods (slow import)
 
 logger = logging.getLogger(__name__)
 
@@ -346,6 +345,7 @@ class BaseContent(models.Model):
             )(name, data, self, context)
         ret = literalize(data, field, domain_base=context["hostpart"])
         if isinstance(ret, dict):
+            from rdflib import RDF, Literal
             base = ret["ref"]
             if ret["type"]:
                 graph.add((base, RDF["type"], ret["type"]))
@@ -361,6 +361,7 @@ class BaseContent(models.Model):
         return ret
 
     def serialize(self, graph, ref_content, context):
+        from rdflib import XSD, Literal
         # context may not be updated here
         form = self.get_form(context["scope"])(
             **self.get_form_kwargs(
@@ -425,7 +426,9 @@ class BaseContent(models.Model):
             ))
 
     def render_serialize(self, **kwargs):
+        from rdflib import XSD, Graph, Literal, URIRef
         from ..models import AssignedContent
+        from ..serializing import paginate_stream, serialize_stream
         # ** creates copy of dict, so it is safe to overwrite kwargs here
 
         session_dict = {
@@ -528,6 +531,8 @@ class BaseContent(models.Model):
             g.serialize(format="turtle"),
             content_type="text/turtle;charset=utf-8"
         )
+        # for RequestStatsMiddleware
+        ret.serialized_triples = len(g)
 
         if session_dict.get("expires", None):
             ret['X-Token-Expires'] = session_dict["expires"]
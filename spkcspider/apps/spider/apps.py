@@ -10,7 +10,8 @@ from django.db.models.signals import (
 from .signals import (
     CleanupCb, InitUserCb, TriggerUpdate, UpdateAnchorComponentCb,
     FeaturesCb, UpdateContentCb, UpdateSpiderCb, update_dynamic,
-    DeleteFilesCb
+    DeleteFilesCb, InvalidateViewModelCb, InvalidatePublicIndexCb,
+    MarkPublicComponentCb
 )
 
 
@@ -23,7 +24,8 @@ class SpiderBaseConfig(AppConfig):
 
     def ready(self):
         from .models import (
-            AssignedContent, UserComponent, AttachedFile
+            AssignedContent, UserComponent, AttachedFile, AttachedTimespan,
+            UserInfo
         )
 
         #######################
@@ -62,6 +64,54 @@ class SpiderBaseConfig(AppConfig):
             FeaturesCb, sender=AssignedContent.features.through,
         )
 
+        # invalidate cached component view-models
+        post_save.connect(
+            InvalidateViewModelCb, sender=AssignedContent
+        )
+        post_delete.connect(
+            InvalidateViewModelCb, sender=AssignedContent
+        )
+        m2m_changed.connect(
+            InvalidateViewModelCb, sender=UserComponent.features.through
+        )
+        m2m_changed.connect(
+            InvalidateViewModelCb, sender=UserInfo.allowed_content.through
+        )
+        m2m_changed.connect(
+            InvalidateViewModelCb,
+            sender=AssignedContent.protect_contents.through
+        )
+
+        # invalidate cached public index
+        pre_save.connect(
+            MarkPublicComponentCb, sender=UserComponent
+        )
+        post_save.connect(
+            InvalidatePublicIndexCb, sender=UserComponent
+        )
+        post_delete.connect(
+            InvalidatePublicIndexCb, sender=UserComponent
+        )
+        m2m_changed.connect(
+            InvalidatePublicIndexCb, sender=UserComponent.features.through
+        )
+        post_save.connect(
+            InvalidatePublicIndexCb, sender=AssignedContent
+        )
+        post_delete.connect(
+            InvalidatePublicIndexCb, sender=AssignedContent
+        )
+        m2m_changed.connect(
+            InvalidatePublicIndexCb,
+            sender=AssignedContent.protect_components.through
+        )
+        post_save.connect(
+            InvalidatePublicIndexCb, sender=AttachedTimespan
+        )
+        post_delete.connect(
+            InvalidatePublicIndexCb, sender=AttachedTimespan
+        )
+
         post_delete.connect(
             DeleteFilesCb, sender=AttachedFile
         )
@@ -74,3 +124,11 @@ class SpiderBaseConfig(AppConfig):
         post_delete.connect(
             CleanupCb, sender=AssignedContent,
         )
+
+        if getattr(settings, "SPIDER_REGISTRY_WARMUP", False):
+            # build registries now instead of on the first request
+            from .registry import warmup
+            warmup(
+                getattr(settings, "SPIDER_REGISTRY_MANIFEST", None),
+                defer_urls=True
+            )
@@ -0,0 +1,421 @@
+"""
+Benchmarks of hot paths (serialization, search filters, auth, content saving,
+verification) against a synthetic dataset (see dataset)
+results are json serializable and can be compared with compare_results
+"""
+
+__all__ = (
+    "BenchmarkSuite", "StandInServer", "compare_results", "measure",
+    "percentile"
+)
+
+import gc
+import math
+import platform
+import threading
+import time
+import tracemalloc
+from contextlib import ExitStack
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from importlib import import_module
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.test import Client, RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .dataset import DatasetGenerator
+from .middleware import QueryCounter
+
+# compared metrics: (metric, key), sql counts are compared exactly
+_compared_metrics = (
+    ("time_ms", "p50"), ("time_ms", "p90"), ("peak_memory_kib", None),
+    ("queries", "max")
+)
+
+# plain, negated, strict and info search terms
+_mixed_search = [
+    "lorem", "!ipsum", "_public", "!_home", "\x1etype=Text\x1e", "_unlisted",
+    "Street"
+]
+
+
+def percentile(values, percent):
+    """ nearest-rank percentile of sorted values """
+    if not values:
+        return None
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+def measure(func, repeat=10, setup=None, memory=True, warmup=1):
+    """
+        run func repeat times (after warmup runs), result of setup is
+        argument (not measured)
+        returns timing (ms), sql count percentiles and peak memory (KiB)
+        of an extra run with tracemalloc
+    """
+    timings = []
+    queries = []
+    sql_times = []
+    for _i in range(warmup):
+        func(setup()) if setup else func()
+    for _i in range(max(1, repeat)):
+        arg = setup() if setup else None
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            start = time.perf_counter()
+            func(arg) if setup else func()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(counter.queries)
+        sql_times.append(counter.sql_time * 1000)
+    peak = None
+    # cannot measure if traced from outside
+    if memory and not tracemalloc.is_tracing():
+        arg = setup() if setup else None
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func(arg) if setup else func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    timings.sort()
+    queries.sort()
+    sql_times.sort()
+    return {
+        "repeat": len(timings),
+        "time_ms": {
+            "min": round(timings[0], 3),
+            "p50": round(percentile(timings, 50), 3),
+            "p90": round(percentile(timings, 90), 3),
+            "p99": round(percentile(timings, 99), 3),
+            "max": round(timings[-1], 3),
+            "mean": round(sum(timings) / len(timings), 3)
+        },
+        "queries": {
+            "min": queries[0],
+            "p50": percentile(queries, 50),
+            "max": queries[-1]
+        },
+        "sql_ms": {
+            "p50": round(percentile(sql_times, 50), 3),
+            "p90": round(percentile(sql_times, 90), 3)
+        },
+        "peak_memory_kib": None if peak is None else round(peak / 1024, 1)
+    }
+
+
+def compare_results(results, baseline, threshold=0.2, min_time=1.0):
+    """
+        returns regressions as list of (benchmark, metric, baseline, current)
+        timings and memory regress if they grow more than threshold
+        (relative), timings below min_time (ms) are ignored,
+        sql counts regress if they grow at all
+        benchmarks missing in one of the results are skipped
+    """
+    if results.get("dataset") != baseline.get("dataset"):
+        raise ValueError("results are based on different datasets")
+    regressions = []
+    for name, current in sorted(results["benchmarks"].items()):
+        old = baseline["benchmarks"].get(name)
+        if not old:
+            continue
+        for metric, key in _compared_metrics:
+            old_val = old.get(metric)
+            new_val = current.get(metric)
+            if key:
+                old_val = old_val and old_val.get(key)
+                new_val = new_val and new_val.get(key)
+            if old_val is None or new_val is None:
+                continue
+            label = "%s.%s" % (metric, key) if key else metric
+            if metric == "queries":
+                regressed = new_val > old_val
+            elif metric == "time_ms" and new_val < min_time:
+                regressed = False
+            else:
+                regressed = new_val > old_val * (1 + threshold)
+            if regressed:
+                regressions.append((name, label, old_val, new_val))
+    return regressions
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        response = self.server.client.get(self.path)
+        if response.streaming:
+            body = b"".join(response.streaming_content)
+        else:
+            body = response.content
+        self.send_response(response.status_code)
+        for key, value in response.items():
+            if key.lower() != "content-length":
+                self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServer(HTTPServer):
+    """
+        local http server answering with the spider views
+        (like tests/referrerserver.py), requests are handled in-process by
+        the test client, in-memory sqlite databases are shared with the thread
+    """
+    client = None
+    runthread = None
+
+    def __init__(self, addrtup=("127.0.0.1", 0)):
+        super().__init__(addrtup, StandInHandler)
+        host = "%s:%s" % self.server_address[:2]
+        self.hostpart = "http://%s" % host
+        self.client = Client(HTTP_HOST=host)
+        self.shared_connections = {
+            conn.alias: conn for conn in connections.all()
+            if conn.vendor == "sqlite" and conn.is_in_memory_db()
+        }
+        self.runthread = threading.Thread(target=self.run)
+        self.runthread.daemon = True
+
+    def run(self):
+        for alias, conn in self.shared_connections.items():
+            connections[alias] = conn
+        try:
+            self.serve_forever()
+        finally:
+            connections.close_all()
+
+    def start(self):
+        for conn in self.shared_connections.values():
+            conn.inc_thread_sharing()
+        self.runthread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self.runthread.join()
+        for conn in self.shared_connections.values():
+            conn.dec_thread_sharing()
+
+
+class BenchmarkSuite(object):
+    """
+        Benchmarks run against the first user of a synthetic dataset,
+        benchmark "<group>.<kind>" is executed by bench_<group>(kind)
+    """
+    save_types = ("Text", "File", "PublicKey", "SpiderTag", "Link")
+
+    def __init__(
+        self, *, users=5, contents=20, seed=0, repeat=10, memory=True,
+        prefix="bench"
+    ):
+        self.users = users
+        self.contents = contents
+        self.seed = seed
+        self.repeat = repeat
+        self.memory = memory
+        self.prefix = prefix
+        self.user = None
+        self.components = {}
+
+    def setup(self):
+        """
+            generate dataset (if not existing),
+            raises ValueError if not possible
+        """
+        user_model = get_user_model()
+        self.user = user_model.objects.filter(**{
+            user_model.USERNAME_FIELD: "%s%s_0" % (self.prefix, self.seed)
+        }).first()
+        if not self.user:
+            DatasetGenerator(
+                seed=self.seed, contents=self.contents, prefix=self.prefix
+            ).generate(self.users)
+            self.user = user_model.objects.get(**{
+                user_model.USERNAME_FIELD: "%s%s_0" % (self.prefix, self.seed)
+            })
+        self.components = {
+            uc.name: uc for uc in self.user.usercomponent_set.all()
+        }
+
+    def available(self):
+        from .models import ContentVariant
+        names = [
+            "serialize.raw", "serialize.embed", "serialize.export",
+            "filter.contents", "filter.components",
+            "auth.test_token", "auth.component", "auth.index"
+        ]
+        installed = set(ContentVariant.objects.filter(
+            name__in=self.save_types
+        ).values_list("name", flat=True))
+        names.extend(
+            "save.%s" % name for name in self.save_types
+            if name in installed
+        )
+        if apps.is_installed("spkcspider.apps.verifier"):
+            names.append("verify.validate")
+        return names
+
+    def run(self, names=None, callback=None):
+        """
+            names: benchmarks or groups, default all
+            callback is called with name and result of every benchmark
+        """
+        results = {}
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver", "127.0.0.1"]
+        ):
+            for name in self.available():
+                if names and not any(
+                    name == i or name.startswith("%s." % i) for i in names
+                ):
+                    continue
+                group, kind = name.split(".", 1)
+                results[name] = getattr(self, "bench_%s" % group)(kind)
+                if callback:
+                    callback(name, results[name])
+        return {
+            "created": timezone.now().isoformat(),
+            "dataset": {
+                "users": self.users,
+                "contents": self.contents,
+                "seed": self.seed,
+                "repeat": self.repeat
+            },
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connections["default"].vendor
+            },
+            "benchmarks": results
+        }
+
+    def measure(self, func, setup=None):
+        return measure(
+            func, repeat=self.repeat, setup=setup, memory=self.memory
+        )
+
+    def _request(self, **params):
+        request = RequestFactory().get("/", params)
+        request.user = AnonymousUser()
+        request.session = import_module(
+            settings.SESSION_ENGINE
+        ).SessionStore()
+        return request
+
+    def bench_serialize(self, kind):
+        """ serialize_stream via the views (request is part of context) """
+        client = Client()
+        client.force_login(self.user)
+        params = {}
+        if kind == "export":
+            url = reverse("spider_base:ucomponent-export")
+        else:
+            url = self.components["home"].get_absolute_url()
+            params["raw"] = "embed" if kind == "embed" else "true"
+
+        def _func():
+            response = client.get(url, params)
+            if response.status_code != 200:
+                raise ValueError(
+                    "%s: status %s" % (url, response.status_code)
+                )
+        return self.measure(_func)
+
+    def bench_filter(self, kind):
+        from .models import AssignedContent, UserComponent
+        from .queryfilters import filter_components, filter_contents
+        per_page = settings.SPIDER_OBJECTS_PER_PAGE
+        if kind == "contents":
+            def _func():
+                filter_q, _counter = filter_contents(
+                    _mixed_search, use_components=True
+                )
+                return list(AssignedContent.objects.filter(
+                    filter_q, usercomponent__public=True
+                ).order_by("id")[:per_page])
+        else:
+            def _func():
+                filter_q, _counter = filter_components(_mixed_search)
+                return list(UserComponent.objects.filter(
+                    filter_q, public=True
+                ).distinct().order_by("id")[:per_page])
+        return self.measure(_func)
+
+    def bench_auth(self, kind):
+        from spkcspider.constants import ProtectionType
+        from .models import AuthToken
+        from .views import UserTestMixin
+        if kind == "test_token":
+            token = AuthToken.objects.filter(
+                usercomponent__user=self.user, persist=-1
+            ).exclude(usercomponent__name="index").order_by("id").first()
+
+            def _setup():
+                view = UserTestMixin()
+                view.request = self._request(token=token.token)
+                view.usercomponent = token.usercomponent
+                view.scope = "view"
+                return view
+
+            def _func(view):
+                if view.test_token() is not True:
+                    raise ValueError("token not accepted")
+            return self.measure(_func, _setup)
+        elif kind == "index":
+            uc = self.components["index"]
+            ptype = ProtectionType.authentication
+            scope = "auth"
+        else:
+            uc = self.components["public"]
+            ptype = ProtectionType.access_control
+            scope = "view"
+        return self.measure(
+            lambda request: uc.auth(
+                request=request, scope=scope, ptype=ptype
+            ),
+            self._request
+        )
+
+    def bench_save(self, variant):
+        """ BaseContent.save of cleaned new contents """
+        from .models import AssignedContent
+        generator = DatasetGenerator(seed=self.seed, types=[variant])
+        generator.assign_ids = False
+        uc = self.components["home"]
+        targets = list(AssignedContent.objects.filter(
+            usercomponent__user=self.user
+        ).exclude(
+            ctype__name__in=["Link", "TravelProtection"]
+        ).order_by("id")[:20])
+
+        def _setup():
+            ac, content = generator.build_content(uc, variant, targets)
+            content.clean()
+            return content
+        return self.measure(lambda content: content.save(), _setup)
+
+    def bench_verify(self, kind):
+        """ validate public component, served by StandInServer """
+        from spkcspider.apps.verifier.validate import validate
+        server = StandInServer()
+        server.start()
+        url = "{}{}?raw=embed".format(
+            server.hostpart, self.components["public"].get_absolute_url()
+        )
+        try:
+            # DEBUG: allow http urls
+            with override_settings(DEBUG=True):
+                return self.measure(lambda: validate(url, server.hostpart))
+        finally:
+            server.stop()
@@ -106,14 +106,19 @@ def get_requests_params(url):
         )
     _url = _url.groupdict()
     mapper = settings.SPIDER_REQUEST_KWARGS_MAP
-    return (
+    params = mapper.get(
+        _url["host"],
         mapper.get(
-            _url["host"],
-            mapper.get(
-                _url["tld"],  # maybe None but then fall to retrieval 3
-                mapper[b"default"]
-            )
-        ),
+            _url["tld"],  # maybe None but then fall to retrieval 3
+            mapper[b"default"]
+        )
+    )
+    return (
+        # strip verifier only parameters
+        {
+            key: val for key, val in params.items()
+            if key != "max_concurrency"
+        },
         get_settings_func(
             "SPIDER_INLINE",
             "spkcspider.apps.spider.functions.clean_spider_inline",
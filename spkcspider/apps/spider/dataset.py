@@ -0,0 +1,512 @@
+"""
+Synthetic datasets for load tests and benchmarks
+all data is derived from the seed (except timestamps), ids are allocated in
+advance for bulk inserts
+"""
+
+__all__ = ("DatasetGenerator", "content_types")
+
+import base64
+import posixpath
+import random
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.utils import timezone
+from spkcspider.constants import ProtectionStateType, TravelProtectionType
+from spkcspider.utils.security import get_hashob
+
+from .conf import FILE_TOKEN_SIZE, INITIAL_STATIC_TOKEN_SIZE, TOKEN_SIZE
+
+# supported content variants
+content_types = (
+    "Text", "File", "PublicKey", "SpiderTag", "Link", "TravelProtection"
+)
+
+_words = (
+    "lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing",
+    "elit", "sed", "do", "eiusmod", "tempor", "incididunt", "ut", "labore",
+    "et", "dolore", "magna", "aliqua", "enim", "ad", "minim", "veniam",
+    "quis", "nostrud", "exercitation", "ullamco", "laboris", "nisi",
+    "aliquip", "ex", "ea", "commodo", "consequat", "spider", "component"
+)
+
+_cities = (
+    ("Berlin", "DE"), ("Paris", "FR"), ("Wien", "AT"), ("Boston", "US"),
+    ("Madrid", "ES"), ("Roma", "IT"), ("Oslo", "NO"), ("Tokyo", "JP")
+)
+
+
+class DatasetGenerator(object):
+    """
+        Generates users with their default components
+        (SPIDER_DEFAULT_COMPONENTS), contents, references, travel protections
+        (with timespans), tokens and referrers with bulk inserts.
+        Users are processed in chunks, every chunk is one transaction.
+    """
+    # objects inserted by bulk_create (after users), in dependency order
+    insert_order = (
+        "spider_base.UserInfo",
+        "spider_base.UserComponent",
+        "spider_base.AssignedProtection",
+        "spider_base.AssignedContent",
+        "spider_base.DataContent",
+        "spider_tags.SpiderTag",
+        "spider_tags.TagFieldIndex",
+        "spider_keys.KeyFingerprint",
+        "spider_base.AttachedBlob",
+        "spider_base.AttachedFile",
+        "spider_base.AttachedTimespan",
+        "spider_base.AuthToken",
+        "spider_base.M2MTravelProtContent",
+        "spider_base.M2MTravelProtComponent",
+    )
+
+    def __init__(
+        self, *, seed=0, contents=10, types=content_types, tokens=2,
+        referrers=10, travel=1, prefix="synth", password="abc",
+        batch_size=1000
+    ):
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.contents = contents
+        self.tokens = tokens
+        self.referrers = referrers
+        self.travel = travel
+        self.prefix = prefix
+        self.batch_size = batch_size
+        # False: objects are built for the regular save path
+        self.assign_ids = True
+        self.now = timezone.now()
+        self.user_model = get_user_model()
+        self.insert_order = [self.user_model]
+        for name in type(self).insert_order:
+            try:
+                self.insert_order.append(apps.get_model(name))
+            except LookupError:
+                # optional app not installed
+                pass
+        self.counts = {}
+        self._ids = {}
+        self._pending = {}
+        self._m2m = {}
+        # hash once, speeds up creation
+        self.password = make_password(password)
+
+        ContentVariant = apps.get_model("spider_base", "ContentVariant")
+        UserInfo = apps.get_model("spider_base", "UserInfo")
+        self.variants = {
+            v.name: v for v in ContentVariant.objects.filter(
+                name__in=[
+                    *content_types, "DefaultActions", "DomainMode",
+                    "Persistence"
+                ]
+            )
+        }
+        if "DefaultActions" not in self.variants:
+            raise ValueError(
+                "content variants missing, run update_dynamic_content"
+            )
+        self.types = [
+            t for t in types if t in self.variants and t != "TravelProtection"
+        ]
+        if "TravelProtection" not in types or \
+                "TravelProtection" not in self.variants:
+            self.travel = 0
+        if not self.types:
+            raise ValueError("no (installed) content types selected")
+        self.allowable = list(UserInfo.get_allowable_content())
+        self.layout = None
+        if "SpiderTag" in self.types:
+            self.layout = apps.get_model(
+                "spider_tags", "TagLayout"
+            ).objects.get(name="address", usertag=None)
+        Protection = apps.get_model("spider_base", "Protection")
+        self.index_protections = list(Protection.objects.filter(
+            code__in=(
+                ["login", "captcha"]
+                if getattr(settings, "USE_CAPTCHAS", False) else
+                ["login"]
+            )
+        ))
+
+    def _b64(self, size):
+        return base64.urlsafe_b64encode(
+            self.rng.getrandbits(size * 8).to_bytes(size, "big")
+        ).decode('ascii').rstrip("=")
+
+    def _token(self, id, size):
+        # like create_b64_id_token but deterministic
+        return "_".join((hex(id)[2:], self._b64(size)))
+
+    def _text(self, minwords, maxwords):
+        return " ".join(
+            self.rng.choice(_words)
+            for _i in range(self.rng.randint(minwords, maxwords))
+        )
+
+    def _next_id(self, model):
+        if not self.assign_ids:
+            return None
+        model = model._meta.concrete_model
+        if model not in self._ids:
+            self._ids[model] = (
+                model.objects.aggregate(m=models.Max("id"))["m"] or 0
+            ) + 1
+        ret = self._ids[model]
+        self._ids[model] += 1
+        return ret
+
+    def _add(self, ob):
+        self._pending.setdefault(ob._meta.concrete_model, []).append(ob)
+        return ob
+
+    def _add_m2m(self, field, **kwargs):
+        through = field.through
+        self._m2m.setdefault(through, []).append(through(**kwargs))
+
+    def flush(self):
+        for model in self.insert_order:
+            obs = self._pending.pop(model, None)
+            if obs:
+                model._base_manager.bulk_create(
+                    obs, batch_size=self.batch_size
+                )
+                self.counts[model._meta.label] = \
+                    self.counts.get(model._meta.label, 0) + len(obs)
+        for through, obs in self._m2m.items():
+            through.objects.bulk_create(obs, batch_size=self.batch_size)
+            self.counts[through._meta.label] = \
+                self.counts.get(through._meta.label, 0) + len(obs)
+        self._m2m = {}
+
+    def reset_sequences(self):
+        # ids were set explicitly
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), list(self._ids.keys())
+        )
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def create_referrers(self):
+        ReferrerObject = apps.get_model("spider_base", "ReferrerObject")
+        urls = [
+            "https://referrer%s.example.com/%s" % (i, self._b64(6))
+            for i in range(self.referrers)
+        ]
+        ReferrerObject.objects.bulk_create(
+            [ReferrerObject(url=url) for url in urls], ignore_conflicts=True
+        )
+        self.referrer_objects = list(
+            ReferrerObject.objects.filter(url__in=urls).order_by("url")
+        )
+
+    def generate(self, users, chunk_size=None, callback=None):
+        """ callback is called after every chunk with amount of users """
+        if chunk_size is None:
+            # roughly batch_size contents per chunk
+            chunk_size = max(
+                1, self.batch_size // max(1, self.contents * 2)
+            )
+        self.create_referrers()
+        start = 0
+        while start < users:
+            amount = min(chunk_size, users - start)
+            with transaction.atomic():
+                for i in range(start, start + amount):
+                    self.create_user(i)
+                self.flush()
+                self.reset_sequences()
+            start += amount
+            if callback:
+                callback(start)
+        return self.counts
+
+    def create_user(self, number):
+        UserInfo = apps.get_model("spider_base", "UserInfo")
+        UserComponent = apps.get_model("spider_base", "UserComponent")
+        AssignedProtection = \
+            apps.get_model("spider_base", "AssignedProtection")
+        user = self._add(self.user_model(
+            id=self._next_id(self.user_model),
+            password=self.password, is_active=True,
+            **{
+                self.user_model.USERNAME_FIELD:
+                    "%s%s_%s" % (self.prefix, self.seed, number)
+            }
+        ))
+        info = self._add(UserInfo(id=self._next_id(UserInfo), user=user))
+        for variant in info.get_allowed_content(self.allowable):
+            self._add_m2m(
+                UserInfo.allowed_content, userinfo_id=info.id,
+                contentvariant_id=variant.id
+            )
+        # same order as InitUserCb
+        components = {
+            "index": {"public": False}, **getattr(
+                settings, "SPIDER_DEFAULT_COMPONENTS", {}
+            )
+        }
+        self.user_components = []
+        self.user_contents = []
+        index = None
+        for name, value in components.items():
+            kwargs = UserComponent.objects._update_args(
+                {"public": value.get("public", False)}, {"name": name}
+            )
+            uc = self._add(UserComponent(
+                id=self._next_id(UserComponent), name=name, user=user,
+                **kwargs
+            ))
+            uc.token = self._token(uc.id, int(INITIAL_STATIC_TOKEN_SIZE))
+            features = {"DefaultActions", *value.get("features", ())}
+            for f in features:
+                if f in self.variants:
+                    self._add_m2m(
+                        UserComponent.features, usercomponent_id=uc.id,
+                        contentvariant_id=self.variants[f].id
+                    )
+            if name == "index":
+                index = uc
+                for protection in self.index_protections:
+                    self._add(AssignedProtection(
+                        id=self._next_id(AssignedProtection),
+                        protection=protection, usercomponent=uc,
+                        state=ProtectionStateType.enabled
+                    ))
+            else:
+                self.user_components.append(uc)
+                for _i in range(self.contents):
+                    self.create_content(uc, self.rng.choice(self.types))
+                for _i in range(self.tokens):
+                    self.create_token(uc)
+        for _i in range(self.travel):
+            self.create_travelprotection(index)
+        info.used_space_local = sum(
+            size for ac, content, size in self.user_contents
+        )
+
+    def _create_base(self, uc, variant, content_class, **kwargs):
+        AssignedContent = apps.get_model("spider_base", "AssignedContent")
+        ac = self._add(AssignedContent(
+            id=self._next_id(AssignedContent), usercomponent=uc,
+            ctype=self.variants[variant]
+        ))
+        content = content_class(
+            id=self._next_id(content_class), associated=ac, **kwargs
+        )
+        # abuse cached_property mechanic
+        ac.__dict__["content"] = content
+        if self.assign_ids:
+            ac.token = self._token(
+                ac.id, 60 if variant == "TravelProtection" else
+                int(INITIAL_STATIC_TOKEN_SIZE)
+            )
+            self._add_m2m(
+                AssignedContent.features, assignedcontent_id=ac.id,
+                contentvariant_id=self.variants["DefaultActions"].id
+            )
+        return ac, content
+
+    def _blob(self, ac, name, data):
+        AttachedBlob = apps.get_model("spider_base", "AttachedBlob")
+        blob = AttachedBlob(
+            id=self._next_id(AttachedBlob), content=ac, name=name,
+            unique=True, blob=data
+        )
+        blob.compress()
+        return blob
+
+    def create_content(self, uc, variant):
+        targets = [
+            x[0] for x in self.user_contents
+            if x[0].ctype.name not in {"Link", "TravelProtection"}
+        ]
+        ac, content = self.build_content(uc, variant, targets)
+        self._finish_content(ac, content)
+
+    def build_content(self, uc, variant, targets=()):
+        """
+            content with prepared attachements, targets: contents which
+            can be linked/referenced
+            with assign_ids = False the content is built for clean/save
+            (no ids, tokens and many to many relations)
+        """
+        if variant == "Link" and not targets:
+            variant = "Text"
+        content_class = self.variants[variant].installed_class
+        kwargs = {}
+        if variant == "SpiderTag":
+            city, country = self.rng.choice(_cities)
+            kwargs["layout"] = self.layout
+            kwargs["tagdata"] = {
+                "name": self._text(2, 3).title(),
+                "place": "%s %s" % (self._text(1, 2).title(), "Street"),
+                "street_number": str(self.rng.randint(1, 200)),
+                "city": city,
+                "post_code": str(self.rng.randint(10000, 99999)),
+                "country_code": country
+            }
+        ac, content = self._create_base(uc, variant, content_class, **kwargs)
+        prepared = {}
+        if variant == "Text":
+            ac.name = self._text(1, 4)
+            prepared["attachedblobs"] = [self._blob(
+                ac, "text",
+                "<p>{}</p>".format(self._text(20, 400)).encode("utf8")
+            )]
+        elif variant == "File":
+            ac.name = "%s.txt" % self._text(1, 2).replace(" ", "_")
+            data = self._text(20, 200).encode("utf8")
+            path = posixpath.join(
+                getattr(settings, "SPIDER_FILE_DIR", "spider_files"),
+                str(uc.user.id), self._b64(FILE_TOKEN_SIZE), ac.name
+            )
+            AttachedFile = apps.get_model("spider_base", "AttachedFile")
+            f = AttachedFile(
+                id=self._next_id(AttachedFile), content=ac, name="file",
+                unique=True
+            )
+            f.file.name = default_storage.save(path, ContentFile(data))
+            prepared["attachedfiles"] = [f]
+        elif variant == "PublicKey":
+            from cryptography.hazmat.primitives import serialization
+            from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+                Ed25519PrivateKey
+            )
+            # deterministic key from seed
+            key = Ed25519PrivateKey.from_private_bytes(
+                self.rng.getrandbits(256).to_bytes(32, "big")
+            ).public_key().public_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PublicFormat.SubjectPublicKeyInfo
+            )
+            ac.description = self._text(0, 5)
+            prepared["attachedblobs"] = [self._blob(ac, "key", key)]
+        elif variant == "Link":
+            ac.attached_to_content = self.rng.choice(targets)
+        content.prepared_attachements = prepared
+        if self.assign_ids:
+            self._add_relations(ac, variant, targets)
+        return ac, content
+
+    def _add_relations(self, ac, variant, targets):
+        AssignedContent = apps.get_model("spider_base", "AssignedContent")
+        if variant == "Link":
+            self._add_m2m(
+                AssignedContent.references, from_assignedcontent_id=ac.id,
+                to_assignedcontent_id=ac.attached_to_content.id
+            )
+        elif variant == "SpiderTag":
+            self._add_m2m(
+                AssignedContent.features, assignedcontent_id=ac.id,
+                contentvariant_id=self.variants["DomainMode"].id
+            )
+            for ob in ac.content.build_field_index():
+                self._add(ob)
+        elif variant == "Text" and targets:
+            # references, e.g. embedded contents
+            for target in self.rng.sample(
+                targets, min(len(targets), self.rng.randint(0, 2))
+            ):
+                self._add_m2m(
+                    AssignedContent.references,
+                    from_assignedcontent_id=ac.id,
+                    to_assignedcontent_id=target.id
+                )
+
+    def _finish_content(self, ac, content):
+        # prepared_attachements are kept, links use them for get_info
+        content.update_associated()
+        if ac.ctype.name == "PublicKey":
+            # needs info
+            fingerprint = content.build_fingerprint()
+            if fingerprint:
+                self._add(fingerprint)
+        size = content.get_size(content.prepared_attachements)
+        for val in content.prepared_attachements.values():
+            for ob in val:
+                self._add(ob)
+        self._add(content)
+        self.user_contents.append((ac, content, size))
+
+    def create_travelprotection(self, index):
+        AttachedTimespan = apps.get_model("spider_base", "AttachedTimespan")
+        M2MTravelProtContent = \
+            apps.get_model("spider_base", "M2MTravelProtContent")
+        M2MTravelProtComponent = \
+            apps.get_model("spider_base", "M2MTravelProtComponent")
+        ac, content = self._create_base(
+            index, "TravelProtection",
+            self.variants["TravelProtection"].installed_class,
+            free_data={"is_travel_protected": False}
+        )
+        # past, active, future
+        state = self.rng.randint(0, 2)
+        duration = timedelta(hours=self.rng.randint(1, 240))
+        if state == 0:
+            start, stop = self.now - 2 * duration, self.now - duration
+        elif state == 1:
+            start, stop = self.now - duration, self.now + duration
+        else:
+            start, stop = self.now + duration, self.now + 2 * duration
+        self._add(AttachedTimespan(
+            id=self._next_id(AttachedTimespan), content=ac, unique=False,
+            name="active", start=start, stop=stop
+        ))
+        content._prepared_info = \
+            "active\x1etravel_protection_type={}\x1e".format(
+                TravelProtectionType.hide
+            )
+        if self.rng.random() < 0.5:
+            # only active if password was entered (random, unknown)
+            h = get_hashob()
+            h.update(self._b64(16).encode("ascii"))
+            content._prepared_info = "{}pwhash={}\x1e".format(
+                content._prepared_info, h.finalize().hex()
+            )
+        content.prepared_attachements = {}
+        self._finish_content(ac, content)
+        content._prepared_info = None
+        protected = [ac] + [
+            x[0] for x in self.rng.sample(
+                self.user_contents[:-1],
+                min(len(self.user_contents) - 1, self.rng.randint(0, 3))
+            ) if x[0].ctype.name != "TravelProtection"
+        ]
+        for target in protected:
+            self._add(M2MTravelProtContent(
+                id=self._next_id(M2MTravelProtContent), source=ac,
+                target=target
+            ))
+        if self.user_components and self.rng.random() < 0.3:
+            self._add(M2MTravelProtComponent(
+                id=self._next_id(M2MTravelProtComponent), source=ac,
+                target=self.rng.choice(self.user_components)
+            ))
+
+    def create_token(self, uc):
+        AuthToken = apps.get_model("spider_base", "AuthToken")
+        token = AuthToken(
+            id=self._next_id(AuthToken), usercomponent=uc, extra={
+                "strength": uc.strength, "prot_strength": 0, "taint": False
+            }
+        )
+        token.token = self._token(token.id, TOKEN_SIZE)
+        if self.referrer_objects and self.rng.random() < 0.5:
+            token.referrer = self.rng.choice(self.referrer_objects)
+            token.extra["intentions"] = [
+                self.rng.choice(["auth", "sl", "persist"])
+            ]
+            if token.extra["intentions"] == ["persist"]:
+                token.persist = 0
+        self._add(token)
@@ -0,0 +1,183 @@
+"""
+Delivery of tokens to referrers
+with SPIDER_REFERRER_DELIVERY = "queue" posts are queued and sent by a worker
+(celery or manage.py deliver_referrers)
+"""
+
+__all__ = (
+    "post_to_referrer", "queue_delivery", "deliver", "process_deliveries"
+)
+
+import logging
+from datetime import timedelta
+
+import requests
+
+from django.conf import settings
+from django.db import transaction
+from django.test import Client
+from django.utils import timezone
+from spkcspider import celery_app
+from spkcspider.utils.circuit import CircuitBreaker, is_host_failure
+from spkcspider.utils.http import get_session
+from spkcspider.utils.security import get_hashob
+
+from .conf import get_requests_params
+
+logger = logging.getLogger(__name__)
+
+
+def post_to_referrer(url, data, referer):
+    """
+        post data to referrer
+        returns None on success or (error, retryable)
+    """
+    params, inline_domain = get_requests_params(url)
+    if inline_domain:
+        response = Client().post(
+            url,
+            data=data,
+            Connection="close",
+            Referer=referer,
+            SERVER_NAME=inline_domain
+        )
+        if response.status_code != 200:
+            return ("other", False)
+        return None
+    circuit = CircuitBreaker(url)
+    if not circuit.allow():
+        # fail fast, host was unreachable recently
+        return ("unreachable", True)
+    try:
+        with get_session(params).post(
+            url,
+            data=data,
+            headers={
+                "Referer": referer
+            },
+            **params
+        ) as resp:
+            resp.raise_for_status()
+    except requests.exceptions.SSLError as exc:
+        logger.info(
+            "referrer: \"%s\" has a broken ssl configuration",
+            url, exc_info=exc
+        )
+        return ("ssl", False)
+    except (Exception, requests.exceptions.HTTPError) as exc:
+        logger.info(
+            "post failed: \"%s\" failed",
+            url, exc_info=exc
+        )
+        if is_host_failure(exc):
+            circuit.record_failure()
+            return ("other", True)
+        return ("other", False)
+    circuit.record_success()
+    return None
+
+
+def _get_backoff(attempts):
+    return getattr(
+        settings, "SPIDER_REFERRER_DELIVERY_BACKOFF", 10
+    ) * 2 ** max(attempts - 1, 0)
+
+
+def _schedule(countdown=None):
+    if celery_app:
+        from .tasks import async_deliver
+        async_deliver.apply_async(countdown=countdown)
+
+
+def _hash_token(value):
+    h = get_hashob()
+    h.update(value.encode("utf-8", "ignore"))
+    return h.finalize().hex()
+
+
+def queue_delivery(token, url, data, referer, delete_token=True):
+    """
+        queue post of data (without token) to url,
+        token is deleted if delivery finally fails and delete_token is set
+    """
+    from .models import ReferrerDelivery
+    ob = ReferrerDelivery.objects.create(
+        token=token,
+        # pins the token value, a renewed token isn't sent
+        hash=_hash_token(token.token),
+        url=url,
+        data=data,
+        referer=referer,
+        delete_token=delete_token,
+        next_attempt=timezone.now()
+    )
+    transaction.on_commit(_schedule)
+    return ob
+
+
+def deliver(ob):
+    """ try to deliver ReferrerDelivery, updates state """
+    token = ob.token
+    ob.attempts += 1
+    if not token or not token.token:
+        ob.state = "failed"
+        ob.error = "other"
+        ob.save(update_fields=["state", "error", "attempts", "modified"])
+        return False
+    token_hash = _hash_token(token.token)
+    # token was renewed since queueing (older rows have no hash)
+    if ob.hash and ob.hash != token_hash:
+        ob.state = "superseded"
+        ob.error = "superseded"
+        ob.save(update_fields=["state", "error", "attempts", "modified"])
+        return False
+    data = dict(ob.data)
+    data["token"] = token.token
+    error = post_to_referrer(ob.url, data, ob.referer)
+    if not error:
+        ob.hash = token_hash
+        ob.state = "delivered"
+        ob.error = ""
+    elif error[1] and ob.attempts < getattr(
+        settings, "SPIDER_REFERRER_DELIVERY_RETRIES", 5
+    ):
+        countdown = _get_backoff(ob.attempts)
+        ob.error = error[0]
+        ob.next_attempt = timezone.now() + timedelta(seconds=countdown)
+        transaction.on_commit(lambda: _schedule(countdown))
+    else:
+        ob.state = "failed"
+        ob.error = error[0]
+    ob.save(update_fields=[
+        "state", "error", "hash", "attempts", "next_attempt", "modified"
+    ])
+    if ob.state == "failed" and ob.delete_token:
+        token.delete()
+    return ob.state == "delivered"
+
+
+def process_deliveries(limit=None):
+    """ deliver due posts, returns amount of processed deliveries """
+    from .models import ReferrerDelivery
+    now = timezone.now()
+    expires = getattr(settings, "SPIDER_REFERRER_DELIVERY_EXPIRES", 86400)
+    ReferrerDelivery.objects.exclude(state="pending").filter(
+        modified__lt=now-timedelta(seconds=expires)
+    ).delete()
+    q = ReferrerDelivery.objects.filter(
+        state="pending", next_attempt__lte=now
+    ).order_by("next_attempt").select_related("token")
+    if limit:
+        q = q[:limit]
+    count = 0
+    # lease time, other workers skip claimed deliveries
+    lease = now + timedelta(minutes=5)
+    for ob in q:
+        if not ReferrerDelivery.objects.filter(
+            id=ob.id, state="pending", next_attempt=ob.next_attempt
+        ).update(next_attempt=lease):
+            continue
+        ob.next_attempt = lease
+        deliver(ob)
+        count += 1
+    return count
@@ -7,7 +7,6 @@ from base64 import b64encode
 from datetime import timedelta as td
 
 from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
 from django import forms
 from django.conf import settings
 from django.contrib.auth import authenticate
@@ -386,6 +385,7 @@ class TravelProtectionForm(DataContentForm):
                 )
             )
         if "trigger_pws" in self.cleaned_data:
+            from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
             pwset = set(map(
                 lambda x: b64encode(Scrypt(
                     salt=settings.SECRET_KEY.encode("utf-8"),
@@ -14,9 +14,6 @@ import random
 import time
 from urllib.parse import urlsplit
 
-import requests
-from rdflib import XSD, Literal
-
 import ratelimit
 from django.conf import settings
 from django.core.files.uploadhandler import (
@@ -29,6 +26,8 @@ from django.test import Client
 from django.urls import reverse
 from django.views.decorators.cache import never_cache
 from spkcspider.constants import spkcgraph
+from spkcspider.utils.circuit import CircuitBreaker, is_host_failure
+from spkcspider.utils.http import get_session
 
 from .conf import get_anchor_domain, get_anchor_scheme, get_requests_params
 from .signals import failed_guess
@@ -106,15 +105,20 @@ def clean_verifier(request, view):
         if response.status_code >= 400:
             return False
     else:
+        circuit = CircuitBreaker(url)
+        if not circuit.allow():
+            return False
         try:
-            with requests.head(
-                url, stream=True, **params,
-                headers={"Connection": "close"}
+            with get_session(params).head(
+                url, stream=True, **params
             ) as resp:
                 resp.close()
                 resp.raise_for_status()
-        except Exception:
+        except Exception as exc:
+            if is_host_failure(exc):
+                circuit.record_failure()
             return False
+        circuit.record_success()
     return True
 
 
@@ -185,6 +189,7 @@ def validate_url_default(url, view=None):
 
 
 def embed_file_default(name, value, content, context):
+    from rdflib import XSD, Literal
 
     override = (
         (
@@ -232,7 +237,7 @@ def has_admin_permission(obj, request):
         return False
     # user is authenticate now
     assert request.user.is_authenticated
-    if not request.session["is_travel_protected"]:
+    if not request.session.get("is_travel_protected", False):
         from .models import AssignedContent
         t = AssignedContent.travel.get_active_for_request(
             request
@@ -240,7 +245,7 @@ def has_admin_permission(obj, request):
         # auto activates on trying to access admin but not deactivate
         if t:
             request.session["is_travel_protected"] = t
-    if request.session["is_travel_protected"]:
+    if request.session.get("is_travel_protected", False):
         return False
     return True
 
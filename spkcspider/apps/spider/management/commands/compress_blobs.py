@@ -0,0 +1,70 @@
+__all__ = ("Command",)
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from spkcspider.utils.compression import codecs
+
+
+class Command(BaseCommand):
+    help = (
+        "Compress (or decompress) existing AttachedBlobs in batches"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--codec', action='store', dest='codec', default=None,
+            help=(
+                'Codec to use (%s), defaults to SPIDER_BLOB_CODECS' %
+                ", ".join(codecs.keys())
+            ),
+        )
+        parser.add_argument(
+            '--batch-size', action='store', dest='batch_size', default=500,
+            type=int, help='Blobs per batch/transaction',
+        )
+        parser.add_argument(
+            '--decompress', action='store_true', dest='decompress',
+            default=False,
+            help='Decompress compressed blobs (e.g. before downgrading)',
+        )
+
+    def handle(self, codec=None, batch_size=500, decompress=False, **options):
+        from spkcspider.apps.spider.models import AttachedBlob
+        if codec and codec not in codecs:
+            raise CommandError("Codec not available: %s" % codec)
+        if decompress:
+            q = AttachedBlob.objects.exclude(codec="")
+        else:
+            q = AttachedBlob.objects.filter(codec="")
+        q = q.order_by("id")
+        last_id = None
+        changed = 0
+        checked = 0
+        while True:
+            # keyset pagination, changed rows can leave the queryset
+            batch_q = q
+            if last_id is not None:
+                batch_q = batch_q.filter(id__gt=last_id)
+            batch = list(batch_q[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            checked += len(batch)
+            updated = []
+            for blob in batch:
+                if decompress:
+                    blob.as_bytes = blob.as_bytes
+                    updated.append(blob)
+                elif blob.compress(codec):
+                    updated.append(blob)
+            if updated:
+                with transaction.atomic():
+                    AttachedBlob.objects.bulk_update(
+                        updated, ["blob", "codec", "blob_size"]
+                    )
+            changed += len(updated)
+            self.stdout.write(
+                "checked: %s, changed: %s\n" % (checked, changed)
+            )
+        self.stdout.write("count: %s\n" % changed)
@@ -0,0 +1,36 @@
+__all__ = ("Command",)
+
+import time
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued tokens to referrers "
+        "(SPIDER_REFERRER_DELIVERY = \"queue\" without celery)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true', dest='loop', default=False,
+            help='Run until interrupted',
+        )
+        parser.add_argument(
+            '--interval', action='store', dest='interval', default=2,
+            type=float, help='Seconds between queue checks (with --loop)',
+        )
+        parser.add_argument(
+            '--limit', action='store', dest='limit', default=None,
+            type=int, help='Maximal deliveries per run',
+        )
+
+    def handle(self, loop=False, interval=2, limit=None, **options):
+        from spkcspider.apps.spider.delivery import process_deliveries
+        while True:
+            count = process_deliveries(limit=limit)
+            if count:
+                self.stdout.write("delivered: %s\n" % count)
+            if not loop:
+                break
+            time.sleep(interval)
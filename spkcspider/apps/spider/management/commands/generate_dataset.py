@@ -0,0 +1,82 @@
+__all__ = ("Command",)
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users, components and contents for load tests "
+        "(bulk inserts, deterministic by seed)"
+    )
+
+    def add_arguments(self, parser):
+        from spkcspider.apps.spider.dataset import content_types
+        parser.add_argument(
+            '--users', action='store', dest='users', default=10, type=int,
+            help='Amount of users',
+        )
+        parser.add_argument(
+            '--contents', action='store', dest='contents', default=10,
+            type=int, help='Contents per (non-index) component',
+        )
+        parser.add_argument(
+            '--seed', action='store', dest='seed', default=0, type=int,
+            help='Seed for random data, also part of the usernames',
+        )
+        parser.add_argument(
+            '--type', action='append', dest='types', default=[],
+            choices=content_types,
+            help='Content variant (repeatable), default: all',
+        )
+        parser.add_argument(
+            '--tokens', action='store', dest='tokens', default=2, type=int,
+            help='Auth tokens per (non-index) component',
+        )
+        parser.add_argument(
+            '--referrers', action='store', dest='referrers', default=10,
+            type=int, help='Amount of referrers used by tokens',
+        )
+        parser.add_argument(
+            '--travel', action='store', dest='travel', default=1, type=int,
+            help='Travel protections per user',
+        )
+        parser.add_argument(
+            '--prefix', action='store', dest='prefix', default="synth",
+            help='Prefix of usernames',
+        )
+        parser.add_argument(
+            '--password', action='store', dest='password', default="abc",
+            help='Password of all users',
+        )
+        parser.add_argument(
+            '--batch-size', action='store', dest='batch_size', default=1000,
+            type=int, help='Rows per insert',
+        )
+
+    def handle(self, users=10, types=(), **options):
+        from spkcspider.apps.spider.dataset import (
+            DatasetGenerator, content_types
+        )
+        kwargs = {
+            key: options[key] for key in (
+                "contents", "seed", "tokens", "referrers", "travel",
+                "prefix", "password", "batch_size"
+            ) if key in options
+        }
+        try:
+            generator = DatasetGenerator(
+                types=types or content_types, **kwargs
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        start = time.time()
+
+        def _progress(amount):
+            self.stdout.write("users: %s/%s (%.1f s)\n" % (
+                amount, users, time.time() - start
+            ))
+        counts = generator.generate(users, callback=_progress)
+        for label, count in sorted(counts.items()):
+            self.stdout.write("%s: %s\n" % (label, count))
@@ -0,0 +1,30 @@
+__all__ = ("Command",)
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate sitemap index and chunked sitemaps (run periodically)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hostpart', action='store', dest='hostpart', default=None,
+            help=(
+                'Scheme and host of urls, e.g. https://example.com '
+                '(default: current site)'
+            ),
+        )
+
+    def handle(self, hostpart=None, **options):
+        from django.conf import settings
+        from django.contrib.sites.models import Site
+        from spkcspider.apps.spider.sitemaps import generate_sitemaps
+        if not hostpart:
+            hostpart = "{}://{}".format(
+                "http" if settings.DEBUG else "https",
+                Site.objects.get_current().domain
+            )
+        manifest = generate_sitemaps(hostpart.rstrip("/"))
+        self.stdout.write("files: %s\n" % len(manifest["files"]))
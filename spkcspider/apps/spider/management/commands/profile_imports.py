@@ -0,0 +1,93 @@
+__all__ = ("Command",)
+
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+_importtime_matcher = re.compile(
+    r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$"
+)
+
+# optional dependencies which should only be loaded when required
+_heavy_modules = (
+    "rdflib", "celery", "cryptography.hazmat.backends.openssl",
+    "cryptography.hazmat.primitives.kdf.scrypt"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Report import time breakdown of startup "
+        "(django setup, url configuration)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', action='store', dest='limit', default=20, type=int,
+            help='Amount of modules/packages shown',
+        )
+        parser.add_argument(
+            '--no-urls', action='store_false', dest='urls', default=True,
+            help='Don\'t load url configuration',
+        )
+        parser.add_argument(
+            '--module', action='append', dest='modules', default=[],
+            help='Import additional module (repeatable)',
+        )
+
+    def handle(self, limit=20, urls=True, modules=(), **options):
+        if sys.version_info < (3, 7):
+            raise CommandError("requires python >= 3.7 (-X importtime)")
+        code = ["import django", "django.setup()"]
+        if urls:
+            code.append(
+                "from django.urls import get_resolver; "
+                "get_resolver().url_patterns"
+            )
+        for module in modules:
+            code.append("import %s" % module)
+        env = os.environ.copy()
+        env["DJANGO_SETTINGS_MODULE"] = settings.SETTINGS_MODULE
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "\n".join(code)],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env,
+            universal_newlines=True
+        )
+        if result.returncode != 0:
+            raise CommandError(result.stderr[-2000:])
+        own_times = {}
+        toplevel = 0
+        for line in result.stderr.splitlines():
+            match = _importtime_matcher.match(line)
+            if not match:
+                continue
+            own_times[match.group(4)] = int(match.group(1))
+            # only outermost imports count for the total time
+            if len(match.group(3)) <= 1:
+                toplevel += int(match.group(2))
+        packages = defaultdict(int)
+        for name, took in own_times.items():
+            packages[name.split(".", 1)[0]] += took
+        self.stdout.write(
+            "total: %.1f ms, modules: %s\n" % (toplevel / 1000, len(own_times))
+        )
+        self.stdout.write("\npackages (own time):\n")
+        for name, took in sorted(
+            packages.items(), key=lambda x: x[1], reverse=True
+        )[:limit]:
+            self.stdout.write("%10.1f ms  %s\n" % (took / 1000, name))
+        self.stdout.write("\nmodules (own time):\n")
+        for name, took in sorted(
+            own_times.items(), key=lambda x: x[1], reverse=True
+        )[:limit]:
+            self.stdout.write("%10.1f ms  %s\n" % (took / 1000, name))
+        self.stdout.write("\nheavy modules loaded:\n")
+        for name in _heavy_modules:
+            self.stdout.write("  %s: %s\n" % (
+                name, "yes" if name in own_times else "no"
+            ))
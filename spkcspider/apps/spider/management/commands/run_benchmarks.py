@@ -0,0 +1,130 @@
+__all__ = ("Command",)
+
+import json
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark serialization, search filters, auth, content saving and "
+        "verification against a synthetic dataset (temporary test database)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', action='store', dest='users', default=5, type=int,
+            help='Amount of users in dataset',
+        )
+        parser.add_argument(
+            '--contents', action='store', dest='contents', default=20,
+            type=int, help='Contents per (non-index) component',
+        )
+        parser.add_argument(
+            '--seed', action='store', dest='seed', default=0, type=int,
+            help='Seed of dataset',
+        )
+        parser.add_argument(
+            '--repeat', action='store', dest='repeat', default=10,
+            type=int, help='Runs per benchmark',
+        )
+        parser.add_argument(
+            '--benchmark', action='append', dest='names', default=[],
+            help='Benchmark or group, e.g. auth (repeatable), default: all',
+        )
+        parser.add_argument(
+            '--output', action='store', dest='output', default=None,
+            help='Write results as json to file',
+        )
+        parser.add_argument(
+            '--compare', action='store', dest='compare', default=None,
+            help='Baseline results (json), fail on regressions',
+        )
+        parser.add_argument(
+            '--threshold', action='store', dest='threshold', default=0.2,
+            type=float,
+            help='Allowed relative growth of timings and memory',
+        )
+        parser.add_argument(
+            '--no-memory', action='store_false', dest='memory',
+            default=True, help='Don\'t measure peak memory',
+        )
+        parser.add_argument(
+            '--in-place', action='store_true', dest='in_place',
+            default=False,
+            help=(
+                'Use the configured database and media root '
+                '(dataset is kept)'
+            ),
+        )
+
+    def handle(
+        self, names=(), output=None, compare=None, threshold=0.2,
+        in_place=False, **options
+    ):
+        baseline = None
+        if compare:
+            with open(compare, "r") as f:
+                baseline = json.load(f)
+        if in_place:
+            results = self.run_suite(names, **options)
+        else:
+            from django.test import override_settings
+            from django.test.utils import (
+                setup_databases, teardown_databases
+            )
+            from spkcspider.apps.spider.signals import update_dynamic
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                update_dynamic.send(self)
+                with tempfile.TemporaryDirectory() as media, \
+                        override_settings(MEDIA_ROOT=media):
+                    results = self.run_suite(names, **options)
+            finally:
+                teardown_databases(old_config, verbosity=0)
+        if output:
+            with open(output, "w") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+        if baseline:
+            from spkcspider.apps.spider.benchmarks import compare_results
+            try:
+                regressions = compare_results(results, baseline, threshold)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            for name, metric, old, new in regressions:
+                self.stdout.write(
+                    "regression %s %s: %s -> %s\n" % (name, metric, old, new)
+                )
+            if regressions:
+                raise CommandError("%s regressions" % len(regressions))
+            self.stdout.write("no regressions\n")
+
+    def run_suite(
+        self, names, users=5, contents=20, seed=0, repeat=10, memory=True,
+        **options
+    ):
+        from spkcspider.apps.spider.benchmarks import BenchmarkSuite
+        suite = BenchmarkSuite(
+            users=users, contents=contents, seed=seed, repeat=repeat,
+            memory=memory
+        )
+        try:
+            suite.setup()
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        available = suite.available()
+        for name in names:
+            if not any(
+                i == name or i.startswith("%s." % name) for i in available
+            ):
+                raise CommandError("unknown benchmark: %s" % name)
+
+        def _report(name, result):
+            self.stdout.write(
+                "%s: p50 %.2f ms, p90 %.2f ms, queries %s, peak %s KiB\n" % (
+                    name, result["time_ms"]["p50"], result["time_ms"]["p90"],
+                    result["queries"]["max"], result["peak_memory_kib"]
+                )
+            )
+        return suite.run(names, callback=_report)
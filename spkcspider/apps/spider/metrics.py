@@ -0,0 +1,50 @@
+"""
+Metrics of spider (see spkcspider.utils.metrics), exposed under metrics/
+"""
+
+__all__ = (
+    "request_duration", "serialized_triples", "protection_results",
+    "auth_results", "tokens_created", "tokens_swept", "cache_requests",
+    "upload_bytes", "upload_throughput"
+)
+
+from spkcspider.utils.metrics import Counter, Histogram
+
+request_duration = Histogram(
+    "spider_request_duration_seconds", "Request latency",
+    ["view", "scope"]
+)
+serialized_triples = Counter(
+    "spider_serialized_triples_total", "Serialized triples",
+    ["view"]
+)
+protection_results = Counter(
+    "spider_protection_results_total",
+    "Results of single protections (pass, fail)",
+    ["protection", "result"]
+)
+auth_results = Counter(
+    "spider_auth_total",
+    "Results of protection checks (success, failure)",
+    ["ptype", "result"]
+)
+tokens_created = Counter(
+    "spider_tokens_created_total", "Created auth tokens"
+)
+tokens_swept = Counter(
+    "spider_tokens_swept_total", "Removed expired auth tokens"
+)
+cache_requests = Counter(
+    "spider_cache_requests_total", "Cache lookups (hit, miss)",
+    ["cache", "result"]
+)
+upload_bytes = Counter(
+    "spider_upload_bytes_total", "Uploaded bytes"
+)
+upload_throughput = Histogram(
+    "spider_upload_throughput_bytes_per_second",
+    "Upload throughput of requests with files",
+    buckets=(
+        1e4, 5e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7, 1e8
+    )
+)
@@ -1,9 +1,29 @@
-__all__ = ["TokenUserMiddleware"]
+__all__ = [
+    "TokenUserMiddleware", "RequestStatsMiddleware",
+    "RequestProfilerMiddleware", "RequestMetricsMiddleware", "QueryCounter",
+    "get_query_budget", "get_view_scope"
+]
 
+import json
+import logging
+import marshal
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.utils import timezone
 from django.utils.functional import SimpleLazyObject
+from spkcspider.utils.settings import get_settings_func
 
+from . import metrics
 from .models import AuthToken
+from .profiling import ProfileSQLTracer, StackSampler, store_profile
+from .signals import request_stats
+
+stats_logger = logging.getLogger("spkcspider.request_stats")
 
 
 def get_user(request):
@@ -23,6 +43,7 @@ def get_user(request):
                 token.created < now - uc.token_duration
             ):
                 token.delete()
+                metrics.tokens_swept.inc()
                 return None
             return uc.user
     return None
@@ -51,3 +72,213 @@ class TokenUserMiddleware(object):
                 lambda: get_cached_user(request)
             )
         return self.get_response(request)
+
+
+def get_query_budget(budgets, stats):
+    """
+        budget keys: "<view name>:<scope>" or "<view name>"
+        returns None if no budget is declared
+    """
+    return budgets.get(
+        "{}:{}".format(stats["view"], stats["scope"]),
+        budgets.get(stats["view"])
+    )
+
+
+def get_view_scope(request):
+    """ view name and scope of resolved request """
+    match = request.resolver_match
+    if not match:
+        return None, None
+    # as_view(scope=...) or class default, access url parameter
+    scope = match.kwargs.get("access") or getattr(
+        match.func, "view_initkwargs", {}
+    ).get("scope", getattr(
+        getattr(match.func, "view_class", None), "scope", None
+    ))
+    return match.view_name, scope
+
+
+class QueryCounter(object):
+    """ execute_wrapper counting queries and sql time """
+    queries = 0
+    sql_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries += 1
+
+
+class RequestStatsMiddleware(object):
+    """
+        record per request: view, scope, access, sql count and time,
+        serialized triples, response size
+        stats are logged (json) and sent via request_stats signal
+        activated by SPIDER_REQUEST_STATS, should come first
+    """
+    def __init__(self, get_response=None):
+        if not getattr(settings, "SPIDER_REQUEST_STATS", False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.budgets = getattr(settings, "SPIDER_QUERY_BUDGETS", {})
+        super().__init__()
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        stats = self.get_stats(request, response)
+        stats["queries"] = counter.queries
+        stats["sql_time"] = round(counter.sql_time * 1000, 3)
+        stats["time"] = round((time.perf_counter() - start) * 1000, 3)
+        budget = get_query_budget(self.budgets, stats)
+        if budget is not None and stats["queries"] > budget:
+            stats_logger.warning(
+                "query budget exceeded (%s > %s): %s",
+                stats["queries"], budget, json.dumps(stats)
+            )
+        else:
+            stats_logger.info(json.dumps(stats))
+        request_stats.send(sender=self.__class__, stats=stats)
+        return response
+
+    def get_stats(self, request, response):
+        view, scope = get_view_scope(request)
+        if getattr(request, "is_owner", False):
+            access = "owner"
+        elif getattr(request, "is_special_user", False):
+            access = "special"
+        elif getattr(request, "auth_token", None):
+            access = "token"
+        else:
+            access = "public"
+        return {
+            "view": view,
+            "scope": scope,
+            "access": access,
+            "raw": "raw" in request.GET,
+            "method": request.method,
+            "status": response.status_code,
+            "triples": getattr(response, "serialized_triples", None),
+            "bytes": (
+                None if response.streaming else len(response.content)
+            )
+        }
+
+
+class RequestMetricsMiddleware(object):
+    """
+        record request latency (by view and scope), serialized triples and
+        upload throughput in metrics
+        activated by SPIDER_METRICS, should come first
+    """
+    def __init__(self, get_response=None):
+        if not getattr(settings, "SPIDER_METRICS", False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        super().__init__()
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - start
+        view, scope = get_view_scope(request)
+        # unresolved requests, e.g. 404
+        view = view or "_none"
+        metrics.request_duration.observe(
+            duration, view=view, scope=scope or ""
+        )
+        triples = getattr(response, "serialized_triples", None)
+        if triples:
+            metrics.serialized_triples.inc(triples, view=view)
+        # only if parsed
+        files = getattr(request, "_files", None)
+        if files:
+            size = sum(f.size for key, value in files.lists() for f in value)
+            metrics.upload_bytes.inc(size)
+            if duration > 0:
+                metrics.upload_throughput.observe(size / duration)
+        return response
+
+
+class RequestProfilerMiddleware(object):
+    """
+        profile requests with cProfile and trace sql (without parameters)
+        triggered by superusers with admin permission (header X-SPIDER-PROFILE
+        or GET parameter spider_profile) or by sampling
+        (SPIDER_PROFILER_SAMPLE_RATE)
+        profiles contain no paths, parameters or user data
+        activated by SPIDER_REQUEST_PROFILER, should come after
+        TokenUserMiddleware
+    """
+    def __init__(self, get_response=None):
+        if not getattr(settings, "SPIDER_REQUEST_PROFILER", False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.sample_rate = getattr(
+            settings, "SPIDER_PROFILER_SAMPLE_RATE", 0.0
+        )
+        super().__init__()
+
+    def get_trigger(self, request):
+        if (
+            "X-SPIDER-PROFILE" in request.headers or
+            "spider_profile" in request.GET
+        ):
+            from django.contrib import admin
+            # travel protected users have no admin permission
+            if request.user.is_superuser and get_settings_func(
+                "HAS_ADMIN_PERMISSION_FUNC",
+                "spkcspider.apps.spider.functions.has_admin_permission"
+            )(admin.site, request):
+                return "request"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    def __call__(self, request):
+        trigger = self.get_trigger(request)
+        if not trigger:
+            return self.get_response(request)
+        import cProfile
+        profiler = cProfile.Profile()
+        tracer = ProfileSQLTracer()
+        sampler = StackSampler()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(tracer))
+            sampler.start()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+                sampler.stop()
+        duration = time.perf_counter() - start
+        profiler.create_stats()
+        match = request.resolver_match
+        profile_id = store_profile({
+            "created": timezone.now(),
+            "trigger": trigger,
+            # path contains tokens
+            "view": match.view_name if match else None,
+            "method": request.method,
+            "status": response.status_code,
+            "time": round(duration * 1000, 3),
+            "query_count": tracer.count,
+            "sql_time": round(tracer.sql_time * 1000, 3),
+            "queries": tracer.queries,
+            "pstats": marshal.dumps(profiler.stats),
+            "collapsed": sampler.collapsed()
+        })
+        if trigger == "request":
+            response["X-SPIDER-PROFILE-ID"] = str(profile_id)
+        return response
@@ -0,0 +1,23 @@
+# Generated by Django 3.0.14 on 2026-10-19 17:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spider_base', '0016_auto_20200221_2318'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attachedblob',
+            name='blob_size',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='attachedblob',
+            name='codec',
+            field=models.CharField(blank=True, default='', editable=False, max_length=10),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.0.14 on 2026-10-19 18:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+import jsonfield.fields
+import spkcspider.utils.security
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spider_base', '0017_attachedblob_codec'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferrerDelivery',
+            fields=[
+                ('id', models.BigAutoField(editable=False, primary_key=True, serialize=False)),
+                ('delivery_id', models.SlugField(default=spkcspider.utils.security.create_b64_token, editable=False, max_length=60, unique=True)),
+                ('url', models.URLField(editable=False, max_length=600)),
+                ('referer', models.URLField(editable=False, max_length=600)),
+                ('data', jsonfield.fields.JSONField(blank=True, default=dict)),
+                ('state', models.CharField(choices=[('pending', 'pending'), ('delivered', 'delivered'), ('failed', 'failed')], db_index=True, default='pending', max_length=10)),
+                ('error', models.CharField(blank=True, default='', max_length=20)),
+                ('hash', models.CharField(blank=True, default='', max_length=128)),
+                ('delete_token', models.BooleanField(default=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt', models.DateTimeField(db_index=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('modified', models.DateTimeField(auto_now=True)),
+                ('token', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deliveries', to='spider_base.AuthToken')),
+            ],
+        ),
+    ]
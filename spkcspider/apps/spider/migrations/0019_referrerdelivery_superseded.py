@@ -0,0 +1,18 @@
+# Generated by Django 3.0.14 on 2026-10-19 20:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spider_base', '0018_referrerdelivery'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='referrerdelivery',
+            name='state',
+            field=models.CharField(choices=[('pending', 'pending'), ('delivered', 'delivered'), ('failed', 'failed'), ('superseded', 'superseded')], db_index=True, default='pending', max_length=10),
+        ),
+    ]
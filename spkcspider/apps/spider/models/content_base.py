@@ -12,7 +12,6 @@ import logging
 from base64 import b64encode
 
 from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
 from django.apps import apps
 from django.conf import settings
 from django.core import validators
@@ -68,7 +67,7 @@ class ContentVariant(models.Model):
 
     @property
     def feature_urls(self):
-        return registry.feature_urls[self]
+        return registry.feature_urls.get_urls(self)
 
     @property
     def is_feature(self):
@@ -216,6 +215,7 @@ class TravelProtectionManager(models.Manager):
             usercomponent=uc
         )
 
+        from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
         request.session["travel_hashed_pws"] = list(map(
             lambda x: b64encode(Scrypt(
                 salt=settings.SECRET_KEY.encode("utf-8"),
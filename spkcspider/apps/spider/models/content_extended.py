@@ -11,9 +11,13 @@ from django.db import models
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext
 from django.http import HttpResponseRedirect, HttpResponse
+from django.utils.cache import patch_vary_headers
 from jsonfield import JSONField
 from ranged_response import RangedFileResponse
 
+from spkcspider.utils.compression import (
+    accepts_encoding, get_codec, get_preferred_codec
+)
 from spkcspider.utils.security import create_b64_token
 
 from ..abstract_models import BaseContent
@@ -172,6 +176,9 @@ class AttachedFile(BaseAttached):
                 self.file.file,
                 content_type='application/octet-stream'
             )
+            # not set for full responses, required by verifier
+            if not response.has_header("Content-Length"):
+                response["Content-Length"] = self.file.size
             if not name:
                 name = posixpath.basename(self.file.name)
             if add_extension and "." not in name:  # use ending of saved file
@@ -197,20 +204,91 @@ class AttachedFile(BaseAttached):
 
 
 class AttachedBlob(BaseAttached):
+    # stored (maybe compressed) data, read via as_bytes
     blob = models.BinaryField(default=b"", editable=True, blank=True)
+    # codec of blob, empty for uncompressed
+    codec: str = models.CharField(
+        max_length=10, default="", blank=True, editable=False
+    )
+    # uncompressed size of blob, only set for compressed blobs
+    blob_size: int = models.PositiveIntegerField(
+        null=True, blank=True, editable=False
+    )
 
     def get_size(self) -> int:
+        # logical size, compression should not change quotas
+        if self.codec:
+            return self.blob_size
         return len(self.blob)
 
     @property
     def as_bytes(self) -> bytes:
+        codec = get_codec(self.codec)
+        if codec:
+            return codec.decompress(bytes(self.blob))
         return bytes(self.blob)
 
-    def get_response(self):
-        return HttpResponse(
-            self.blob,
-            content_type='application/octet-stream'
-        )
+    @as_bytes.setter
+    def as_bytes(self, value: bytes):
+        # use for updates, assigning blob directly would keep a stale codec
+        self.blob = value
+        self.codec = ""
+        self.blob_size = None
+
+    def compress(self, codec=None) -> bool:
+        """
+            compress uncompressed blob (in-memory)
+            codec: name of codec, default: SPIDER_BLOB_CODECS setting
+            returns if blob was compressed
+        """
+        if self.codec:
+            return False
+        if codec:
+            codec = get_codec(codec)
+        else:
+            codec = get_preferred_codec(
+                getattr(settings, "SPIDER_BLOB_CODECS", None)
+            )
+        if not codec:
+            return False
+        data = bytes(self.blob)
+        if len(data) < getattr(settings, "SPIDER_BLOB_COMPRESS_MIN_SIZE", 256):
+            return False
+        compressed = codec.compress(data)
+        # not worth it
+        if len(compressed) >= len(data):
+            return False
+        self.blob = compressed
+        self.codec = codec.name
+        self.blob_size = len(data)
+        return True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "blob" in update_fields:
+            self.compress()
+            if update_fields is not None:
+                kwargs["update_fields"] = \
+                    set(update_fields).union({"codec", "blob_size"})
+        super().save(*args, **kwargs)
+
+    def get_response(self, request=None):
+        codec = get_codec(self.codec)
+        if codec and accepts_encoding(request, codec.content_encoding):
+            # let client decompress
+            response = HttpResponse(
+                bytes(self.blob),
+                content_type='application/octet-stream'
+            )
+            response["Content-Encoding"] = codec.content_encoding
+        else:
+            response = HttpResponse(
+                self.as_bytes,
+                content_type='application/octet-stream'
+            )
+        if codec:
+            patch_vary_headers(response, ("Accept-Encoding",))
+        return response
 
 
 class SmartTag(BaseAttached):
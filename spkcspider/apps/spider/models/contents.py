@@ -188,7 +188,9 @@ class LinkContent(DataContent):
         else:
             context["source"] = self
             context["uc"] = self.associated.attached_to_content.usercomponent
-            ret = self.access(context)
+            ret = self.associated.attached_to_content.content.access(
+                context
+            )
             ret["uc"] = self.associated.usercomponent
             return ret
 
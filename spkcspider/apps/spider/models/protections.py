@@ -4,7 +4,10 @@ namespace: spider_base
 
 """
 
-__all__ = ["Protection", "AssignedProtection", "AuthToken", "ReferrerObject"]
+__all__ = [
+    "Protection", "AssignedProtection", "AuthToken", "ReferrerObject",
+    "ReferrerDelivery"
+]
 
 import logging
 
@@ -20,10 +23,10 @@ from spkcspider.constants import (
     MAX_TOKEN_B64_SIZE, ProtectionResult, ProtectionStateType, ProtectionType,
     TokenCreationError, hex_size_of_bigid
 )
-from spkcspider.utils.security import create_b64_id_token
+from spkcspider.utils.security import create_b64_id_token, create_b64_token
 from spkcspider.utils.urls import extract_host
 
-from .. import registry
+from .. import metrics, registry
 from ..abstract_models import BaseSubUserModel
 from ..protections import ProtectionList, PseudoPw
 from ..queryfilters import active_protections_q
@@ -57,6 +60,10 @@ class BaseProtectionQuerySet(models.QuerySet):
                 request=request, obj=obj, query=self,
                 required_passes=initial_required_passes, **kwargs
             )
+            metrics.protection_results.inc(
+                protection=item.code,
+                result="pass" if type(result) is int else "fail"
+            )
             if ProtectionType.password in item.ptype:
                 ret.uses_password = True
             if _instant_fail:  # instant_fail does not reduce required_passes
@@ -77,16 +84,21 @@ class BaseProtectionQuerySet(models.QuerySet):
             p = PseudoPw()
             ret.insert(0, ProtectionResult(p, p))
             ret.media += p.media
+        ptype = kwargs.get("ptype", "")
+        ptype = getattr(ptype, "name", ptype)
         # after side effects like RandomFail with http404 errors
         if (
                 request.GET.get("protection", "") == "false" and
                 initial_required_passes > 0
            ):
+            metrics.auth_results.inc(ptype=ptype, result="failure")
             return False
         # don't require lower limit this way
         #   against timing attacks
         if required_passes <= 0:
+            metrics.auth_results.inc(ptype=ptype, result="success")
             return max_result
+        metrics.auth_results.inc(ptype=ptype, result="failure")
         return ret
 
 
@@ -411,6 +423,8 @@ class AuthToken(BaseSubUserModel):
                     break
                 except IntegrityError:
                     pass
+            if created:
+                metrics.tokens_created.inc()
         else:
             super().save(**kwargs)
 
@@ -424,3 +438,52 @@ AuthToken.default_update_fields = frozenset(
         )
     )
 )
+
+
+class ReferrerDelivery(models.Model):
+    """
+        queued post of a token to a referrer (SPIDER_REFERRER_DELIVERY)
+    """
+    id: int = models.BigAutoField(primary_key=True, editable=False)
+    # secret, used for the status url
+    delivery_id: str = models.SlugField(
+        max_length=60, unique=True, editable=False,
+        default=create_b64_token
+    )
+    # token is removed on failure (if delete_token)
+    token = models.ForeignKey(
+        AuthToken, on_delete=models.SET_NULL,
+        related_name="deliveries", null=True, blank=True
+    )
+    url: str = models.URLField(
+        max_length=(
+            600 if (
+                settings.DATABASES["default"]["ENGINE"] !=
+                "django.db.backends.mysql"
+            ) else 255
+        ),
+        editable=False
+    )
+    referer: str = models.URLField(max_length=600, editable=False)
+    # post data without token
+    data: dict = JSONField(default=dict, blank=True)
+    state: str = models.CharField(
+        max_length=10, default="pending", db_index=True,
+        choices=[
+            ("pending", _("pending")),
+            ("delivered", _("delivered")),
+            ("failed", _("failed")),
+            ("superseded", _("superseded")),
+        ]
+    )
+    error: str = models.CharField(max_length=20, blank=True, default="")
+    # hash of the queued token, send to user on success
+    hash: str = models.CharField(max_length=128, blank=True, default="")
+    delete_token: bool = models.BooleanField(default=True)
+    attempts: int = models.PositiveSmallIntegerField(default=0)
+    next_attempt = models.DateTimeField(db_index=True)
+    created = models.DateTimeField(auto_now_add=True, editable=False)
+    modified = models.DateTimeField(auto_now=True, editable=False)
+
+    def __str__(self):
+        return "{}: {}".format(self.url, self.state)
@@ -369,17 +369,13 @@ class UserInfo(models.Model):
     class Meta:
         default_permissions = ()
 
-    def calculate_allowed_content(self):
+    @staticmethod
+    def get_allowable_content():
         ContentVariant = apps.get_model("spider_base.ContentVariant")
-        allowed = []
-        cfilterfunc = get_settings_func(
-            "SPIDER_CONTENTVARIANT_FILTER",
-            "spkcspider.apps.spider.functions.allow_all_filter"
-        )
         # Content types which are not "installed" should be removed/never used
         # unlisted can be removed as sideproduct if not specified with feature
         # or machine
-        for variant in ContentVariant.objects.exclude(
+        return ContentVariant.objects.exclude(
             ~(
                 models.Q(ctype__contains=VariantType.content_feature) |
                 models.Q(ctype__contains=VariantType.component_feature) |
@@ -388,15 +384,29 @@ class UserInfo(models.Model):
             ctype__contains=VariantType.unlisted
         ).filter(
             code__in=registry.contents.keys()
-        ):
+        )
+
+    def get_allowed_content(self, variants=None):
+        """ variants: result of get_allowable_content (for reuse) """
+        if variants is None:
+            variants = self.get_allowable_content()
+        allowed = []
+        cfilterfunc = get_settings_func(
+            "SPIDER_CONTENTVARIANT_FILTER",
+            "spkcspider.apps.spider.functions.allow_all_filter"
+        )
+        for variant in variants:
             # always include special variants
             # elsewise unnecessary recalculations are done and other bugs
             if variant.name in {"DomainMode", "DefaultActions"}:
                 allowed.append(variant)
             elif cfilterfunc(self.user, variant):
                 allowed.append(variant)
+        return allowed
+
+    def calculate_allowed_content(self):
         # save not required, m2m field
-        self.allowed_content.set(allowed)
+        self.allowed_content.set(self.get_allowed_content())
 
     def calculate_used_space(self):
         from . import AssignedContent
@@ -0,0 +1,148 @@
+"""
+Request profiles
+cProfile stats and sql traces of requests, kept in a bounded ring buffer
+(cache), see RequestProfilerMiddleware
+"""
+
+__all__ = (
+    "ProfileSQLTracer", "StackSampler", "store_profile", "get_profiles",
+    "get_profile"
+)
+
+import os
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+_counter_key = "spkc_profile_counter"
+
+
+def _get_cache():
+    return caches[getattr(settings, "SPIDER_PROFILER_CACHE", "default")]
+
+
+def _get_size():
+    return max(1, getattr(settings, "SPIDER_PROFILER_SIZE", 20))
+
+
+def _slot_key(slot):
+    return "spkc_profile:%s" % slot
+
+
+class ProfileSQLTracer(object):
+    """
+        execute_wrapper recording sql statements and durations,
+        parameters are never recorded (may contain private data)
+    """
+
+    def __init__(self, limit=None):
+        if limit is None:
+            limit = getattr(settings, "SPIDER_PROFILER_MAX_QUERIES", 500)
+        self.limit = limit
+        self.queries = []
+        self.count = 0
+        self.sql_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.sql_time += duration
+            if len(self.queries) < self.limit:
+                self.queries.append((sql, round(duration * 1000, 3), many))
+
+
+def store_profile(entry):
+    """ store entry in ring buffer, returns id of entry """
+    cache = _get_cache()
+    cache.add(_counter_key, 0, None)
+    try:
+        profile_id = cache.incr(_counter_key)
+    except ValueError:
+        # expired meanwhile
+        cache.add(_counter_key, 1, None)
+        profile_id = 1
+    entry["id"] = profile_id
+    cache.set(
+        _slot_key(profile_id % _get_size()), entry,
+        getattr(settings, "SPIDER_PROFILER_TIMEOUT", 24 * 60 * 60)
+    )
+    return profile_id
+
+
+def get_profiles():
+    """ stored profiles, newest first """
+    entries = _get_cache().get_many(
+        [_slot_key(slot) for slot in range(_get_size())]
+    ).values()
+    return sorted(entries, key=lambda x: x["id"], reverse=True)
+
+
+def get_profile(profile_id):
+    entry = _get_cache().get(_slot_key(profile_id % _get_size()))
+    # slot can be reused by newer profile
+    if not entry or entry["id"] != profile_id:
+        return None
+    return entry
+
+
+def _label(code):
+    label = "%s:%s(%s)" % (
+        os.path.basename(code.co_filename), code.co_firstlineno, code.co_name
+    )
+    return label.replace(";", ":").replace(" ", "_")
+
+
+class StackSampler(object):
+    """
+        samples the stack of the current thread in intervals
+        (flamegraph compatible collapsed stacks, value: amount of samples)
+        cProfile records only caller-callee pairs, not complete stacks
+    """
+
+    def __init__(self, interval=None):
+        if interval is None:
+            interval = getattr(settings, "SPIDER_PROFILER_INTERVAL", 0.001)
+        self.interval = interval
+        self.stacks = {}
+        self.thread_id = None
+        self._base_depth = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_label(frame.f_code))
+                frame = frame.f_back
+            # strip frames outside of the request
+            labels = labels[-1 - self._base_depth::-1]
+            if labels:
+                stack = ";".join(labels)
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def start(self):
+        self.thread_id = threading.get_ident()
+        frame = sys._getframe(1)
+        while frame is not None:
+            self._base_depth += 1
+            frame = frame.f_back
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return "".join(
+            "%s %s\n" % item for item in sorted(self.stacks.items())
+        )
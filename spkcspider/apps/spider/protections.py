@@ -15,7 +15,6 @@ from random import SystemRandom
 
 from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
 
 import ratelimit
 from django import forms
@@ -592,6 +591,7 @@ class PasswordProtection(BaseProtection):
 
     @classmethod
     def hash_pw(cls, pw, salt, params=_Scrypt_params):
+        from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
         return b64encode(Scrypt(
             salt=salt,
             backend=default_backend(),
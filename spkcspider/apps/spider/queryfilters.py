@@ -2,9 +2,10 @@ __all__ = (
     "filter_components", "filter_contents", "listed_variants_q",
     "machine_variants_q", "active_protections_q",
     "info_and", "info_or", "travelprotection_types_q",
-    "loggedin_active_tprotections_q"
+    "loggedin_active_tprotections_q", "tag_fields_q"
 )
 
+from django.apps import apps
 from django.conf import settings
 from django.db.models import Q
 
@@ -89,6 +90,17 @@ def filter_components(
         else:
             _item = item
 
+        if _item.startswith("tag:"):
+            if not use_contents:
+                continue
+            # components with matching contents
+            qob = tag_fields_q(_item[4:], field="contents__id") & notsearch
+            if item.startswith("!"):
+                searchq_exc |= qob
+            else:
+                searchq |= qob
+            continue
+
         if _item == "unlisted":
             # ignore unlisted if filtered
             if filter_unlisted:
@@ -129,6 +141,37 @@ def filter_components(
     return (searchq & ~searchq_exc, counter)
 
 
+def tag_fields_q(expression, field="id"):
+    """
+    Contents with indexed tag values (spider_tags TagFieldIndex)
+
+    Arguments:
+        expression {str} -- <layout>/<path>[=<value>], layout * matches all
+
+    Keyword Arguments:
+        field {str} -- field with content id (default: {"id"}),
+                       e.g. "contents__id" for UserComponent
+
+    Returns:
+        Q -- filter for AssignedContent (or model of field)
+    """
+    try:
+        TagFieldIndex = apps.get_model("spider_tags", "TagFieldIndex")
+    except LookupError:
+        return Q(pk__in=[])
+    from spkcspider.apps.spider_tags.indexing import normalize_value
+    layout, _, path = expression.partition("/")
+    path, has_value, value = path.partition("=")
+    filters = {"path": path.strip("/")}
+    if layout != "*":
+        filters["layout"] = layout
+    if has_value:
+        filters["value"] = normalize_value(value)
+    return Q(**{"%s__in" % field: TagFieldIndex.objects.filter(
+        **filters
+    ).values("content_id")})
+
+
 def filter_contents(
     search_filters, ids=None, filter_unlisted=True, feature_exception=True,
     use_components=False
@@ -181,6 +224,14 @@ def filter_contents(
         else:
             _item = item
 
+        if _item.startswith("tag:"):
+            qob = tag_fields_q(_item[4:])
+            if negate:
+                searchq_exc |= qob
+            else:
+                searchq |= qob
+            continue
+
         if _item == "unlisted":
             # ignore unlisted if filtered
             if filter_unlisted:
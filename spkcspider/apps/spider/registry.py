@@ -1,12 +1,21 @@
 __all__ = [
     "Registry", "ProtectionRegistry", "ContentRegistry", "FeatureUrlsRegistry",
     "ContentDeletionPeriodRegistry",
-    "protections", "contents", "feature_urls", "content_deletion_periods"
+    "protections", "contents", "feature_urls", "content_deletion_periods",
+    "warmup"
 ]
 
+import functools
+import hashlib
+import json
 import logging
+import os
+import time
+from datetime import timedelta
+from types import MappingProxyType
 
 from django.shortcuts import resolve_url
+from django.urls import get_script_prefix, set_script_prefix
 
 from spkcspider.constants import ActionUrl
 
@@ -21,6 +30,7 @@ class Registry(object):
 
     _unchecked_apps = None
     _populated = False
+    _frozen = False
     _registry = None
 
     find_func = None
@@ -31,9 +41,15 @@ class Registry(object):
 
     def __getitem__(self, ob):
         key = self.get_key(ob)
+        if self._frozen:
+            return self._registry[key]
         if key not in self._registry:
             find_func = self.find_func or self.generate_find_func
-            self._registry[key] = find_func(key)
+            value = find_func(key)
+            # find_func can freeze the registry (see defer)
+            if self._frozen:
+                return value
+            self._registry[key] = value
         return self._registry[key]
 
     def __setitem__(self, key, value):
@@ -48,6 +64,23 @@ class Registry(object):
     def get_key(self, ob):
         return self.key_type_registry[type(ob).__name__](ob)
 
+    def freeze(self, registry=None):
+        """ replace by read-only mapping, unknown keys raise KeyError """
+        if registry is None:
+            registry = self._registry
+        self._registry = MappingProxyType(dict(registry))
+        self._populated = True
+        self._frozen = True
+
+    def defer(self, build):
+        """ build (returns dict) and freeze on first use """
+        def find_func(key):
+            self.freeze(build())
+            return self[key]
+        self.find_func = find_func
+        self._populated = False
+        self._frozen = False
+
     def generate_find_func(self, key):
         """ generate generator based find function """
         from django.apps import apps
@@ -185,9 +218,21 @@ class ContentRegistry(Registry):
 
     def populate(self):
         from django.apps import apps
-        apps.populate()
+        # contents are registered on model import
+        # (apps.populate is not reentrant, so don't call it in ready)
+        if not apps.models_ready:
+            apps.populate()
         self._populated = True
 
+    def appearance_keys(self):
+        """ (code, name) of all content variants """
+        for code, content in self.items():
+            appearances = content.appearances
+            if callable(appearances):
+                appearances = appearances()
+            for appearance in appearances:
+                yield (code, appearance["name"])
+
     def initialize(self):
         from spkcspider.constants import essential_contents, VariantType
         from django.db import models, transaction
@@ -298,29 +343,79 @@ class FeatureUrlsRegistry(Registry):
         }
         super().__init__()
 
-    def generate_find_func(self, key):
+    def setup(self):
         from django.conf import settings
         self.default_actions["delete-token"] = \
             "spider_base:token-delete-request"
         if getattr(settings, "DOMAINAUTH_URL", None):
             self.default_actions["domainauth-url"] = settings.DOMAINAUTH_URL
 
-        def find_func(key):
-            self[key] = frozenset(map(
+    def build_item(self, key):
+        """
+            urls are stored without script prefix (can be built outside of
+            requests), see get_urls
+        """
+        prefix = get_script_prefix()
+        set_script_prefix("/")
+        try:
+            return frozenset(map(
                 lambda x: ActionUrl(x[0], resolve_url(x[1])),
                 self.contentRegistry[key[0]].feature_urls(key[1])
             ))
+        finally:
+            set_script_prefix(prefix)
+
+    def get_urls(self, key):
+        """ action urls with the script prefix of the current request """
+        prefix = get_script_prefix()
+        if prefix == "/":
+            return self[key]
+        return frozenset(
+            ActionUrl(action.name, "{}{}".format(prefix, action.url[1:]))
+            # keep absolute urls
+            if action.url.startswith("/") and not action.url.startswith("//")
+            else action for action in self[key]
+        )
+
+    def build(self):
+        """ build complete registry, returns dict """
+        self.setup()
+        return {
+            key: self.build_item(key)
+            for key in self.contentRegistry.appearance_keys()
+        }
+
+    def generate_find_func(self, key):
+        self.setup()
+
+        def find_func(key):
+            self[key] = self.build_item(key)
             return self[key]
         self.find_func = find_func
         return self.find_func(key)
 
     def populate(self):
-        for code, content in self.contentRegistry.items():
-            for appearance in content.appearances:
-                # calls generate_find_func if required
-                self[(code, appearance["name"])]
+        for key in self.contentRegistry.appearance_keys():
+            # calls generate_find_func if required
+            self[key]
         self._populated = True
 
+    @staticmethod
+    def dump_manifest(registry):
+        return [
+            [key[0], key[1], sorted(map(list, value))]
+            for key, value in registry.items()
+        ]
+
+    @staticmethod
+    def load_manifest(data):
+        return {
+            (item[0], item[1]): frozenset(
+                ActionUrl(*action) for action in item[2]
+            )
+            for item in data
+        }
+
 
 class ContentDeletionPeriodRegistry(Registry):
     contentRegistry = None
@@ -334,33 +429,193 @@ class ContentDeletionPeriodRegistry(Registry):
         }
         super().__init__()
 
-    def generate_find_func(self, key):
+    def get_settings_periods(self):
         from django.conf import settings
-        self.update(
-            getattr(
-                settings, "SPIDER_CONTENTS_DELETION_PERIODS", {}
-            )
+        return getattr(
+            settings, "SPIDER_CONTENTS_DELETION_PERIODS", {}
         )
 
+    def build_item(self, key):
+        deletion_period = self.contentRegistry[key[0]].deletion_period
+        if callable(deletion_period):
+            return deletion_period(key[1])
+        return deletion_period
+
+    def build(self):
+        """ build complete registry, returns dict """
+        ret = {}
+        for key in self.contentRegistry.appearance_keys():
+            ret[key] = self.build_item(key)
+        # settings have precedence
+        ret.update(self.get_settings_periods())
+        return ret
+
+    def generate_find_func(self, key):
+        self.update(self.get_settings_periods())
+
         def find_func(key):
-            deletion_period = self.contentRegistry[key[0]].deletion_period
-            if callable(deletion_period):
-                self[key] = deletion_period(key[1])
-            else:
-                self[key] = deletion_period
+            self[key] = self.build_item(key)
             return self[key]
         self.find_func = find_func
         return self.find_func(key)
 
     def populate(self):
-        for code, content in self.contentRegistry.items():
-            for appearance in content.appearances:
-                # calls generate_find_func if required
-                self[(code, appearance["name"])]
+        for key in self.contentRegistry.appearance_keys():
+            # calls generate_find_func if required
+            self[key]
         self._populated = True
 
+    @staticmethod
+    def dump_manifest(registry):
+        ret = []
+        for key, value in registry.items():
+            if value is not None and not isinstance(value, timedelta):
+                raise ValueError("not serializable: %r" % value)
+            ret.append([
+                list(key) if isinstance(key, tuple) else key,
+                value.total_seconds() if value is not None else None
+            ])
+        return ret
+
+    @staticmethod
+    def load_manifest(data):
+        return {
+            tuple(key) if isinstance(key, list) else key:
+                timedelta(seconds=value) if value is not None else None
+            for key, value in data
+        }
+
 
 protections = ProtectionRegistry()
 contents = ContentRegistry()
 feature_urls = FeatureUrlsRegistry(contents)
 content_deletion_periods = ContentDeletionPeriodRegistry(contents)
+
+
+def get_manifest_signature():
+    """ changes if installed apps, their versions or settings change """
+    from django.apps import apps
+    from django.conf import settings
+    try:
+        from importlib import metadata
+    except ImportError:
+        metadata = None
+    versions = []
+    for app in apps.get_app_configs():
+        version = getattr(app.module, "__version__", None)
+        if not version and metadata:
+            try:
+                version = metadata.version(app.name.split(".", 1)[0])
+            except metadata.PackageNotFoundError:
+                pass
+        versions.append([app.name, version])
+    return hashlib.sha256(json.dumps([
+        versions,
+        settings.ROOT_URLCONF,
+        getattr(settings, "FORCE_SCRIPT_NAME", None),
+        getattr(settings, "DOMAINAUTH_URL", None),
+        repr(getattr(settings, "SPIDER_CONTENTS_DELETION_PERIODS", {})),
+    ], default=str).encode("utf8")).hexdigest()
+
+
+def _load_manifest(path, signature):
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("signature") != signature:
+        logger.info("registry manifest outdated: %s", path)
+        return None
+    return data
+
+
+def _write_manifest(path, data):
+    tmppath = "%s.tmp%s" % (path, os.getpid())
+    try:
+        with open(tmppath, "w") as f:
+            json.dump(data, f)
+        os.replace(tmppath, path)
+    except (OSError, ValueError):
+        logger.warning("could not write registry manifest", exc_info=True)
+        try:
+            os.unlink(tmppath)
+        except OSError:
+            pass
+
+
+def _build_registry(registry, name, manifest, new_data):
+    built = registry.build()
+    if manifest:
+        try:
+            new_data[name] = registry.dump_manifest(built)
+        except ValueError:
+            # not cacheable, build on every start
+            new_data[name] = None
+    return built
+
+
+def warmup(manifest=None, defer_urls=False):
+    """
+        build and freeze all registries,
+        manifest: path for caching derived registries (feature urls,
+                  deletion periods)
+        defer_urls: resolve feature urls (if not cached in manifest) on
+                    first use, the urlconf cannot be loaded with the apps
+        returns build time in seconds per registry
+    """
+    timings = {}
+    start = time.monotonic()
+    protections.populate()
+    protections.freeze()
+    timings["protections"] = time.monotonic() - start
+
+    start = time.monotonic()
+    contents.populate()
+    contents.freeze()
+    timings["contents"] = time.monotonic() - start
+
+    data = None
+    signature = None
+    if manifest:
+        signature = get_manifest_signature()
+        data = _load_manifest(manifest, signature)
+    new_data = {"signature": signature}
+    deferred = False
+    for name, registry in [
+        ("feature_urls", feature_urls),
+        ("content_deletion_periods", content_deletion_periods)
+    ]:
+        start = time.monotonic()
+        built = None
+        if data and data.get(name) is not None:
+            built = registry.load_manifest(data[name])
+            new_data[name] = data[name]
+        elif defer_urls and name == "feature_urls":
+            deferred = True
+            registry.defer(functools.partial(
+                _build_deferred, registry, name, manifest, new_data
+            ))
+            continue
+        else:
+            built = _build_registry(registry, name, manifest, new_data)
+        if name == "feature_urls":
+            registry.setup()
+        registry.freeze(built)
+        timings[name] = time.monotonic() - start
+    if manifest and not deferred and new_data != data:
+        _write_manifest(manifest, new_data)
+    for name, took in timings.items():
+        logger.info("registry %s built in %.4f s", name, took)
+    return timings
+
+
+def _build_deferred(registry, name, manifest, new_data):
+    start = time.monotonic()
+    built = _build_registry(registry, name, manifest, new_data)
+    if manifest:
+        _write_manifest(manifest, new_data)
+    logger.info(
+        "registry %s built in %.4f s", name, time.monotonic() - start
+    )
+    return built
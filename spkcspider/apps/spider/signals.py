@@ -2,7 +2,8 @@ __all__ = (
     "UpdateSpiderCb", "InitUserCb", "update_dynamic",
     "DeleteContentCb", "CleanupCb", "failed_guess",
     "UpdateContentCb", "UpdateAnchorComponentCb",
-    "FeaturesCb", "DeleteFilesCb"
+    "FeaturesCb", "DeleteFilesCb", "InvalidateViewModelCb",
+    "MarkPublicComponentCb", "InvalidatePublicIndexCb", "request_stats"
 )
 import logging
 
@@ -15,18 +16,31 @@ from django.dispatch import Signal
 from spkcspider.constants import ProtectionStateType, VariantType
 from spkcspider.utils.security import create_b64_id_token
 from . import registry
+from .viewmodels import (
+    invalidate_component_viewmodel, invalidate_public_index
+)
 
 logger = logging.getLogger(__name__)
 
 update_dynamic = Signal(providing_args=[])
 # failed guess of token
 failed_guess = Signal(providing_args=["request"])
+# stats of request (RequestStatsMiddleware)
+request_stats = Signal(providing_args=["stats"])
 
 _empty_set = frozenset()
 _feature_update_actions = frozenset({
     "init", "post_add", "post_remove", "post_clear"
 })
 
+_viewmodel_invalidate_actions = frozenset({
+    None, "post_add", "post_remove", "post_clear"
+})
+
+_travelprotection_types = frozenset({
+    "TravelProtection", "SelfProtection"
+})
+
 _ignored_features_for_update = frozenset({
     "DefaultActions", "DomainMode"
 })
@@ -122,6 +136,82 @@ def CleanupCb(sender, instance, **kwargs):
             user.spider_info.save()
 
 
+def _viewmodel_component_ids(model, pks):
+    if model._meta.model_name == "usercomponent":
+        return list(pks)
+    UserComponent = apps.get_model("spider_base", "UserComponent")
+    if model._meta.model_name == "assignedcontent":
+        q = models.Q(contents__in=pks)
+    elif model._meta.model_name == "userinfo":
+        q = models.Q(user__spider_info__in=pks)
+    else:
+        return []
+    return UserComponent.objects.filter(q).values_list("id", flat=True)
+
+
+def InvalidateViewModelCb(
+    sender, instance, pk_set=None, model=None, action=None, raw=False,
+    **kwargs
+):
+    """
+        used for:
+        Content save & delete: action=None
+        Feature, allowed content and travel protection updates:
+            pk_set, model, action
+    """
+    if action not in _viewmodel_invalidate_actions or raw:
+        return
+    if instance._meta.model_name == "assignedcontent":
+        # works also after deletion
+        ucids = {instance.usercomponent_id}
+    else:
+        ucids = set(
+            _viewmodel_component_ids(type(instance), (instance.pk,))
+        )
+    if pk_set and model:
+        ucids.update(_viewmodel_component_ids(model, pk_set))
+    invalidate_component_viewmodel(*ucids)
+
+
+def MarkPublicComponentCb(sender, instance, raw=False, **kwargs):
+    """ pre_save: public index must be updated if component was public """
+    if raw:
+        return
+    instance._invalidate_public_index = instance.public or bool(
+        instance.pk and type(instance).objects.filter(
+            pk=instance.pk, public=True
+        ).exists()
+    )
+
+
+def InvalidatePublicIndexCb(
+    sender, instance, action=None, raw=False, **kwargs
+):
+    """
+        used for:
+        Component save (with MarkPublicComponentCb) & delete: action=None
+        Features of components: action
+        Travel protections, their timespans and protected components
+    """
+    if action not in _viewmodel_invalidate_actions or raw:
+        return
+    model_name = instance._meta.model_name
+    if model_name == "usercomponent":
+        if "created" in kwargs:
+            # post_save
+            invalidate = getattr(instance, "_invalidate_public_index", True)
+        else:
+            invalidate = instance.public
+    elif model_name == "assignedcontent":
+        invalidate = instance.ctype.name in _travelprotection_types
+    elif model_name == "attachedtimespan":
+        invalidate = instance.name == "active"
+    else:
+        invalidate = False
+    if invalidate:
+        invalidate_public_index()
+
+
 def UpdateAnchorComponentCb(sender, instance, raw=False, **kwargs):
     if raw:
         return
@@ -281,6 +371,8 @@ def UpdateSpiderCb(**_kwargs):
     UserInfo = apps.get_model("spider_base", "UserInfo")
 
     UserComponent.objects.filter(name="index").update(strength=10)
+    # bulk updates (and database flushes) send no signals
+    invalidate_public_index()
     for row in AssignedContent.objects.all():
         try:
             row.content
@@ -1,8 +1,37 @@
-__all__ = ["sitemaps", "ComponentSitemap", "ContentSitemap", "HomeSitemap"]
+"""
+Sitemaps
+pre-generated (manage.py generate_sitemaps) into storage: sitemap index and
+sections in chunks of at most limit (50000) urls (keyset paginated)
+every generation is written into an own directory, the manifest is switched
+last, files of the generation before the previous one are removed
+without generated files the django views are used
+"""
+
+__all__ = [
+    "sitemaps", "ComponentSitemap", "ContentSitemap", "HomeSitemap",
+    "generate_sitemaps", "sitemap_index_view", "sitemap_chunk_view"
+]
+
+import hashlib
+import json
+import posixpath
+import tempfile
+import uuid
+from xml.sax.saxutils import escape
 
 from django.conf import settings
 from django.contrib.sitemaps import GenericSitemap, Sitemap
+from django.contrib.sitemaps import views as sitemaps_views
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.query import QuerySet
+from django.http import FileResponse, Http404
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.cache import cache_page
+from django.views.decorators.http import condition
 
 
 class ComponentSitemap(GenericSitemap):
@@ -16,7 +45,7 @@ class ComponentSitemap(GenericSitemap):
         from .models import UserComponent
         self.queryset = UserComponent.objects.filter(
             public=True
-        )
+        ).order_by("id")
 
 
 class ContentSitemap(GenericSitemap):
@@ -30,7 +59,7 @@ class ContentSitemap(GenericSitemap):
         from .models import AssignedContent
         self.queryset = AssignedContent.objects.filter(
             usercomponent__public=True
-        ).exclude(info__contains="_unlisted")
+        ).exclude(info__contains="\x1eunlisted\x1e").order_by("id")
 
 
 class HomeSitemap(Sitemap):
@@ -51,3 +80,234 @@ sitemaps = {
     'contents': ContentSitemap,
     'home': HomeSitemap
 }
+
+
+def _get_dir():
+    return getattr(settings, "SPIDER_SITEMAP_DIR", "sitemaps")
+
+
+def _manifest_name():
+    return posixpath.join(_get_dir(), "manifest.json")
+
+
+def _chunk_name(section, chunk):
+    return "sitemap-{}-{}.xml".format(section, chunk)
+
+
+def iter_chunks(items, limit):
+    """ keyset pagination (by id) of querysets, yields lists """
+    if not isinstance(items, QuerySet):
+        items = list(items)
+        for start in range(0, len(items), limit):
+            yield items[start:start + limit]
+        return
+    items = items.order_by("id")
+    last_id = None
+    while True:
+        query = items
+        if last_id is not None:
+            query = query.filter(id__gt=last_id)
+        chunk = list(query[:limit])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < limit:
+            return
+        last_id = chunk[-1].id
+
+
+def _get_attr(sitemap, name, item):
+    attr = getattr(sitemap, name, None)
+    if callable(attr):
+        return attr(item)
+    return attr
+
+
+def _write_chunk(sitemap, chunk, hostpart, f):
+    """ writes urlset into f (binary), returns latest lastmod """
+    latest = None
+    f.write(
+        b'<?xml version="1.0" encoding="UTF-8"?>\n'
+        b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    )
+    for item in chunk:
+        lastmod = _get_attr(sitemap, "lastmod", item)
+        parts = ["<url><loc>%s</loc>" % escape(
+            hostpart + _get_attr(sitemap, "location", item)
+        )]
+        if lastmod:
+            if not latest or lastmod > latest:
+                latest = lastmod
+            parts.append("<lastmod>%s</lastmod>" % lastmod.isoformat())
+        changefreq = _get_attr(sitemap, "changefreq", item)
+        if changefreq:
+            parts.append("<changefreq>%s</changefreq>" % changefreq)
+        priority = _get_attr(sitemap, "priority", item)
+        if priority is not None:
+            parts.append("<priority>%.1f</priority>" % priority)
+        parts.append("</url>\n")
+        f.write("".join(parts).encode("utf8"))
+    f.write(b"</urlset>\n")
+    return latest
+
+
+def _save(storage, name, f):
+    """ save file, returns sha256 hex digest, saved name """
+    f.seek(0)
+    digest = hashlib.sha256()
+    for block in iter(lambda: f.read(65536), b""):
+        digest.update(block)
+    f.seek(0)
+    return digest.hexdigest(), storage.save(name, File(f))
+
+
+def _get_path(name, entry):
+    # manifests of older versions contain no path
+    return entry.get("path") or posixpath.join(_get_dir(), name)
+
+
+def _delete(storage, paths):
+    for path in paths:
+        if storage.exists(path):
+            storage.delete(path)
+
+
+def generate_sitemaps(hostpart, storage=None):
+    """
+        write sitemap index and chunked sections into storage
+        (SPIDER_SITEMAP_DIR), returns manifest
+        hostpart: e.g. https://example.com
+    """
+    if not storage:
+        storage = default_storage
+    now = timezone.now()
+    directory = posixpath.join(
+        _get_dir(), "%s-%s" % (
+            now.strftime("%Y%m%d%H%M%S"), uuid.uuid4().hex[:8]
+        )
+    )
+    old_manifest = load_manifest(storage) or {"files": {}}
+    files = {}
+    index = []
+    for section, sitemap_cls in sorted(sitemaps.items()):
+        sitemap = sitemap_cls()
+        for number, chunk in enumerate(
+            iter_chunks(sitemap.items(), getattr(
+                settings, "SPIDER_SITEMAP_LIMIT", sitemap.limit
+            )), start=1
+        ):
+            name = _chunk_name(section, number)
+            with tempfile.TemporaryFile() as f:
+                latest = _write_chunk(sitemap, chunk, hostpart, f)
+                etag, path = _save(
+                    storage, posixpath.join(directory, name), f
+                )
+            old = old_manifest["files"].get(name)
+            # unchanged chunks keep their modification date
+            if old and old["etag"] == etag:
+                modified = old["modified"]
+            else:
+                modified = now.isoformat()
+            files[name] = {"etag": etag, "modified": modified, "path": path}
+            index.append((section, number, latest))
+    with tempfile.TemporaryFile() as f:
+        f.write(
+            b'<?xml version="1.0" encoding="UTF-8"?>\n'
+            b'<sitemapindex '
+            b'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        )
+        for section, number, latest in index:
+            f.write("<sitemap><loc>{}</loc>{}</sitemap>\n".format(
+                escape(hostpart + reverse(
+                    "spider-sitemap-chunk", kwargs={
+                        "section": section, "chunk": number
+                    }
+                )),
+                "<lastmod>%s</lastmod>" % latest.isoformat() if latest else ""
+            ).encode("utf8"))
+        f.write(b"</sitemapindex>\n")
+        etag, path = _save(
+            storage, posixpath.join(directory, "sitemap.xml"), f
+        )
+    old = old_manifest["files"].get("sitemap.xml")
+    files["sitemap.xml"] = {
+        "etag": etag,
+        "modified": old["modified"] if old and old["etag"] == etag
+        else now.isoformat(),
+        "path": path
+    }
+    manifest = {
+        "generated": now.isoformat(), "files": files,
+        # previous generation, can still be served to requests which
+        # loaded the old manifest, removed with the next generation
+        "stale": [
+            _get_path(name, entry)
+            for name, entry in old_manifest["files"].items()
+        ]
+    }
+    # the manifest is the only replaced file, meanwhile the django views
+    # are used
+    if storage.exists(_manifest_name()):
+        storage.delete(_manifest_name())
+    storage.save(_manifest_name(), ContentFile(
+        json.dumps(manifest).encode("utf8")
+    ))
+    _delete(storage, old_manifest.get("stale", ()))
+    return manifest
+
+
+def load_manifest(storage=None):
+    if not storage:
+        storage = default_storage
+    try:
+        with storage.open(_manifest_name(), "rb") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _get_entry(request, name):
+    if not hasattr(request, "_spider_sitemap_manifest"):
+        request._spider_sitemap_manifest = load_manifest()
+    manifest = request._spider_sitemap_manifest
+    return manifest and manifest["files"].get(name)
+
+
+def _etag(request, name="sitemap.xml", **kwargs):
+    entry = _get_entry(request, name)
+    return entry and '"%s"' % entry["etag"]
+
+
+def _last_modified(request, name="sitemap.xml", **kwargs):
+    entry = _get_entry(request, name)
+    return entry and parse_datetime(entry["modified"])
+
+
+@condition(etag_func=_etag, last_modified_func=_last_modified)
+def _serve(request, name="sitemap.xml"):
+    entry = _get_entry(request, name)
+    if not entry:
+        raise Http404()
+    try:
+        f = default_storage.open(_get_path(name, entry), "rb")
+    except OSError:
+        # removed meanwhile
+        raise Http404()
+    return FileResponse(f, content_type="application/xml")
+
+
+# daily
+_live_index = cache_page(86400)(sitemaps_views.index)
+
+
+def sitemap_index_view(request):
+    """ pre-generated index, fallback: django index (all sections) """
+    if not _get_entry(request, "sitemap.xml"):
+        return _live_index(
+            request, sitemaps, sitemap_url_name="sitemaps"
+        )
+    return _serve(request, name="sitemap.xml")
+
+
+def sitemap_chunk_view(request, section, chunk):
+    return _serve(request, name=_chunk_name(section, chunk))
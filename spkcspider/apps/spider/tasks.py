@@ -0,0 +1,14 @@
+"""
+celery tasks, discovered by celery autodiscover_tasks
+"""
+
+__all__ = ("async_deliver",)
+
+from spkcspider import celery_app
+
+from .delivery import process_deliveries
+
+
+@celery_app.task(name="referrer delivery", ignore_result=True)
+def async_deliver():
+    process_deliveries()
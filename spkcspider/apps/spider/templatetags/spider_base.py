@@ -1,4 +1,5 @@
 from django import template
+from django.db.models import QuerySet
 from django.urls import reverse
 from django.urls.exceptions import NoReverseMatch
 from django.utils import timezone
@@ -91,4 +92,8 @@ def token_expires(usercomponent, token):
 
 @register.simple_tag(takes_context=True)
 def active_feature_names(context):
-    return context["active_features"].values_list("name", flat=True)
+    features = context["active_features"]
+    if isinstance(features, QuerySet):
+        return features.values_list("name", flat=True)
+    # cached view-model
+    return [f.name for f in features]
@@ -3,9 +3,6 @@ __all__ = ["literalize", "uriref", "spkc_namespace"]
 
 import logging
 
-from rdflib import Literal, URIRef
-from rdflib.namespace import XSD
-
 from django import template
 from spkcspider.constants import spkcgraph
 from spkcspider.utils.fields import field_to_python as _field_to_python
@@ -14,14 +11,18 @@ from spkcspider.utils.urls import merge_get_url
 
 register = template.Library()
 
+# rdflib is imported in the tags using it (slow import)
+
 
 @register.filter()
 def uriref(path):
+    from rdflib import URIRef
     return URIRef(path)
 
 
 @register.filter()
 def is_uriref(value):
+    from rdflib import URIRef
     return isinstance(value, URIRef)
 
 
@@ -37,6 +38,7 @@ def field_to_python(value):
 
 @register.simple_tag(takes_context=True)
 def action_view(context):
+    from rdflib import XSD, Literal
     token = getattr(context["request"], "auth_token", None)
     if token:
         token = token.token
@@ -4,8 +4,9 @@ from django.urls import path
 from .views import (
     OwnerTokenManagement, ComponentCreate, ComponentIndex,
     ComponentPublicIndex, ComponentUpdate, ConfirmTokenUpdate, ContentAccess,
-    ContentAdd, ContentIndex, EntityMassDeletion, RequestTokenUpdate,
-    TokenDeletionRequest, TokenRenewal, TravelProtectionManagement
+    ContentAdd, ContentIndex, EntityMassDeletion, ReferrerDeliveryStatus,
+    RequestTokenUpdate, TokenDeletionRequest, TokenRenewal,
+    TravelProtectionManagement
 )
 
 app_name = "spider_base"
@@ -20,7 +21,7 @@ urlpatterns = [
         name='ucomponent-export'
     ),
     path(
-        'components/slug:user>/export/',
+        'components/<slug:user>/export/',
         login_required(ComponentIndex.as_view(scope="export")),
         name='ucomponent-export'
     ),
@@ -100,6 +101,11 @@ urlpatterns = [
         TokenDeletionRequest.as_view(),
         name='token-delete-request'
     ),
+    path(
+        'token/delivery/<slug:delivery>/',
+        ReferrerDeliveryStatus.as_view(),
+        name='referrer-delivery'
+    ),
     path(
         'token/renew/',
         TokenRenewal.as_view(),
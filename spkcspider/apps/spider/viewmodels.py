@@ -0,0 +1,205 @@
+"""
+Cached view-models
+component view-model: variant and feature sets shown in the content index
+public index: result ids and rendered list of public component index pages
+"""
+
+__all__ = (
+    "get_component_viewmodel", "invalidate_component_viewmodel",
+    "get_public_index_entry", "set_public_index_entry",
+    "invalidate_public_index", "claim_public_index_sweep"
+)
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models, transaction
+from django.utils import timezone
+from spkcspider.constants import VariantType
+from spkcspider.utils.security import create_b64_token
+
+from . import metrics
+from .queryfilters import (
+    listed_variants_q, machine_variants_q, travelprotection_types_q
+)
+
+_public_index_generation_key = "spkc_pubidx_gen"
+
+
+def _get_cache():
+    return caches[getattr(settings, "SPIDER_VIEWMODEL_CACHE", "default")]
+
+
+def _generation_key(ucid):
+    return "spkc_ucvm_gen:%s" % ucid
+
+
+def invalidate_component_viewmodel(*ucids):
+    """
+        invalidate cached view-models of components
+        old entries are unreachable afterwards and expire
+    """
+    if ucids:
+        _get_cache().delete_many([_generation_key(i) for i in set(ucids)])
+
+
+def _get_generation(cache, key):
+    generation = cache.get(key)
+    if generation is None:
+        # add: don't overwrite generation of concurrent request
+        cache.add(key, create_b64_token(), None)
+        generation = cache.get(key, "")
+    return generation
+
+
+def _build_viewmodel(usercomponent, travel_ids, is_owner):
+    from .models import AssignedContent
+    features = list(usercomponent.features.all())
+    viewmodel = {
+        "active_features": features,
+        "visible_active_features": [
+            f for f in features
+            if VariantType.unlisted.value not in f.ctype
+        ],
+        "allow_domain_mode": any(
+            f.name == "DomainMode" for f in features
+        ),
+        # priority higher than 0 is visible
+        "has_unlisted": usercomponent.contents.filter(
+            info__contains="\x1eunlisted\x1e", priority__lte=0
+        ).exclude(travel_protected__in=travel_ids).exists()
+    }
+    if is_owner:
+        used = AssignedContent.objects.filter(
+            usercomponent=usercomponent, ctype=models.OuterRef("pk")
+        ).exclude(travel_protected__in=travel_ids)
+        variants = \
+            usercomponent.user.spider_info.allowed_content.filter(
+                listed_variants_q | machine_variants_q
+            ).annotate(
+                is_listed=models.Case(
+                    models.When(listed_variants_q, then=models.Value(True)),
+                    default=models.Value(False),
+                    output_field=models.BooleanField()
+                ),
+                is_used=models.Exists(used)
+            )
+        viewmodel["content_variants"] = []
+        viewmodel["machine_variants"] = []
+        viewmodel["content_variants_used"] = []
+        for variant in variants:
+            if variant.is_listed:
+                viewmodel["content_variants"].append(variant)
+                if variant.is_used:
+                    viewmodel["content_variants_used"].append(variant)
+            if VariantType.machine.value in variant.ctype:
+                viewmodel["machine_variants"].append(variant)
+    return viewmodel
+
+
+def get_component_viewmodel(usercomponent, travel, is_owner):
+    """
+        variant and feature sets of usercomponent
+        cached per (component, modified, owner flag, active travel
+        protections), invalidated by content and feature changes
+    """
+    travel_ids = sorted(travel.values_list("id", flat=True))
+    cache = _get_cache()
+    key = "spkc_ucvm:%s" % hashlib.sha256(
+        "{}:{}:{}:{}:{}".format(
+            usercomponent.id,
+            _get_generation(cache, _generation_key(usercomponent.id)),
+            usercomponent.modified.timestamp(),
+            int(bool(is_owner)),
+            ",".join(map(str, travel_ids))
+        ).encode("ascii")
+    ).hexdigest()
+    viewmodel = cache.get(key)
+    metrics.cache_requests.inc(
+        cache="viewmodel", result="miss" if viewmodel is None else "hit"
+    )
+    if viewmodel is None:
+        viewmodel = _build_viewmodel(usercomponent, travel_ids, is_owner)
+        cache.set(
+            key, viewmodel,
+            getattr(settings, "SPIDER_VIEWMODEL_TIMEOUT", 600)
+        )
+    return viewmodel
+
+
+def invalidate_public_index():
+    """
+        invalidate cached public index pages (after commit, so the
+        new generation cannot be filled with old data)
+    """
+    transaction.on_commit(
+        lambda: _get_cache().delete(_public_index_generation_key)
+    )
+
+
+def _public_index_key(cache, parts):
+    return "spkc_pubidx:%s" % hashlib.sha256(
+        "\x1e".join(map(str, (
+            _get_generation(cache, _public_index_generation_key), *parts
+        ))).encode("utf8")
+    ).hexdigest()
+
+
+def _get_public_index_timeout(search):
+    """
+        timeout capped at the next start/stop of unconditional travel
+        protections (activation is time based)
+    """
+    from .models import AssignedContent, AttachedTimespan
+    if search:
+        timeout = getattr(settings, "SPIDER_PUBLIC_INDEX_SEARCH_TIMEOUT", 30)
+    else:
+        timeout = getattr(settings, "SPIDER_PUBLIC_INDEX_TIMEOUT", 300)
+    now = timezone.now()
+    travel = AssignedContent.objects.filter(
+        travelprotection_types_q, info__contains="\x1eactive\x1e"
+    ).exclude(info__contains="\x1epwhash=")
+    boundaries = [
+        boundary
+        for boundaries in AttachedTimespan.objects.filter(
+            models.Q(start__gt=now) | models.Q(stop__gt=now),
+            name="active", content__in=travel
+        ).values_list("start", "stop")
+        for boundary in boundaries
+        if boundary and boundary > now
+    ]
+    if boundaries:
+        timeout = min(
+            timeout, max(1, int((min(boundaries) - now).total_seconds()))
+        )
+    return timeout
+
+
+def get_public_index_entry(parts):
+    """ entry of public index (parts: page, search, ...) or None """
+    cache = _get_cache()
+    return cache.get(_public_index_key(cache, parts))
+
+
+def set_public_index_entry(parts, entry, search=False):
+    """
+        cache entry of public index, search results expire after
+        SPIDER_PUBLIC_INDEX_SEARCH_TIMEOUT
+    """
+    cache = _get_cache()
+    cache.set(
+        _public_index_key(cache, parts), entry,
+        _get_public_index_timeout(search)
+    )
+
+
+def claim_public_index_sweep():
+    """
+        True at most every SPIDER_PUBLIC_INDEX_SWEEP_INTERVAL seconds
+        (removal of expired entities by the public index)
+    """
+    return _get_cache().add(
+        "spkc_pubidx_sweep", True,
+        getattr(settings, "SPIDER_PUBLIC_INDEX_SWEEP_INTERVAL", 60)
+    )
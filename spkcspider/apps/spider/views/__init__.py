@@ -2,5 +2,7 @@ from ._components import *  # noqa: F403, F401
 from ._contents import *  # noqa: F403, F401
 from ._core import *  # noqa: F403, F401
 from ._deletion import *  # noqa: F403, F401
+from ._metrics import *  # noqa: F403, F401
+from ._profiles import *  # noqa: F403, F401
 from ._referrer import *  # noqa: F403, F401
 from ._tokens import *  # noqa: F403, F401
@@ -10,11 +10,12 @@ from django.db import models
 from django.forms.widgets import Media
 from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.urls import reverse
-from django.utils.translation import gettext
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language, gettext
 from django.views.generic.edit import CreateView, UpdateView
 from django.views.generic.list import ListView
-from rdflib import XSD, Graph, Literal, URIRef
 
 from spkcspider.constants import VariantType, spkcgraph
 from spkcspider.utils.urls import merge_get_url
@@ -25,7 +26,9 @@ from ..queryfilters import (
     filter_components, filter_contents, listed_variants_q,
     loggedin_active_tprotections_q, machine_variants_q
 )
-from ..serializing import paginate_stream, serialize_stream
+from ..viewmodels import (
+    claim_public_index_sweep, get_public_index_entry, set_public_index_entry
+)
 from ._core import ExpiryMixin, UCTestMixin, UserTestMixin
 
 _extra = '' if settings.DEBUG else '.min'
@@ -48,12 +51,14 @@ class ComponentIndexBase(ExpiryMixin, ListView):
         )
         return super().get_context_data(**kwargs)
 
+    def get_searchlist(self):
+        if "search" in self.request.POST:
+            return self.request.POST.getlist("search")
+        return self.request.GET.getlist("search")
+
     def get_queryset_components(self, use_contents=True):
         order = None
-        if "search" in self.request.POST:
-            searchlist = self.request.POST.getlist("search")
-        else:
-            searchlist = self.request.GET.getlist("search")
+        searchlist = self.get_searchlist()
 
         filter_unlisted = not (
                 self.request.is_special_user and "_unlisted" in searchlist
@@ -75,10 +80,7 @@ class ComponentIndexBase(ExpiryMixin, ListView):
         return ret
 
     def get_queryset_contents(self):
-        if "search" in self.request.POST:
-            searchlist = self.request.POST.getlist("search")
-        else:
-            searchlist = self.request.GET.getlist("search")
+        searchlist = self.get_searchlist()
 
         filter_unlisted = not (
                 self.request.is_special_user and "_unlisted" in searchlist
@@ -117,6 +119,9 @@ class ComponentIndexBase(ExpiryMixin, ListView):
     def render_to_response(self, context):
         if self.scope != "export" and "raw" not in self.request.GET:
             return super().render_to_response(context)
+        # rdf only, slow imports
+        from rdflib import XSD, Graph, Literal, URIRef
+        from ..serializing import paginate_stream, serialize_stream
 
         embed = (
             self.scope == "export" or
@@ -202,15 +207,42 @@ class ComponentIndexBase(ExpiryMixin, ListView):
             g.serialize(format="turtle"),
             content_type="text/turtle;charset=utf-8"
         )
+        # for RequestStatsMiddleware
+        ret.serialized_triples = len(g)
         ret["Access-Control-Allow-Origin"] = "*"
         return ret
 
 
+class _CachedPageResult(object):
+    """ paginator input of a cached page: total count, page objects """
+
+    def __init__(self, count, objects):
+        self._count = count
+        self.objects = objects
+
+    def count(self):
+        return self._count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, key):
+        # only objects of the cached page are available
+        return self.objects
+
+
 class ComponentPublicIndex(ComponentIndexBase):
+    """
+        page results (ids) are cached for all users, search results shortly,
+        the list is cached rendered for anonymous requests without search
+        (see viewmodels)
+    """
     model = UserComponent
     is_home = False
     source_strength = 0
     preserved_GET_parameters = {"search", "id", "protection"}
+    # set by paginate_queryset if cacheable
+    index_cache_parts = None
 
     sanitize_GET = UserTestMixin.sanitize_GET
 
@@ -219,9 +251,44 @@ class ComponentPublicIndex(ComponentIndexBase):
         self.request.is_special_user = False
         self.request.is_staff = False
         self.request.auth_token = None
-        self.remove_old_entities(5)
+        # throttled
+        if claim_public_index_sweep():
+            self.remove_old_entities(5)
         return super().dispatch(request, *args, **kwargs)
 
+    def paginate_queryset(self, queryset, page_size):
+        if "raw" in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+        searchlist = self.get_searchlist()
+        self.index_cache_parts = (
+            self.is_home,
+            self.kwargs.get(self.page_kwarg) or
+            self.request.GET.get(self.page_kwarg) or 1,
+            self.request.GET.get("protection", "") == "false",
+            *sorted(set(searchlist))
+        )
+        entry = get_public_index_entry(self.index_cache_parts)
+        if entry is None:
+            ret = super().paginate_queryset(queryset, page_size)
+            set_public_index_entry(self.index_cache_parts, {
+                "ids": [uc.id for uc in ret[2]],
+                "count": ret[0].count,
+                "number": ret[1].number
+            }, search=bool(searchlist))
+            return ret
+        objects = UserComponent.objects.select_related(
+            "user"
+        ).prefetch_related("features").in_bulk(entry["ids"])
+        paginator = self.get_paginator(
+            _CachedPageResult(entry["count"], [
+                # deleted meanwhile
+                objects[i] for i in entry["ids"] if i in objects
+            ]), page_size, orphans=self.get_paginate_orphans(),
+            allow_empty_first_page=self.get_allow_empty()
+        )
+        page = paginator.page(entry["number"])
+        return paginator, page, page.object_list, page.has_other_pages()
+
     def post(self, request, *args, **kwargs):
         return self.get(request, *args, **kwargs)
 
@@ -238,7 +305,25 @@ class ComponentPublicIndex(ComponentIndexBase):
             )
         else:
             kwargs["sanitized_GET"] = ""
-        return super().get_context_data(**kwargs)
+        context = super().get_context_data(**kwargs)
+        if (
+            self.index_cache_parts and
+            not self.request.user.is_authenticated and
+            not self.get_searchlist()
+        ):
+            parts = (
+                *self.index_cache_parts, "rendered", get_language(),
+                context["hostpart"]
+            )
+            rendered = get_public_index_entry(parts)
+            if rendered is None:
+                rendered = render_to_string(
+                    "spider_base/partials/usercomponent_list_fragment.html",
+                    context, self.request
+                )
+                set_public_index_entry(parts, rendered)
+            context["rendered_object_list"] = mark_safe(rendered)
+        return context
 
     def get_queryset_components(self, use_contents=True):
         query = super().get_queryset_components(use_contents)
@@ -342,7 +427,7 @@ class ComponentIndex(UCTestMixin, ComponentIndexBase):
 
         # doesn't matter if it is same user, lazy
         travel = self.get_travel_for_request()
-        t_ids = travel.values_list("associated__id", flat=True)
+        t_ids = travel.values_list("id", flat=True)
         travel = travel.filter(
             loggedin_active_tprotections_q
         )
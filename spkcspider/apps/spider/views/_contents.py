@@ -21,7 +21,6 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.generic.edit import CreateView, UpdateView
 from django.views.generic.list import ListView
 from next_prev import next_in_order, prev_in_order
-from rdflib import XSD, Graph, Literal, URIRef
 
 from spkcspider.constants import VariantType, spkcgraph, static_token_matcher
 from spkcspider.utils.fields import add_property
@@ -36,7 +35,7 @@ from ..queryfilters import (
     filter_contents, listed_variants_q, loggedin_active_tprotections_q,
     machine_variants_q
 )
-from ..serializing import paginate_stream, serialize_stream
+from ..viewmodels import get_component_viewmodel
 from ._core import UCTestMixin, UserTestMixin
 from ._referrer import ReferrerMixin
 
@@ -54,6 +53,28 @@ class ContentBase(UCTestMixin):
     # use token of content object instead
     no_token_usercomponent = True
 
+    def get_embed_validators(self, ids):
+        """
+            validators of contents serialized with raw=embed
+            (referenced contents included), returns (parts, last modified)
+        """
+        from ..serializing import references_q
+        stats = AssignedContent.objects.filter(
+            references_q(ids, settings.SPIDER_MAX_EMBED_DEPTH)
+        ).aggregate(
+            latest=models.Max("modified"),
+            latest_component=models.Max("usercomponent__modified"),
+            count=models.Count("id", distinct=True),
+            ids=models.Sum("id", distinct=True)
+        )
+        return (
+            (stats["count"], stats["ids"]),
+            max(
+                filter(None, (stats["latest"], stats["latest_component"])),
+                default=None
+            )
+        )
+
     def dispatch(self, request, *args, **kwargs):
         try:
             return super().dispatch(request, *args, **kwargs)
@@ -63,6 +84,11 @@ class ContentBase(UCTestMixin):
                 "spkcspider.apps.spider.functions.rate_limit_default"
             )(request, self)
 
+    def update_not_modified(self, response):
+        super().update_not_modified(response)
+        # allow cors requests for raw
+        response["Access-Control-Allow-Origin"] = "*"
+
     def get_template_names(self):
         if self.scope in ("add", "update"):
             return ['spider_base/assignedcontent_form.html']
@@ -169,15 +195,48 @@ class ContentIndex(ReferrerMixin, ContentBase, ListView):
     def dispatch_extra(self, request, *args, **kwargs):
         if self.remove_old_entities(self.usercomponent):
             raise Http404()
-        self.allow_domain_mode = ContentVariant.objects.filter(
-            feature_for_components=self.usercomponent,
-            name="DomainMode"
-        ).exists()
+        self.viewmodel = get_component_viewmodel(
+            self.usercomponent,
+            self.get_travel_for_request().filter(
+                loggedin_active_tprotections_q
+            ),
+            self.request.is_owner
+        )
+        self.allow_domain_mode = self.viewmodel["allow_domain_mode"]
         if "referrer" in self.request.GET:
             self.object_list = self.get_queryset()
             return self.handle_referrer()
         return None
 
+    def get_validators(self):
+        if "raw" not in self.request.GET:
+            return None
+        # count: detect deletions
+        stats = self.usercomponent.contents.aggregate(
+            latest=models.Max("modified"), count=models.Count("id")
+        )
+        last_modified = self.usercomponent.modified
+        if stats["latest"]:
+            last_modified = max(last_modified, stats["latest"])
+        parts = (
+            self.usercomponent.id, last_modified, stats["count"],
+            sorted(
+                self.get_travel_for_request().values_list(
+                    "id", flat=True
+                )
+            ),
+            [f.id for f in self.viewmodel["active_features"]]
+        )
+        # embed: dereferenced contents can be in other components
+        if self.request.GET["raw"] == "embed":
+            embed_parts, embed_modified = self.get_embed_validators(
+                self.get_queryset().values_list("id", flat=True)
+            )
+            parts += embed_parts
+            if embed_modified:
+                last_modified = max(last_modified, embed_modified)
+        return (parts, last_modified)
+
     def get_queryset(self):
         travel = self.get_travel_for_request()
         t_ids = travel.values_list("id", flat=True)
@@ -208,38 +267,21 @@ class ContentIndex(ReferrerMixin, ContentBase, ListView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        travel = self.get_travel_for_request().filter(
-            loggedin_active_tprotections_q
-        )
         if self.request.is_owner:
             # request.user is maybe anonymous
             context["content_variants"] = \
-                self.usercomponent.user.spider_info.allowed_content.filter(
-                    listed_variants_q
-                )
+                self.viewmodel["content_variants"]
             context["machine_variants"] = \
-                self.usercomponent.user.spider_info.allowed_content.filter(
-                    machine_variants_q
-                )
+                self.viewmodel["machine_variants"]
             context["content_variants_used"] = \
-                context["content_variants"].filter(
-                    ~models.Q(assignedcontent__travel_protected__in=travel),
-                    assignedcontent__usercomponent=self.usercomponent
-                )
-        context["active_features"] = self.usercomponent.features.all()
+                self.viewmodel["content_variants_used"]
+        context["active_features"] = self.viewmodel["active_features"]
         context["visible_active_features"] = \
-            context["active_features"].exclude(
-                ctype__contains=VariantType.unlisted
-            )
+            self.viewmodel["visible_active_features"]
         context["is_public_view"] = self.usercomponent.public
         # non-special users should not see the hint
-        context["has_unlisted"] = False
-        if self.request.is_special_user:
-            # check if unlisted contents exist
-            # priority higher than 0 is visible
-            context["has_unlisted"] = self.usercomponent.contents.filter(
-                info__contains="\x1eunlisted\x1e", priority__lte=0
-            ).exclude(travel_protected__in=travel).exists()
+        context["has_unlisted"] = \
+            self.request.is_special_user and self.viewmodel["has_unlisted"]
 
         context["remotelink"] = "{}{}?".format(
             context["hostpart"],
@@ -295,6 +337,9 @@ class ContentIndex(ReferrerMixin, ContentBase, ListView):
     def render_to_response(self, context):
         if context["scope"] != "export" and "raw" not in self.request.GET:
             return super().render_to_response(context)
+        # rdf only, slow imports
+        from rdflib import XSD, Graph, Literal, URIRef
+        from ..serializing import paginate_stream, serialize_stream
 
         session_dict = {
             "request": self.request,
@@ -415,6 +460,8 @@ class ContentIndex(ReferrerMixin, ContentBase, ListView):
             g.serialize(format="turtle"),
             content_type="text/turtle;charset=utf-8"
         )
+        # for RequestStatsMiddleware
+        ret.serialized_triples = len(g)
 
         if session_dict.get("expires", None):
             ret['X-Token-Expires'] = session_dict["expires"]
@@ -591,6 +638,26 @@ class ContentAccess(ReferrerMixin, ContentBase, UpdateView):
 
         return None
 
+    def get_validators(self):
+        # download: files are only changed by saving the content
+        if self.scope != "download" and (
+            self.scope != "view" or "raw" not in self.request.GET
+        ):
+            return None
+        last_modified = max(
+            self.object.modified, self.usercomponent.modified
+        )
+        parts = (self.object.id, last_modified, self.allow_domain_mode)
+        # embed: dereferenced contents can be in other components
+        if self.scope == "view" and self.request.GET["raw"] == "embed":
+            embed_parts, embed_modified = self.get_embed_validators(
+                [self.object.id]
+            )
+            parts += embed_parts
+            if embed_modified:
+                last_modified = max(last_modified, embed_modified)
+        return (parts, last_modified)
+
     @method_decorator(csrf_exempt)
     def dispatch(self, request, *args, **kwargs):
         _scope = kwargs["access"]
@@ -1,7 +1,9 @@
 __all__ = (
     "UserTestMixin", "UCTestMixin", "DefinitionsMixin"
 )
+import hashlib
 import logging
+from calendar import timegm
 from urllib.parse import quote_plus
 
 from django.conf import settings
@@ -14,6 +16,8 @@ from django.http.response import HttpResponseBase
 from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from django.utils.translation import gettext
 
 from spkcspider.constants import (
@@ -22,6 +26,7 @@ from spkcspider.constants import (
 
 from spkcspider.utils.urls import merge_get_url
 
+from .. import metrics
 from ..models import AssignedContent, AuthToken, UserComponent
 from ..queryfilters import loggedin_active_tprotections_q
 
@@ -195,6 +200,8 @@ class UserTestMixin(ExpiryMixin, AccessMixin):
     # don't allow AccessMixin to redirect, handle in test_token
     raise_exception = True
     _travel_request = None
+    # etag, last modified (timestamp) of conditional GET
+    validators = None
 
     def setup(self, request, *args, **kwargs):
         super().setup(request, *args, **kwargs)
@@ -228,7 +235,67 @@ class UserTestMixin(ExpiryMixin, AccessMixin):
         )
         if ret:
             return ret
-        return super().dispatch(request, *args, **kwargs)
+        ret = self.conditional_response()
+        if ret:
+            return ret
+        ret = super().dispatch(request, *args, **kwargs)
+        if self.validators and ret.status_code == 200:
+            ret.setdefault("ETag", self.validators[0])
+            ret.setdefault("Last-Modified", http_date(self.validators[1]))
+        return ret
+
+    def get_validators(self):
+        """
+            validators of machine readable responses (conditional GET),
+            returns (etag parts, last modified datetime) or None (disabled)
+            checked after authorization, before serialization
+        """
+        return None
+
+    def conditional_response(self):
+        """ returns 304 response if client has current response """
+        if self.request.method not in {"GET", "HEAD"}:
+            return None
+        validators = self.get_validators()
+        if not validators:
+            return None
+        parts, last_modified = validators
+        token = self.request.auth_token
+        if token:
+            # token renewal changes X-Token-Expires
+            last_modified = max(last_modified, token.created)
+        parts = (
+            getattr(self, "scope", None), self.request.get_full_path(),
+            token.token if token else None,
+            str(getattr(self.request, "token_expires", None)),
+            self.request.user.pk, self.request.is_owner,
+            self.request.is_special_user, self.request.is_staff,
+            *parts
+        )
+        self.validators = (
+            quote_etag(
+                hashlib.sha256(repr(parts).encode("utf8")).hexdigest()
+            ),
+            timegm(last_modified.utctimetuple())
+        )
+        ret = get_conditional_response(
+            self.request, etag=self.validators[0],
+            last_modified=self.validators[1]
+        )
+        if ret is not None:
+            if ret.status_code == 304:
+                ret["ETag"] = self.validators[0]
+                ret["Last-Modified"] = http_date(self.validators[1])
+            self.update_not_modified(ret)
+        return ret
+
+    def update_not_modified(self, response):
+        """ add headers of full response to 304 response """
+        if hasattr(self.request, "token_expires"):
+            response['X-Token-Expires'] = \
+                self.request.token_expires.strftime(
+                    "%a, %d %b %Y %H:%M:%S %z"
+                )
 
     def sanitize_GET(self):
         GET = self.request.GET.copy()
@@ -287,9 +354,12 @@ class UserTestMixin(ExpiryMixin, AccessMixin):
     def remove_old_tokens(self, expire=None):
         if not expire:
             expire = timezone.now()-self.usercomponent.token_duration
-        return self.usercomponent.authtokens.filter(
+        ret = self.usercomponent.authtokens.filter(
             created__lt=expire, persist=-1
         ).delete()
+        if ret[0]:
+            metrics.tokens_swept.inc(ret[1].get(AuthToken._meta.label, 0))
+        return ret
 
     def test_token(self, minstrength=0, force_token=False, taint=False):
         expire = timezone.now()-self.usercomponent.token_duration
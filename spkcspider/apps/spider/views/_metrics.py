@@ -0,0 +1,40 @@
+__all__ = ("MetricsView",)
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import never_cache
+from django.views.generic.base import View
+from spkcspider.utils.metrics import registry
+from spkcspider.utils.settings import get_settings_func
+
+# ensure all metrics are registered
+from .. import metrics  # noqa: F401
+
+
+@method_decorator(never_cache, name="dispatch")
+class MetricsView(View):
+    """
+        prometheus text exposition, only for staff (admin permission) or
+        SPIDER_METRICS_ALLOWED_IPS
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not getattr(settings, "SPIDER_METRICS", False):
+            raise Http404()
+        if request.META.get("REMOTE_ADDR") not in getattr(
+            settings, "SPIDER_METRICS_ALLOWED_IPS", ()
+        ) and not get_settings_func(
+            "HAS_ADMIN_PERMISSION_FUNC",
+            "spkcspider.apps.spider.functions.has_admin_permission"
+        )(admin.site, request):
+            raise PermissionDenied()
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(
+            registry.exposition(),
+            content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
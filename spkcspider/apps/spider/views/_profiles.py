@@ -0,0 +1,58 @@
+__all__ = ("RequestProfileIndex", "RequestProfileDownload")
+
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse
+from django.views.generic.base import TemplateView, View
+
+from ..profiling import get_profile, get_profiles
+
+
+class RequestProfileMixin(object):
+    """ wrap with admin.site.admin_view (admin permission) """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_superuser:
+            raise PermissionDenied()
+        return super().dispatch(request, *args, **kwargs)
+
+
+class RequestProfileIndex(RequestProfileMixin, TemplateView):
+    template_name = "spider_base/admin/request_profiles.html"
+
+    def get_context_data(self, **kwargs):
+        kwargs.update(admin.site.each_context(self.request))
+        kwargs["title"] = "Request profiles"
+        kwargs["profiles"] = get_profiles()
+        return super().get_context_data(**kwargs)
+
+
+class RequestProfileDownload(RequestProfileMixin, View):
+    # kind: (extension, content type)
+    kinds = {
+        "pstats": ("prof", "application/octet-stream"),
+        "collapsed": ("collapsed.txt", "text/plain;charset=utf-8"),
+        "sql": ("sql.txt", "text/plain;charset=utf-8")
+    }
+
+    def get(self, request, *args, **kwargs):
+        if kwargs["kind"] not in self.kinds:
+            raise Http404()
+        profile = get_profile(kwargs["id"])
+        if not profile:
+            raise Http404()
+        if kwargs["kind"] == "pstats":
+            content = profile["pstats"]
+        elif kwargs["kind"] == "collapsed":
+            content = profile["collapsed"]
+        else:
+            content = "".join(
+                "-- %s ms%s\n%s;\n" % (
+                    duration, " (many)" if many else "", sql
+                ) for sql, duration, many in profile["queries"]
+            )
+        extension, content_type = self.kinds[kwargs["kind"]]
+        ret = HttpResponse(content, content_type=content_type)
+        ret["Content-Disposition"] = \
+            'attachment; filename="profile-%s.%s"' % (profile["id"], extension)
+        return ret
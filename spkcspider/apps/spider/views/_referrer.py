@@ -5,8 +5,6 @@ import hashlib
 import logging
 from urllib.parse import quote_plus
 
-import requests
-
 import ratelimit
 from django.conf import settings
 from django.contrib.auth import REDIRECT_FIELD_NAME
@@ -16,14 +14,15 @@ from django.forms.widgets import Media
 from django.http import (
     HttpResponse, HttpResponseRedirect, HttpResponseServerError
 )
-from django.test import Client
+from django.urls import reverse
 from django.utils.translation import gettext
 from spkcspider.constants import TokenCreationError
 from spkcspider.utils.security import get_hashob
 from spkcspider.utils.settings import get_settings_func
 from spkcspider.utils.urls import merge_get_url
 
-from ..conf import VALID_INTENTIONS, VALID_SUB_INTENTIONS, get_requests_params
+from ..conf import VALID_INTENTIONS, VALID_SUB_INTENTIONS
+from ..delivery import post_to_referrer, queue_delivery
 from ..models import AuthToken, ReferrerObject
 
 logger = logging.getLogger(__name__)
@@ -114,92 +113,44 @@ class ReferrerMixin(object):
         }
         if context["payload"] is not None:
             d["payload"] = context["payload"]
-        params, inline_domain = get_requests_params(context["referrer"])
-        if inline_domain:
-            response = Client().post(
-                context["referrer"],
-                data=d,
-                Connection="close",
-                Referer=merge_get_url(
-                    "%s%s" % (
-                        context["hostpart"],
-                        self.request.path
-                    )
-                    # sending full url not required anymore, payload
-                ),
-                SERVER_NAME=inline_domain
+        referer = merge_get_url(
+            "%s%s" % (
+                context["hostpart"],
+                self.request.path
             )
-            if response.status_code != 200:
-                return HttpResponseRedirect(
-                    redirect_to=merge_get_url(
-                        context["referrer"],
-                        status="post_failed",
-                        error="other"
-                    )
-                )
-        else:
-            try:
-                with requests.post(
-                    context["referrer"],
-                    data=d,
-                    headers={
-                        "Referer": merge_get_url(
-                            "%s%s" % (
-                                context["hostpart"],
-                                self.request.path
-                            )
-                            # sending full url not required anymore, payload
-                        ),
-                        "Connection": "close"
-                    },
-                    **params
-                ) as resp:
-                    resp.raise_for_status()
-            except requests.exceptions.SSLError as exc:
-                logger.info(
-                    "referrer: \"%s\" has a broken ssl configuration",
-                    context["referrer"], exc_info=exc
-                )
-                return HttpResponseRedirect(
-                    redirect_to=merge_get_url(
-                        context["referrer"],
-                        status="post_failed",
-                        error="ssl"
-                    )
+            # sending full url not required anymore, payload
+        )
+        if getattr(settings, "SPIDER_REFERRER_DELIVERY", "sync") == "queue":
+            # token is send by worker
+            del d["token"]
+            delivery = queue_delivery(
+                token, context["referrer"], d, referer,
+                delete_token=context.get("delete_token_on_failure", True)
+            )
+            context["post_queued"] = True
+            return HttpResponseRedirect(
+                redirect_to=reverse(
+                    "spider_base:referrer-delivery",
+                    kwargs={"delivery": delivery.delivery_id}
                 )
-            except (Exception, requests.exceptions.HTTPError) as exc:
-                apply_error_limit = False
-                if isinstance(
-                    exc, (
-                        requests.exceptions.ConnectionError,
-                        requests.exceptions.Timeout
-                    )
-                ):
-                    apply_error_limit = True
-                elif (
-                    isinstance(exc, requests.exceptions.HTTPError) and
-                    exc.response.status_code >= 500
-                ):
-                    apply_error_limit = True
-                if apply_error_limit:
-                    ratelimit.get_ratelimit(
-                        request=self.request,
-                        group="refer_with_post",
-                        key=h_fun,
-                        rate=settings.SPIDER_DOMAIN_ERROR_RATE,
-                        inc=True
-                    )
-                logger.info(
-                    "post failed: \"%s\" failed",
-                    context["referrer"], exc_info=exc
+            )
+        error = post_to_referrer(context["referrer"], d, referer)
+        if error:
+            if error[1]:
+                ratelimit.get_ratelimit(
+                    request=self.request,
+                    group="refer_with_post",
+                    key=h_fun,
+                    rate=settings.SPIDER_DOMAIN_ERROR_RATE,
+                    inc=True
                 )
-                return HttpResponseRedirect(
-                    redirect_to=merge_get_url(
-                        context["referrer"],
-                        status="post_failed",
-                        error="other"
-                    )
+            return HttpResponseRedirect(
+                redirect_to=merge_get_url(
+                    context["referrer"],
+                    status="post_failed",
+                    error=error[0]
                 )
+            )
         context["post_success"] = True
         h = get_hashob()
         h.update(token.token.encode("utf-8", "ignore"))
@@ -333,7 +284,7 @@ class ReferrerMixin(object):
             )
         context["post_success"] = False
         ret = self.refer_with_post(context, token)
-        if not context["post_success"]:
+        if not context["post_success"] and not context.get("post_queued"):
             token.delete()
         return ret
 
@@ -422,8 +373,11 @@ class ReferrerMixin(object):
                 ret = self.refer_with_get(context, token)
             else:
                 context["post_success"] = False
+                # queued delivery: cleanup after failed delivery
+                context["delete_token_on_failure"] = \
+                    not dontact and not newtoken
                 ret = self.refer_with_post(context, token)
-            if dontact:
+            if dontact or context.get("post_queued"):
                 return ret
             if not context["post_success"]:
                 if newtoken:
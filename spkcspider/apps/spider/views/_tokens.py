@@ -1,6 +1,6 @@
 __all__ = (
     "OwnerTokenManagement", "TokenDeletionRequest", "TokenRenewal",
-    "ConfirmTokenUpdate", "RequestTokenUpdate"
+    "ConfirmTokenUpdate", "RequestTokenUpdate", "ReferrerDeliveryStatus"
 )
 
 import logging
@@ -24,11 +24,12 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.generic.base import TemplateView, View
 from django.views.generic.edit import DeleteView
 from spkcspider.constants import TokenCreationError
+from spkcspider.utils.http import get_session
 from spkcspider.utils.settings import get_settings_func
 from spkcspider.utils.urls import merge_get_url
 
 from ..conf import get_requests_params
-from ..models import AuthToken
+from ..models import AuthToken, ReferrerDelivery
 from ._core import UCTestMixin, UserTestMixin
 from ._referrer import ReferrerMixin
 
@@ -316,15 +317,14 @@ class TokenRenewal(UCTestMixin, View):
                 return False
         else:
             try:
-                with requests.post(
+                with get_session(params).post(
                     self.request.auth_token.referrer.url,
                     data=d,
                     headers={
                         "Referer": "%s://%s" % (
                             self.request.scheme,
                             self.request.path
-                        ),
-                        "Connection": "close"
+                        )
                     },
                     **params
                 ) as resp:
@@ -473,6 +473,8 @@ class ConfirmTokenUpdate(ReferrerMixin, UCTestMixin, TemplateView):
         if isinstance(ret, HttpResponseRedirect):
             if context.get("post_success", False):
                 messages.success(request, _("Intention update successful"))
+            elif context.get("post_queued", False):
+                messages.info(request, _("Intention update queued"))
             else:
                 messages.error(request, _("Intention update failed"))
             return HttpResponseRedirect(self.get_redirect_url(
@@ -547,3 +549,38 @@ class RequestTokenUpdate(UserTestMixin, View):
         ret = super().options(request, *args, **kwargs)
         ret["Access-Control-Allow-Methods"] = "POST, GET, OPTIONS"
         return ret
+
+
+class ReferrerDeliveryStatus(TemplateView):
+    """
+        Status of queued token delivery, redirects to referrer when finished
+    """
+    template_name = "spider_base/protections/referrer_delivery.html"
+    object = None
+
+    def get(self, request, *args, **kwargs):
+        self.object = get_object_or_404(
+            ReferrerDelivery, delivery_id=kwargs["delivery"]
+        )
+        if self.object.state == "delivered":
+            return HttpResponseRedirect(
+                redirect_to=merge_get_url(
+                    self.object.url,
+                    status="success",
+                    hash=self.object.hash
+                )
+            )
+        elif self.object.state in {"failed", "superseded"}:
+            return HttpResponseRedirect(
+                redirect_to=merge_get_url(
+                    self.object.url,
+                    status="post_failed",
+                    error=self.object.error or "other"
+                )
+            )
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        kwargs["object"] = self.object
+        kwargs["refresh"] = 3
+        return super().get_context_data(**kwargs)
@@ -111,7 +111,6 @@ class FileForm(LicenseForm):
             # self.user = request.user
             return
         self.fields["file"].editable = False
-        self.fields["name"].editable = False
         # for SPIDER_UPLOAD_FILTER
         self.request = request
 
@@ -307,9 +306,9 @@ class TextForm(LicenseForm):
                 unique=True, name="text", content=self.instance.associated
             )
         if self.cleaned_data.get("file"):
-            b.blob = self.cleaned_data["file"].read()
+            b.as_bytes = self.cleaned_data["file"].read()
         else:
-            b.blob = self.cleaned_data["text"].encode("utf-8")
+            b.as_bytes = self.cleaned_data["text"].encode("utf-8")
         return {
             "attachedblobs": [b]
         }
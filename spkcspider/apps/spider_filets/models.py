@@ -270,7 +270,7 @@ class TextFilet(LicenseMixin, DataContent):
 
     def access_download(self, **kwargs):
         t = self.associated.attachedblobs.get(name="text")
-        response = t.get_response()
+        response = t.get_response(kwargs["request"])
         response["Access-Control-Allow-Origin"] = "*"
         if self.quota_data.get("key_list"):
             response["X-KEYLIST"] = json.dumps(self.quota_data["key_list"])
@@ -101,9 +101,9 @@ class KeyForm(DataContentForm):
                 unique=True, name="key", content=self.instance.associated
             )
         if isinstance(self.cleaned_data["key"], str):
-            b.blob = self.cleaned_data["key"].encode("ascii")
+            b.as_bytes = self.cleaned_data["key"].encode("ascii")
         else:
-            b.blob = self.cleaned_data["key"]
+            b.as_bytes = self.cleaned_data["key"]
 
         return {
             "attachedblobs": [b]
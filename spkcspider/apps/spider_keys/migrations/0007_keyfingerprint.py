@@ -0,0 +1,53 @@
+# Generated by Django 3.0.14 on 2026-10-19 19:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def _get(info, key):
+    pstart = info.find("\x1e%s=" % key)
+    if pstart == -1:
+        return None
+    pstart += len(key) + 2
+    return info[pstart:info.find("\x1e", pstart)].split("=", 1)
+
+
+def index_keys(apps, schema_editor):
+    AssignedContent = apps.get_model("spider_base", "AssignedContent")
+    KeyFingerprint = apps.get_model("spider_keys", "KeyFingerprint")
+    fingerprints = []
+    for content in AssignedContent.objects.filter(
+        ctype__name="PublicKey"
+    ).only("id", "info").iterator():
+        hash_ = _get(content.info, "hash")
+        if not hash_ or len(hash_) != 2:
+            continue
+        fingerprints.append(KeyFingerprint(
+            content_id=content.id, algorithm=hash_[0], hash=hash_[1],
+            pubkeyhash=(_get(content.info, "pubkeyhash") or ("", ""))[-1],
+            thirdparty="\x1ethirdparty\x1e" in content.info
+        ))
+    KeyFingerprint.objects.bulk_create(fingerprints, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spider_base', '0018_referrerdelivery'),
+        ('spider_keys', '0006_auto_20191230_1355'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KeyFingerprint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('algorithm', models.CharField(max_length=50)),
+                ('hash', models.CharField(db_index=True, max_length=255)),
+                ('pubkeyhash', models.CharField(blank=True, db_index=True, max_length=255)),
+                ('thirdparty', models.BooleanField(default=False)),
+                ('content', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='spider_base.AssignedContent')),
+            ],
+        ),
+        migrations.RunPython(index_keys, migrations.RunPython.noop),
+    ]
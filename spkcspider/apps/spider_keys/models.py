@@ -64,11 +64,12 @@ class PublicKey(DataContent):
             key = self.prepared_attachements["attachedblobs"][0]
         else:
             key = self.associated.attachedblobs.get(name="key")
-        h.update(key.blob)
+        key = key.as_bytes
+        h.update(key)
         if self.free_data.get("thirdparty"):
             ret = f"{ret}thirdparty\x1e"
         pubkeyhash = ""
-        k = self.get_key_ob(key.blob)
+        k = self.get_key_ob(key)
         if k:
             pem = k.public_bytes(
                 encoding=serialization.Encoding.PEM,
@@ -86,7 +87,7 @@ class PublicKey(DataContent):
 
     def get_key_ob(self, key=None):
         if not key:
-            key = self.associated.attachedblobs.get(name="key").blob
+            key = self.associated.attachedblobs.get(name="key").as_bytes
         try:
             if b"-----BEGIN CERTIFICATE-----" in key:
                 pubkey = load_pem_x509_certificate(
@@ -151,6 +152,82 @@ class PublicKey(DataContent):
             context=kwargs
         )
 
+    def save(self, *args, **kwargs):
+        ret = super().save(*args, **kwargs)
+        self.update_fingerprint()
+        return ret
+
+    def build_fingerprint(self):
+        """
+            fingerprint from info (hash, pubkeyhash)
+            None if info contains no hash (yet)
+        """
+        hashes = {}
+        for key in ("hash", "pubkeyhash"):
+            val = self.associated.getlist(key, 1)
+            if val:
+                hashes[key] = val[0].split("=", 1)
+        if len(hashes.get("hash", ())) != 2:
+            return None
+        return KeyFingerprint(
+            content_id=self.associated_id,
+            algorithm=hashes["hash"][0],
+            hash=hashes["hash"][1],
+            pubkeyhash=hashes.get("pubkeyhash", ("", ""))[-1],
+            thirdparty=bool(self.free_data.get("thirdparty"))
+        )
+
+    def update_fingerprint(self):
+        fingerprint = self.build_fingerprint()
+        query = KeyFingerprint.objects.filter(content_id=self.associated_id)
+        if not fingerprint:
+            query.delete()
+            return
+        fields = ("algorithm", "hash", "pubkeyhash", "thirdparty")
+        defaults = {field: getattr(fingerprint, field) for field in fields}
+        # most saves don't change the key, skip the write
+        if query.values(*fields).first() != defaults:
+            KeyFingerprint.objects.update_or_create(
+                content_id=self.associated_id, defaults=defaults
+            )
+
+
+class KeyFingerprintQuerySet(models.QuerySet):
+    def lookup(self, fingerprint, algorithm=None):
+        """
+            keys with hash or pubkeyhash fingerprint
+            fingerprint: <algorithm>=<hex> or <hex>
+            (default: SPIDER_HASH_ALGORITHM)
+        """
+        if "=" in fingerprint:
+            algorithm, fingerprint = fingerprint.split("=", 1)
+        if not algorithm:
+            algorithm = settings.SPIDER_HASH_ALGORITHM.name
+        fingerprint = fingerprint.lower()
+        return self.filter(
+            models.Q(hash=fingerprint) | models.Q(pubkeyhash=fingerprint),
+            algorithm=algorithm
+        )
+
+
+class KeyFingerprint(models.Model):
+    """
+        hashes of PublicKeys (from info), maintained by save
+        lookup: KeyFingerprint.objects.lookup(fingerprint)
+    """
+    content = models.OneToOneField(
+        "spider_base.AssignedContent", on_delete=models.CASCADE,
+        related_name="+"
+    )
+    algorithm = models.CharField(max_length=50)
+    # hash of key
+    hash = models.CharField(max_length=255, db_index=True)
+    # hash of public key (SubjectPublicKeyInfo PEM), empty if not parsable
+    pubkeyhash = models.CharField(max_length=255, db_index=True, blank=True)
+    thirdparty = models.BooleanField(default=False)
+
+    objects = KeyFingerprintQuerySet.as_manager()
+
 # Anchors can ONLY be used for server content.
 # Clients have to be verified seperately
 # 1 To verify client use this trick:
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from .views import PermAnchorView
+from .views import KeyFingerprintView, PermAnchorView
 
 app_name = "spider_keys"
 
@@ -10,5 +10,10 @@ urlpatterns = [
         'anchor/<int:pk>/view/',
         PermAnchorView.as_view(),
         name='anchor-permanent'
+    ),
+    path(
+        'key/<str:fingerprint>/',
+        KeyFingerprintView.as_view(),
+        name='key-fingerprint'
     )
 ]
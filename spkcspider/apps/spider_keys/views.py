@@ -1,15 +1,20 @@
-__all__ = ["PermAnchorView"]
+__all__ = ["PermAnchorView", "KeyFingerprintView"]
 
-from urllib.parse import urljoin
+from urllib.parse import urlencode, urljoin
 
+from django.db.models import Q
+from django.http import Http404
 from django.http.response import (
-    HttpResponseBase, HttpResponsePermanentRedirect
+    HttpResponseBase, HttpResponsePermanentRedirect, HttpResponseRedirect
 )
+from django.views.generic.base import View
 from django.views.generic.detail import DetailView
 from spkcspider.apps.spider.conf import get_anchor_domain
 from spkcspider.apps.spider.models import AssignedContent
 from spkcspider.apps.spider.views import DefinitionsMixin
 
+from .models import KeyFingerprint
+
 
 class PermAnchorView(DefinitionsMixin, DetailView):
     queryset = AssignedContent.objects.filter(
@@ -33,3 +38,32 @@ class PermAnchorView(DefinitionsMixin, DetailView):
         ret = self.object.content.access(context)
         assert(isinstance(ret, HttpResponseBase))
         return ret
+
+
+class KeyFingerprintView(View):
+    """
+        redirects to public key with fingerprint (hash or pubkeyhash),
+        only keys in public components, not unlisted, thirdparty or hidden by
+        travel protections (like ComponentPublicIndex)
+    """
+
+    def get(self, request, *args, **kwargs):
+        # only apply unconditional travelprotections
+        travel = AssignedContent.travel.get_active().exclude(
+            info__contains="\x1epwhash="
+        )
+        fingerprint = KeyFingerprint.objects.lookup(
+            kwargs["fingerprint"]
+        ).filter(
+            thirdparty=False, content__usercomponent__public=True
+        ).exclude(
+            Q(content__info__contains="\x1eunlisted\x1e") |
+            Q(content__travel_protected__in=travel) |
+            Q(content__usercomponent__travel_protected__in=travel)
+        ).select_related("content").order_by("id").first()
+        if not fingerprint:
+            raise Http404()
+        url = fingerprint.content.get_absolute_url()
+        if request.GET.get("raw"):
+            url = "{}?{}".format(url, urlencode({"raw": request.GET["raw"]}))
+        return HttpResponseRedirect(redirect_to=url)
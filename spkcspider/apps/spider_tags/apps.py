@@ -1,9 +1,10 @@
 __all__ = ["SpiderTagsConfig"]
 
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 from spkcspider.apps.spider.signals import update_dynamic
 
-from .signals import UpdateLayouts
+from .signals import InvalidateLayoutFormsCb, UpdateLayouts
 
 
 class SpiderTagsConfig(AppConfig):
@@ -19,3 +20,12 @@ class SpiderTagsConfig(AppConfig):
             UpdateLayouts,
             dispatch_uid="update_layouts"
         )
+        TagLayout = self.get_model("TagLayout")
+        post_save.connect(
+            InvalidateLayoutFormsCb, sender=TagLayout,
+            dispatch_uid="spider_tags_invalidate_layout_forms"
+        )
+        post_delete.connect(
+            InvalidateLayoutFormsCb, sender=TagLayout,
+            dispatch_uid="spider_tags_invalidate_layout_forms_delete"
+        )
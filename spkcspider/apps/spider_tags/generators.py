@@ -1,18 +1,25 @@
-__all__ = ("generate_form", "generate_fields")
+__all__ = (
+    "generate_form", "generate_fields", "get_layout_form",
+    "invalidate_layout_forms"
+)
 
+import hashlib
+import json
 import logging
 import posixpath
+import threading
 from collections import OrderedDict
 
 from django import forms
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import NON_FIELD_ERRORS
 # from django.apps import apps
 from django.db.models import Q, QuerySet
-from django.utils.translation import gettext
+from django.utils.translation import get_language, gettext
 from django.utils.translation import gettext_lazy as _
-from rdflib import XSD
 
+from spkcspider.apps.spider import metrics
 from spkcspider.apps.spider.abstract_models import BaseContent
 from spkcspider.apps.spider.fields import MultipleOpenChoiceField
 from spkcspider.apps.spider.models import AssignedContent, ReferrerObject
@@ -29,6 +36,10 @@ _empty_set = frozenset()
 
 logger = logging.getLogger(__name__)
 
+# compiled form classes: (layout id, name, layout hash, language): form
+_form_cache = OrderedDict()
+_form_cache_lock = threading.Lock()
+
 
 class StartSub(forms.Field):
     widget = SubSectionStartWidget
@@ -99,6 +110,7 @@ def generate_fields(layout, prefix="", _base=None, _mainprefix=None):
 
 
 def generate_form(name, layout):
+    from rdflib import XSD
     _gen_fields = generate_fields(layout, "tag")
     _temp_field = forms.BooleanField(required=False, initial=False)
     setattr(_temp_field, "hashable", True)
@@ -320,3 +332,41 @@ def generate_form(name, layout):
             return self.instance
 
     return _form
+
+
+def _hash_layout(layout):
+    return hashlib.sha256(
+        json.dumps(layout, sort_keys=True, default=str).encode("utf8")
+    ).hexdigest()
+
+
+def get_layout_form(name, layout, layout_id=None):
+    """
+        cached generate_form, keyed by layout id, hash of layout and language
+        (localized labels), least recently used classes are dropped
+        form instances deep-copy the fields, so classes can be shared
+    """
+    key = (layout_id, name, _hash_layout(layout), get_language())
+    with _form_cache_lock:
+        form = _form_cache.get(key)
+        if form:
+            _form_cache.move_to_end(key)
+    if form:
+        metrics.cache_requests.inc(cache="tag_forms", result="hit")
+        return form
+    metrics.cache_requests.inc(cache="tag_forms", result="miss")
+    form = generate_form(name, layout)
+    with _form_cache_lock:
+        _form_cache[key] = form
+        while len(_form_cache) > getattr(
+            settings, "SPIDER_TAG_FORM_CACHE_SIZE", 200
+        ):
+            _form_cache.popitem(last=False)
+    return form
+
+
+def invalidate_layout_forms(layout_id):
+    """ drop cached forms of layout (other processes: hash changes) """
+    with _form_cache_lock:
+        for key in [k for k in _form_cache if k[0] == layout_id]:
+            del _form_cache[key]
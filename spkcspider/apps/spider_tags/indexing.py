@@ -0,0 +1,37 @@
+"""
+Tag field index
+tagdata values are indexed (TagFieldIndex) with their path (without "tag/")
+and a normalized value, lists are indexed per item
+"""
+
+__all__ = ("normalize_value", "iter_tagdata", "max_length")
+
+import posixpath
+
+# of path and value
+max_length = 255
+
+
+def normalize_value(value):
+    if isinstance(value, bool):
+        value = "true" if value else "false"
+    return str(value).strip().casefold()[:max_length]
+
+
+def iter_tagdata(tagdata, prefix=""):
+    """ yields (path, normalized value), skips empty values """
+    for key, value in tagdata.items():
+        path = posixpath.join(prefix, key) if prefix else key
+        if isinstance(value, dict):
+            yield from iter_tagdata(value, path)
+            continue
+        if len(path) > max_length:
+            continue
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+        for item in value:
+            if item is None or isinstance(item, dict):
+                continue
+            item = normalize_value(item)
+            if item:
+                yield path, item
@@ -0,0 +1,48 @@
+# Generated by Django 3.0.14 on 2026-10-19 19:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from spkcspider.apps.spider_tags.indexing import iter_tagdata
+
+
+def index_tags(apps, schema_editor):
+    SpiderTag = apps.get_model("spider_tags", "SpiderTag")
+    TagFieldIndex = apps.get_model("spider_tags", "TagFieldIndex")
+    for tag in SpiderTag.objects.select_related("layout").iterator():
+        TagFieldIndex.objects.bulk_create([
+            TagFieldIndex(
+                content_id=tag.associated_id, layout=tag.layout.name,
+                path=path, value=value
+            ) for path, value in iter_tagdata(tag.tagdata)
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spider_base', '0018_referrerdelivery'),
+        ('spider_tags', '0011_auto_20200104_1738'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagFieldIndex',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('layout', models.SlugField(db_index=False, max_length=255)),
+                ('path', models.CharField(max_length=255)),
+                ('value', models.CharField(max_length=255)),
+                ('content', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='spider_base.AssignedContent')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='tagfieldindex',
+            index=models.Index(fields=['layout', 'path', 'value'], name='spider_tags_layout_8fb036_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tagfieldindex',
+            index=models.Index(fields=['path', 'value'], name='spider_tags_path_91f6a3_idx'),
+        ),
+        migrations.RunPython(index_tags, migrations.RunPython.noop),
+    ]
@@ -2,8 +2,6 @@
 import logging
 from itertools import chain
 
-from rdflib import URIRef
-
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.http import HttpResponse
@@ -21,7 +19,8 @@ from spkcspider.constants import ActionUrl, VariantType
 from spkcspider.utils.settings import get_settings_func
 from spkcspider.utils.fields import add_by_field
 
-from .generators import generate_form
+from .generators import get_layout_form
+from .indexing import iter_tagdata, max_length
 
 logger = logging.getLogger(__name__)
 
@@ -71,7 +70,7 @@ class TagLayout(models.Model):
             self.usertag.full_clean(exclude=["layout"])
 
     def get_form(self):
-        return generate_form("LayoutForm", self.layout)
+        return get_layout_form("LayoutForm", self.layout, self.id)
 
     def __repr__(self):
         if self.usertag:
@@ -291,6 +290,7 @@ class SpiderTag(BaseContent):
             field.use_default_anchor
         ):
             if data is None:
+                from rdflib import URIRef
                 return URIRef(self.get_primary_anchor(graph, context))
         return super().map_data(name, field, data, graph, context)
 
@@ -383,3 +383,37 @@ class SpiderTag(BaseContent):
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
         self._cached_references = None
+        self.update_field_index()
+
+    def build_field_index(self):
+        return [
+            TagFieldIndex(
+                content_id=self.associated_id, layout=self.layout.name,
+                path=path, value=value
+            ) for path, value in iter_tagdata(self.tagdata)
+        ]
+
+    def update_field_index(self):
+        TagFieldIndex.objects.filter(content_id=self.associated_id).delete()
+        TagFieldIndex.objects.bulk_create(self.build_field_index())
+
+
+class TagFieldIndex(models.Model):
+    """
+        normalized tagdata values of SpiderTags, maintained by save
+        search: tag:<layout>/<path>[=<value>] (see filter_contents)
+    """
+    content = models.ForeignKey(
+        "spider_base.AssignedContent", on_delete=models.CASCADE,
+        related_name="+"
+    )
+    # name of layout
+    layout = models.SlugField(max_length=255, db_index=False)
+    path = models.CharField(max_length=max_length)
+    value = models.CharField(max_length=max_length)
+
+    class Meta(object):
+        indexes = [
+            models.Index(fields=["layout", "path", "value"]),
+            models.Index(fields=["path", "value"])
+        ]
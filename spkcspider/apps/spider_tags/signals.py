@@ -1,7 +1,12 @@
-__all__ = ["UpdateLayouts"]
+__all__ = ["UpdateLayouts", "InvalidateLayoutFormsCb"]
 
 from . import registry
 
 
 def UpdateLayouts(sender, **kwargs):
     registry.layouts.initialize()
+
+
+def InvalidateLayoutFormsCb(sender, instance, **kwargs):
+    from .generators import invalidate_layout_forms
+    invalidate_layout_forms(instance.id)
@@ -6,6 +6,7 @@ from django.http import Http404
 from django.http.response import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils.decorators import method_decorator
+from django.utils.functional import cached_property
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 
@@ -50,6 +51,27 @@ class WebConfigView(UCTestMixin, View):
     def test_func(self):
         return True
 
+    @cached_property
+    def object(self):
+        # lazy, can create content, only for allowed methods
+        return self.get_object()
+
+    def get_validators(self):
+        if not self.object.id:
+            return None
+        return (
+            (
+                self.object.associated.id, self.object.associated.modified,
+                self.request.auth_token.referrer.url
+            ),
+            self.object.associated.modified
+        )
+
+    def update_not_modified(self, response):
+        super().update_not_modified(response)
+        response["Access-Control-Allow-Origin"] = \
+            self.request.auth_token.referrer.host
+
     def get_object(self, queryset=None):
         variants = {"TmpConfig"}
         if self.request.auth_token.persist >= 0:
@@ -98,13 +120,11 @@ class WebConfigView(UCTestMixin, View):
 
     def options(self, request, *args, **kwargs):
         ret = super().options(request, *args, **kwargs)
-        self.object = self.get_object()
         ret["Access-Control-Allow-Origin"] = self.object.token.referrer.host
         ret["Access-Control-Allow-Methods"] = "POST, GET, OPTIONS"
         return ret
 
     def get(self, request, *args, **kwargs):
-        self.object = self.get_object()
         b = None
         if self.object.id:
             b = self.object.associated.attachedblobs.filter(
@@ -115,7 +135,7 @@ class WebConfigView(UCTestMixin, View):
                 unique=True, name="config", blob=b"",
                 content=self.object.associated
             )
-        return self.render_to_response(b.blob)
+        return self.render_to_response(b.as_bytes)
 
     def post(self, request, *args, **kwargs):
         if (
@@ -126,7 +146,6 @@ class WebConfigView(UCTestMixin, View):
                 "TmpConfig can only hold: %s bytes" % tmpconfig_max,
                 status_code=400
             )
-        self.object = self.get_object()
         b = None
         if self.object.id:
             b = self.object.associated.attachedblobs.filter(
@@ -138,8 +157,8 @@ class WebConfigView(UCTestMixin, View):
                 content=self.object.associated
             )
         old_size = self.object.get_size()
-        oldconfig = b.blob
-        b.blob = self.request.body
+        oldconfig = b.as_bytes
+        b.as_bytes = self.request.body
         self.object.prepared_attachements = {
             "attachedblobs": b
         }
@@ -6,7 +6,6 @@ from django.contrib.auth import get_permission_codename
 from django.utils.timezone import now
 
 from .models import DataVerificationTag
-from .validate import verify_tag
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +49,8 @@ class DataVerificationTagAdmin(admin.ModelAdmin):
         if 'verification_state' in form.changed_data:
             form.instance.checked = now()
         ret = super().save_form(request, form, change)
+        # loads rdflib and task backend
+        from .validate import verify_tag
 
         verify_tag(
             tag=form.instance, ffrom="admin"
@@ -1,4 +1,4 @@
-__all__ = ["get_requests_params"]
+__all__ = ["get_requests_params", "get_max_concurrency"]
 
 
 from django.conf import settings
@@ -7,8 +7,14 @@ from django.utils.translation import gettext_lazy as _
 from spkcspider.constants import host_tld_matcher
 from spkcspider.utils.settings import get_settings_func
 
+# default of concurrent requests per host
+DEFAULT_MAX_CONCURRENCY = 4
 
-def get_requests_params(url):
+# keys of request map which are not passed to requests
+_extra_params = frozenset({"max_concurrency"})
+
+
+def _get_mapper_entry(url):
     _url = host_tld_matcher.match(url)
     if not _url:
         raise ValidationError(
@@ -29,6 +35,24 @@ def get_requests_params(url):
                 mapper[b"default"]
             )
         ),
+        _url
+    )
+
+
+def get_max_concurrency(url):
+    """ maximal amount of concurrent requests for host of url """
+    return _get_mapper_entry(url)[0].get(
+        "max_concurrency", DEFAULT_MAX_CONCURRENCY
+    )
+
+
+def get_requests_params(url):
+    params, _url = _get_mapper_entry(url)
+    return (
+        {
+            key: val for key, val in params.items()
+            if key not in _extra_params
+        },
         get_settings_func(
             "VERIFIER_INLINE", "SPIDER_INLINE",
             "spkcspider.apps.spider.functions.clean_spider_inline",
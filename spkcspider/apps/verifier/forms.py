@@ -1,4 +1,4 @@
-__all__ = ["CreateEntryForm"]
+__all__ = ["CreateEntryForm", "CreateBatchForm"]
 
 import shutil
 import tempfile
@@ -69,3 +69,72 @@ class CreateEntryForm(forms.Form):
             f = tempfile.mkstemp()
             shutil.copyfileobj(self.cleaned_data["dvfile"].file, f)
             return f.name, self.cleaned_data["dvfile"].size, True
+
+
+class CreateBatchForm(forms.Form):
+    """ multiple url and dvfile parameters """
+    url = forms.URLField(required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.urls = []
+        self.dvfiles = []
+
+    def clean(self):
+        ret = super().clean()
+        validator = get_settings_func(
+            "SPIDER_URL_VALIDATOR",
+            "spkcspider.apps.spider.functions.validate_url_default"
+        )
+        for url in self.data.getlist("url") if self.data else []:
+            try:
+                url = merge_get_url(self.fields["url"].clean(url), raw="embed")
+            except forms.ValidationError as exc:
+                self.add_error("url", exc)
+                continue
+            if not validator(url):
+                self.add_error(
+                    "url", forms.ValidationError(
+                        _('invalid url: %(url)s'),
+                        params={"url": url},
+                        code="invalid_url"
+                    )
+                )
+                continue
+            self.urls.append(url)
+        for dvfile in self.files.getlist("dvfile") if self.files else []:
+            if (
+                dvfile.size > settings.VERIFIER_MAX_SIZE_DIRECT_ACCEPTED
+            ):
+                self.add_error(
+                    None, forms.ValidationError(
+                        _('File too big: %(name)s'),
+                        params={"name": dvfile.name},
+                        code="invalid_size"
+                    )
+                )
+                continue
+            self.dvfiles.append(dvfile)
+        count = len(self.urls) + len(self.dvfiles)
+        if not count:
+            raise forms.ValidationError(
+                _('Require either url or dvfile'),
+                code="missing_parameter"
+            )
+        max_items = getattr(settings, "VERIFIER_BATCH_MAX_ITEMS", 100)
+        if count > max_items:
+            raise forms.ValidationError(
+                _('Too many items (max: %(max)s)'),
+                params={"max": max_items},
+                code="too_many_items"
+            )
+        return ret
+
+    def save(self):
+        ret = list(self.urls)
+        for dvfile in self.dvfiles:
+            fd, name = tempfile.mkstemp()
+            with open(fd, "wb") as f:
+                shutil.copyfileobj(dvfile.file, f)
+            ret.append((name, dvfile.size, True))
+        return ret
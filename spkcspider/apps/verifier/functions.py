@@ -1,21 +1,24 @@
 __all__ = [
     "clean_graph", "get_hashob", "validate_request_default",
-    "verify_tag_default", "domain_auth", "get_anchor_domain"
+    "verify_tag_default", "domain_auth", "get_anchor_domain",
+    "MainNode", "HashableNode", "parse_info_filters", "get_main_nodes",
+    "get_hashable_nodes"
 ]
 
 import functools
 import logging
+from collections import namedtuple
 from urllib.parse import parse_qs, urlencode
 
-import requests
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
-from rdflib import XSD, Literal, URIRef
 
 from django.conf import settings
 from django.test import Client
 from django.urls import reverse
 from spkcspider.constants import spkcgraph
+from spkcspider.utils.circuit import CircuitBreaker, is_host_failure
+from spkcspider.utils.http import get_session
 
 from .conf import get_requests_params
 
@@ -78,23 +81,30 @@ def domain_auth(source, hostpart):
         if response.status_code >= 400:
             ret = False
     else:
-        try:
-            with requests.head(
-                url, headers={"Connection": "close"},
-                **params
-            ) as resp:
-                resp.close()
-                resp.raise_for_status()
-        except Exception:
-            if settings.DEBUG:
-                logging.exception("domain_auth failed")
+        circuit = CircuitBreaker(url)
+        if not circuit.allow():
             ret = False
+        else:
+            try:
+                with get_session(params).head(
+                    url, **params
+                ) as resp:
+                    resp.close()
+                    resp.raise_for_status()
+                circuit.record_success()
+            except Exception as exc:
+                if is_host_failure(exc):
+                    circuit.record_failure()
+                if settings.DEBUG:
+                    logging.exception("domain_auth failed")
+                ret = False
     # other or own update_secret was successful or url has problems
     source.refresh_from_db()
     return ret
 
 
 def clean_graph(graph, start, source, hostpart):
+    from rdflib import XSD, Literal, URIRef
     mtype = str(graph.value(
         subject=start, predicate=spkcgraph["type"], any=not settings.DEBUG
     ))
@@ -132,3 +142,96 @@ def get_hashob():
         ),
         backend=default_backend()
     )
+
+
+MainNode = namedtuple("MainNode", ["base", "scope", "pages", "view"])
+HashableNode = namedtuple(
+    "HashableNode", ["base", "info", "type", "name", "value", "val_info"]
+)
+
+
+def parse_info_filters(info_filters):
+    """ returns (required, excluded) info substrings """
+    required = set()
+    excluded = set()
+    for filt in info_filters:
+        fchar = filt[0]
+        if fchar == "\x1e":
+            required.add(filt)
+        elif fchar == "!" and not filt[1] == "!":
+            excluded.add(filt[1:])
+        else:
+            raise ValueError("Invalid filter")
+    return required, excluded
+
+
+def get_main_nodes(graph, page=1):
+    """
+        nodes with scope, num_pages and view action for page,
+        every combination is returned (like a join)
+    """
+    from rdflib import XSD, Literal
+    ret = []
+    current_page = Literal(page, datatype=XSD.positiveInteger)
+    for base in graph.subjects(spkcgraph["pages.current_page"], current_page):
+        for scope in graph.objects(base, spkcgraph["scope"]):
+            for pages in graph.objects(base, spkcgraph["pages.num_pages"]):
+                for view in graph.objects(base, spkcgraph["action:view"]):
+                    ret.append(MainNode(base, scope, pages, view))
+    return ret
+
+
+def get_hashable_nodes(graph, info_filters=()):
+    """
+        hashable properties of nodes with info matching info_filters.
+        Walks the triple indexes instead of using a SPARQL query,
+        every combination is returned (like a join), also for multiple
+        val_info of a referenced node
+    """
+    from rdflib import XSD, Literal
+    literal_info = Literal("info", datatype=XSD.string)
+    required, excluded = parse_info_filters(info_filters)
+    seen = set()
+    ret = []
+    for pval in graph.subjects(spkcgraph["hashable"], Literal(True)):
+        names = list(graph.objects(pval, spkcgraph["name"]))
+        values = list(graph.objects(pval, spkcgraph["value"]))
+        if not names or not values:
+            continue
+        for base in graph.subjects(spkcgraph["properties"], pval):
+            types = list(graph.objects(base, spkcgraph["type"]))
+            if not types:
+                continue
+            infos = []
+            for pinfo in graph.objects(base, spkcgraph["properties"]):
+                if (pinfo, spkcgraph["name"], literal_info) not in graph:
+                    continue
+                for info in graph.objects(pinfo, spkcgraph["value"]):
+                    sinfo = str(info)
+                    if any(filt not in sinfo for filt in required):
+                        continue
+                    if any(filt in sinfo for filt in excluded):
+                        continue
+                    infos.append(info)
+            for value in values:
+                val_infos = None
+                if (
+                    not isinstance(value, Literal) and
+                    (value, spkcgraph["name"], literal_info) in graph and
+                    (value, spkcgraph["properties"], None) in graph
+                ):
+                    val_infos = list(
+                        graph.objects(value, spkcgraph["value"])
+                    )
+                for info in infos:
+                    for _type in types:
+                        for name in names:
+                            for val_info in val_infos or (None,):
+                                key = (
+                                    base, info, _type, name, value, val_info
+                                )
+                                if key in seen:
+                                    continue
+                                seen.add(key)
+                                ret.append(HashableNode(*key))
+    return ret
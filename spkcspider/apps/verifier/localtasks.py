@@ -0,0 +1,161 @@
+"""
+Minimal task backend for deployments without celery
+tasks run in a thread pool, state is stored in the database
+"""
+
+__all__ = [
+    "TimeoutError", "LocalAsyncResult", "LocalTask", "local_task"
+]
+
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import exceptions
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+class TimeoutError(Exception):
+    pass
+
+
+def get_executor():
+    global _executor
+    if not _executor:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "VERIFIER_LOCAL_TASK_WORKERS", 2),
+            thread_name_prefix="verifier"
+        )
+    return _executor
+
+
+class LocalAsyncResult(object):
+    """ subset of celery AsyncResult interface """
+    task_id = None
+
+    def __init__(self, task_id):
+        self.task_id = task_id
+
+    def _get_ob(self):
+        from .models import LocalTaskResult
+        return LocalTaskResult.objects.filter(task_id=self.task_id).first()
+
+    @property
+    def state(self):
+        ob = self._get_ob()
+        return ob.state if ob else "PENDING"
+
+    @property
+    def info(self):
+        """ meta while running, result or error message if done """
+        ob = self._get_ob()
+        if not ob:
+            return None
+        return ob.get_info()
+
+    def ready(self):
+        ob = self._get_ob()
+        return bool(ob and ob.done)
+
+    def successful(self):
+        ob = self._get_ob()
+        return bool(ob and ob.done and ob.state == "SUCCESS")
+
+    def get(self, timeout=None, interval=0.2):
+        """
+            waits for result, returns error message if the task failed
+        """
+        start = time.monotonic()
+        while True:
+            ob = self._get_ob()
+            if ob and ob.done:
+                return ob.get_info()
+            if timeout is not None and time.monotonic() - start >= timeout:
+                raise TimeoutError()
+            time.sleep(interval)
+
+
+class LocalTask(object):
+    """ bound task, passed as first argument like a celery bound task """
+    name = None
+    func = None
+    task_id = None
+
+    def __init__(self, func, name, task_id=None):
+        self.func = func
+        self.name = name
+        self.task_id = task_id
+
+    def AsyncResult(self, task_id):
+        return LocalAsyncResult(task_id)
+
+    def update_state(self, state=None, meta=None):
+        from .models import LocalTaskResult
+        # final state is set by run
+        LocalTaskResult.objects.filter(
+            task_id=self.task_id, done=False
+        ).update(state=state, info=meta, modified=timezone.now())
+
+    def apply_async(self, args=(), kwargs=None, track_started=False, **opts):
+        from .models import LocalTaskResult
+        expires = getattr(
+            settings, "VERIFIER_LOCAL_TASK_RESULT_EXPIRES", 86400
+        )
+        LocalTaskResult.objects.filter(
+            done=True, modified__lt=timezone.now()-timedelta(seconds=expires)
+        ).delete()
+        task = LocalTask(self.func, self.name, task_id=uuid.uuid4().hex)
+        LocalTaskResult.objects.create(task_id=task.task_id, name=self.name)
+        # task row must be visible for worker
+        transaction.on_commit(lambda: get_executor().submit(
+            task.run, args, kwargs or {}, track_started
+        ))
+        return LocalAsyncResult(task.task_id)
+
+    def delay(self, *args, **kwargs):
+        return self.apply_async(args, kwargs)
+
+    def run(self, args, kwargs, track_started=False):
+        from .models import LocalTaskResult
+        close_old_connections()
+        try:
+            if track_started:
+                self.update_state("STARTED")
+            try:
+                result = self.func(self, *args, **kwargs)
+                state = "SUCCESS"
+            except exceptions.ValidationError as exc:
+                result = "; ".join(exc.messages)
+                state = "FAILURE"
+            except Exception as exc:
+                logger.exception("Task %s failed", self.name)
+                result = str(exc)
+                state = "FAILURE"
+            LocalTaskResult.objects.filter(task_id=self.task_id).update(
+                state=state, info={"result": result}, done=True,
+                modified=timezone.now()
+            )
+        finally:
+            # connections are thread local, don't leak them
+            connection.close()
+
+    def __call__(self, *args, **kwargs):
+        return self.func(self, *args, **kwargs)
+
+
+def local_task(name, **options):
+    """
+        decorator, replacement for celery_app.task(bind=True, name=name),
+        other options are ignored
+    """
+    def _decorator(func):
+        return LocalTask(func, name)
+    return _decorator
@@ -0,0 +1,159 @@
+__all__ = (
+    "Command", "create_synthetic_graph", "query_hashable_nodes_sparql"
+)
+
+import random
+import time
+
+from rdflib import XSD, BNode, Graph, Literal, URIRef
+
+from django.core.management.base import BaseCommand
+from spkcspider.constants import spkcgraph
+
+
+def create_synthetic_graph(contents, properties=4, seed=0):
+    """ export shaped graph with hashable properties """
+    rand = random.Random(seed)
+    g = Graph()
+    g.namespace_manager.bind("spkc", spkcgraph, replace=True)
+    for i in range(contents):
+        base = URIRef("https://example.org/spider/ucontent/%s/view/" % i)
+        g.add((base, spkcgraph["type"], Literal(
+            rand.choice(["Text", "File", "PublicKey"]), datatype=XSD.string
+        )))
+        pinfo = BNode()
+        g.add((base, spkcgraph["properties"], pinfo))
+        g.add((pinfo, spkcgraph["name"], Literal("info", datatype=XSD.string)))
+        g.add((pinfo, spkcgraph["value"], Literal(
+            "\x1etype=Text\x1e%s\x1eid=%s\x1e" % (
+                rand.choice(["unlisted", "public"]), i
+            ),
+            datatype=XSD.string
+        )))
+        for j in range(properties):
+            pval = BNode()
+            g.add((base, spkcgraph["properties"], pval))
+            g.add((pval, spkcgraph["hashable"], Literal(rand.random() < 0.8)))
+            g.add((pval, spkcgraph["name"], Literal(
+                "field%s" % j, datatype=XSD.string
+            )))
+            kind = rand.randrange(3)
+            if kind == 0:
+                value = Literal(rand.getrandbits(64), datatype=XSD.integer)
+            elif kind == 1:
+                value = Literal(
+                    "https://example.org/file/%s/" % rand.randrange(contents),
+                    datatype=spkcgraph["hashableURI"]
+                )
+            else:
+                # reference node
+                value = URIRef(
+                    "https://example.org/spider/reference/%s/%s/" % (i, j)
+                )
+                g.add((value, spkcgraph["properties"], BNode()))
+                g.add((
+                    value, spkcgraph["name"],
+                    Literal("info", datatype=XSD.string)
+                ))
+                g.add((value, spkcgraph["value"], Literal(
+                    "\x1eid=%s\x1e" % rand.randrange(contents),
+                    datatype=XSD.string
+                )))
+            g.add((pval, spkcgraph["value"], value))
+    return g
+
+
+def _sparql_string(value):
+    return '"%s"' % value.replace("\\", "\\\\").replace(
+        '"', '\\"'
+    ).replace("\x1e", "\\u001E")
+
+
+def query_hashable_nodes_sparql(graph, info_filters=()):
+    """
+        former SPARQL implementation of get_hashable_nodes (reference)
+    """
+    _filter_info = ""
+    for filt in info_filters:
+        if filt[0] == "!":
+            _filter_info = "{}FILTER (!CONTAINS(?info, {}))\n".format(
+                _filter_info, _sparql_string(filt[1:])
+            )
+        else:
+            _filter_info = "{}FILTER CONTAINS(?info, {})\n".format(
+                _filter_info, _sparql_string(filt)
+            )
+    return list(graph.query(
+        f"""
+            SELECT DISTINCT ?base ?info ?type ?name ?value ?val_info
+            WHERE {{
+                ?base  spkc:type ?type ;
+                       spkc:properties ?pinfo, ?pval .
+                ?pinfo spkc:name "info"^^xsd:string ;
+                       spkc:value ?info .
+                ?pval  spkc:hashable "true"^^xsd:boolean ;
+                       spkc:name ?name ;
+                       spkc:value ?value .
+                OPTIONAL {{
+                    ?value spkc:properties ?prop2 ;
+                           spkc:name "info"^^xsd:string ;
+                           spkc:value ?val_info .
+                }}
+                {_filter_info}
+            }}
+        """,
+        initNs={"spkc": spkcgraph}
+    ))
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare hashable node extraction with the SPARQL implementation "
+        "on a synthetic graph"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--contents', action='store', dest='contents', default=200,
+            type=int, help='Amount of contents in graph',
+        )
+        parser.add_argument(
+            '--properties', action='store', dest='properties', default=4,
+            type=int, help='Hashable properties per content',
+        )
+        parser.add_argument(
+            '--repeat', action='store', dest='repeat', default=3,
+            type=int, help='Runs per implementation (best is reported)',
+        )
+        parser.add_argument(
+            '--filter', action='append', dest='info_filters', default=[],
+            help='Info filter (can be specified multiple times)',
+        )
+
+    def handle(
+        self, contents=200, properties=4, repeat=3, info_filters=(),
+        **options
+    ):
+        from spkcspider.apps.verifier.functions import get_hashable_nodes
+        g = create_synthetic_graph(contents, properties)
+        self.stdout.write("triples: %s\n" % len(g))
+        results = {}
+        for name, func in [
+            ("sparql", query_hashable_nodes_sparql),
+            ("index", get_hashable_nodes)
+        ]:
+            best = None
+            for i in range(max(1, repeat)):
+                start = time.perf_counter()
+                nodes = func(g, info_filters)
+                duration = time.perf_counter() - start
+                if best is None or duration < best:
+                    best = duration
+            results[name] = {tuple(node) for node in nodes}
+            self.stdout.write(
+                "%s: %.4f s, nodes: %s\n" % (name, best, len(nodes))
+            )
+        if results["sparql"] != results["index"]:
+            self.stderr.write("results differ\n")
+        else:
+            self.stdout.write("results identical\n")
@@ -0,0 +1,40 @@
+# Generated by Django 3.0.14 on 2026-10-19 18:09
+
+from django.db import migrations, models
+import jsonfield.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spider_verifier', '0003_auto_20190929_2117'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResourceDigest',
+            fields=[
+                ('id', models.BigAutoField(editable=False, primary_key=True, serialize=False)),
+                ('modified', models.DateTimeField(auto_now=True)),
+                ('url', models.URLField(db_index=True, max_length=400, unique=True)),
+                ('etag', models.CharField(blank=True, default='', max_length=255)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=40)),
+                ('digest', models.CharField(max_length=255)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='verifysourceobject',
+            name='fingerprint',
+            field=models.CharField(blank=True, default='', editable=False, max_length=128),
+        ),
+        migrations.AddField(
+            model_name='verifysourceobject',
+            name='last_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='verifysourceobject',
+            name='page_validators',
+            field=jsonfield.fields.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.0.14 on 2026-10-19 18:14
+
+from django.db import migrations, models
+import jsonfield.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spider_verifier', '0004_resource_digest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocalTaskResult',
+            fields=[
+                ('id', models.BigAutoField(editable=False, primary_key=True, serialize=False)),
+                ('task_id', models.CharField(db_index=True, max_length=40, unique=True)),
+                ('name', models.CharField(max_length=255)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('modified', models.DateTimeField(auto_now=True)),
+                ('state', models.CharField(default='PENDING', max_length=40)),
+                ('info', jsonfield.fields.JSONField(blank=True, null=True)),
+                ('done', models.BooleanField(default=False)),
+            ],
+        ),
+    ]
@@ -8,11 +8,12 @@ from django.db import models
 from django.test import Client
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
+from jsonfield import JSONField
 from spider_domainauth.abstract_models import BaseReverseToken
 from spkcspider.constants.verifier import VERIFICATION_CHOICES
+from spkcspider.utils.http import get_session
 
 from .conf import get_requests_params
-from .functions import get_anchor_domain
 
 
 def dv_path(instance, filename):
@@ -34,6 +35,16 @@ class VerifySourceObject(BaseReverseToken):
         ), db_index=True, unique=True
     )
     get_params = models.TextField()
+    # validators (etag, last_modified) of pages of last validation
+    page_validators = JSONField(default=list, blank=True)
+    # hash over info filters and page_validators, empty if not cacheable
+    fingerprint = models.CharField(
+        max_length=128, default="", blank=True, editable=False
+    )
+    # hash of resulting DataVerificationTag
+    last_hash = models.CharField(
+        max_length=255, default="", blank=True, editable=False
+    )
 
     def get_url(self, access=None):
         if access:
@@ -46,6 +57,71 @@ class VerifySourceObject(BaseReverseToken):
     def get_info_filters(self):
         return
 
+    @staticmethod
+    def calc_fingerprint(page_validators, info_filters):
+        from .functions import get_hashob
+        h = get_hashob()
+        for filt in sorted(info_filters):
+            h.update(filt.encode("utf8"))
+            h.update(b"\x1e")
+        for etag, last_modified in page_validators:
+            h.update(b"\x1d")
+            h.update(etag.encode("utf8"))
+            h.update(b"\x1e")
+            h.update(last_modified.encode("utf8"))
+        return h.finalize().hex()
+
+    def get_cached_validators(self, info_filters):
+        """ page validators if last validation used the same filters """
+        if not self.fingerprint or not self.last_hash:
+            return None
+        if self.fingerprint != self.calc_fingerprint(
+            self.page_validators, info_filters
+        ):
+            return None
+        return self.page_validators
+
+
+class LocalTaskResult(models.Model):
+    """ State of tasks of the local task backend (without celery) """
+    id = models.BigAutoField(primary_key=True, editable=False)
+    task_id = models.CharField(max_length=40, unique=True, db_index=True)
+    name = models.CharField(max_length=255)
+    created = models.DateTimeField(auto_now_add=True, editable=False)
+    modified = models.DateTimeField(auto_now=True, editable=False)
+    state = models.CharField(max_length=40, default="PENDING")
+    # meta while running, {"result": result or error message} when done
+    info = JSONField(null=True, blank=True)
+    done = models.BooleanField(default=False)
+
+    def get_info(self):
+        if self.done:
+            return self.info["result"]
+        return self.info
+
+    def __str__(self):
+        return "LocalTaskResult: %s (%s)" % (self.task_id, self.state)
+
+
+class ResourceDigest(models.Model):
+    """ Digest cache for hashable resources (conditional requests) """
+    id = models.BigAutoField(primary_key=True, editable=False)
+    modified = models.DateTimeField(auto_now=True, editable=False)
+    url = models.URLField(
+        max_length=(
+            400 if (
+                settings.DATABASES["default"]["ENGINE"] !=
+                "django.db.backends.mysql"
+            ) else 255
+        ), db_index=True, unique=True
+    )
+    etag = models.CharField(max_length=255, default="", blank=True)
+    last_modified = models.CharField(max_length=40, default="", blank=True)
+    digest = models.CharField(max_length=255)
+
+    def __str__(self):
+        return "ResourceDigest: %s" % self.url
+
 
 class DataVerificationTag(models.Model):
     """ Contains verified data """
@@ -91,6 +167,7 @@ class DataVerificationTag(models.Model):
 
     def callback(self, hostpart=None):
         if not hostpart:
+            from .functions import get_anchor_domain
             hostpart = get_anchor_domain()
         if self.source and self.data_type.endswith("_cb"):
             vurl = self.source.get_url("verify")
@@ -114,9 +191,8 @@ class DataVerificationTag(models.Model):
                     )
             else:
                 try:
-                    with requests.post(
-                        vurl, data=body, headers={"Connection": "close"},
-                        **params
+                    with get_session(params).post(
+                        vurl, data=body, **params
                     ) as resp:
                         if resp.status_code != 200:
                             raise exceptions.ValidationError(
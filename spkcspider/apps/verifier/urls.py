@@ -1,6 +1,6 @@
 from django.urls import path
 
-from .views import CreateEntry, InfoView, VerifyEntry
+from .views import CreateBatch, CreateEntry, InfoView, VerifyEntry
 
 app_name = "spider_verifier"
 
@@ -15,6 +15,17 @@ urlpatterns = [
         VerifyEntry.as_view(),
         name='verify'
     ),
+    path(
+        'batch/<slug:task_id>/',
+        CreateBatch.as_view(),
+        name='batch_task'
+    ),
+    # NOTE: this view is csrf_exempted
+    path(
+        'batch/',
+        CreateBatch.as_view(),
+        name='create_batch'
+    ),
     path(
         'info/',
         InfoView.as_view(),
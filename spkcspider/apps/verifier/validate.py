@@ -3,40 +3,68 @@ Does require celery only for async methods
 """
 __all__ = {
     "validate", "valid_wait_states", "verify_download_size",
-    "async_validate", "verify_tag", "async_verify_tag"
+    "async_validate", "verify_tag", "async_verify_tag", "DownloadBudget",
+    "create_session", "retrieve_pages", "retrieve_hashes", "ProgressReporter",
+    "validate_batch", "async_validate_batch"
 }
 
+import contextlib
+import functools
 import io
 import os
 import logging
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
-from rdflib import Graph, Literal, URIRef
-from rdflib.namespace import XSD
+from requests.adapters import HTTPAdapter
 
 from django.conf import settings
 from django.core import exceptions
 from django.core.files import File
+from django.db import IntegrityError, connection, transaction
 from django.test import Client
+from django.utils import timezone
 from django.utils.translation import gettext as _
 from spkcspider import celery_app
+from spkcspider.apps.spider.metrics import cache_requests
+from spkcspider.constants import host_tld_matcher
 from spkcspider.constants.rdf import spkcgraph
+from spkcspider.utils.http import (
+    disable_cookies, get_session, instrument_session
+)
+from spkcspider.utils.metrics import Histogram
 from spkcspider.utils.settings import get_settings_func
 from spkcspider.utils.urls import merge_get_url
 
-from .conf import get_requests_params
+from .conf import get_max_concurrency, get_requests_params
 # uses specialized get_hashob from verifier (can be further customized)
-from .functions import get_anchor_domain, get_hashob
-from .models import DataVerificationTag, VerifySourceObject
+from .functions import (
+    get_anchor_domain, get_hashable_nodes, get_hashob, get_main_nodes,
+    parse_info_filters
+)
+from .localtasks import local_task
+from .models import DataVerificationTag, ResourceDigest, VerifySourceObject
 
 logger = logging.getLogger(__name__)
 
 
 BUFFER_SIZE = 65536  # read in 64kb chunks
 
+# serializes db writes of concurrent validations (batches),
+# sqlite doesn't support concurrent write transactions
+_write_lock = threading.Lock()
+
+verifier_jobs = Histogram(
+    "spider_verifier_job_duration_seconds",
+    "Duration of validations (success, failure)", ["result"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+)
+
 valid_wait_states = {
-    "RETRIEVING", "HASHING", "STARTED"
+    "RETRIEVING", "HASHING", "STARTED", "VALIDATING"
 }
 
 
@@ -44,13 +72,127 @@ def verify_download_size(length, current_size=0):
     if not length or not length.isdigit():
         return False
     length = int(length)
-    if settings.VERIFIER_MAX_SIZE_ACCEPTED < length:
+    if settings.VERIFIER_MAX_SIZE_ACCEPTED < length + current_size:
         return False
     return True
 
 
-def retrieve_object(obj, current_size, graph=None, session=None):
-    # without graph return hash
+class DownloadBudget(object):
+    """
+        Thread-safe accounting of downloaded bytes,
+        shared by all retrievals of a validation
+    """
+    current_size = 0
+
+    def __init__(self, current_size=0):
+        self.current_size = current_size
+        self.lock = threading.Lock()
+
+    def reserve(self, length):
+        """ reserve length (str or int) bytes, returns success """
+        with self.lock:
+            if not verify_download_size(str(length), self.current_size):
+                return False
+            self.current_size += int(length)
+        return True
+
+
+class ProgressReporter(object):
+    """
+        Throttled task.update_state: writes at most every `every` items or
+        `interval` seconds (whatever comes first) and on state changes.
+        Adds downloaded bytes and estimated remaining seconds to meta
+    """
+    task = None
+    budget = None
+    state = None
+
+    def __init__(self, task, budget=None, every=None, interval=None):
+        self.task = task
+        self.budget = budget
+        if every is None:
+            every = getattr(settings, "VERIFIER_PROGRESS_ITEMS", 100)
+        if interval is None:
+            interval = getattr(settings, "VERIFIER_PROGRESS_INTERVAL", 1.0)
+        self.every = every
+        self.interval = interval
+        self.meta = {}
+        self.pending = 0
+        self.last_write = 0.0
+        self.state_start = time.monotonic()
+
+    def update(self, state, done=None, total=None, force=False, **meta):
+        """ done, total: items processed/all items of state (for eta) """
+        if not self.task:
+            return
+        now = time.monotonic()
+        if state != self.state:
+            self.state = state
+            self.state_start = now
+            self.meta = {}
+            force = True
+        self.meta.update(meta)
+        if done is not None and total:
+            elapsed = now - self.state_start
+            self.meta["eta"] = round(elapsed / max(done, 1) * (total - done))
+        self.pending += 1
+        if (
+            force or self.pending >= self.every or
+            now - self.last_write >= self.interval
+        ):
+            self.flush(now)
+
+    def flush(self, now=None):
+        if not self.task or not self.state:
+            return
+        meta = dict(self.meta)
+        if self.budget:
+            meta["bytes_downloaded"] = self.budget.current_size
+        self.task.update_state(state=self.state, meta=meta)
+        self.pending = 0
+        self.last_write = now or time.monotonic()
+
+
+def get_max_workers():
+    return getattr(settings, "VERIFIER_MAX_CONCURRENT_REQUESTS", 8)
+
+
+def create_session():
+    """ own keep-alive session with a connection pool for all workers """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=get_max_workers())
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    disable_cookies(session)
+    return instrument_session(session)
+
+
+def get_shared_session():
+    """ process wide keep-alive session (connections are reused) """
+    return get_session(pool_maxsize=get_max_workers())
+
+
+@contextlib.contextmanager
+def use_session(session=None):
+    """ use session or the shared session """
+    yield session or get_shared_session()
+
+
+def _update_validators(validators, headers, not_modified=False):
+    validators["not_modified"] = not_modified
+    if not not_modified:
+        validators["etag"] = headers.get("ETag", "")
+        validators["last_modified"] = headers.get("Last-Modified", "")
+
+
+def retrieve_object(obj, budget, graph=None, session=None, validators=None):
+    """
+        without graph return hash.
+        validators: dict with etag, last_modified for conditional requests,
+                    updated by response, on 304 not_modified is set and
+                    None returned/graph untouched
+    """
+    from rdflib.namespace import XSD
     ret = None
     try:
         if not isinstance(obj, str):
@@ -66,8 +208,21 @@ def retrieve_object(obj, current_size, graph=None, session=None):
             return
         # obj is url
         params, inline_domain = get_requests_params(obj)
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
         if inline_domain:
-            resp = Client().get(obj, SERVER_NAME=inline_domain)
+            resp = Client().get(obj, SERVER_NAME=inline_domain, **{
+                "HTTP_%s" % key.upper().replace("-", "_"): val
+                for key, val in headers.items()
+            })
+            if validators is not None and resp.status_code == 304:
+                _update_validators(validators, resp, True)
+                resp.close()
+                return None
             if resp.status_code != 200:
                 raise exceptions.ValidationError(
                     _("Retrieval failed: %(reason)s"),
@@ -76,19 +231,15 @@ def retrieve_object(obj, current_size, graph=None, session=None):
                 )
 
             c_length = resp.get("content-length", None)
-            if (
-                c_length is None or
-                not verify_download_size(c_length, current_size[0])
-            ):
+            if c_length is None or not budget.reserve(c_length):
                 resp.close()
                 raise exceptions.ValidationError(
                     _("Content too big or size unset: %(size)s"),
                     params={"size": c_length},
                     code="invalid_size"
                 )
-
-            c_length = int(c_length)
-            current_size[0] += c_length
+            if validators is not None:
+                _update_validators(validators, resp)
             if graph is not None:
                 graph.parse(getattr(
                     resp, "streaming_content", io.BytesIO(resp.content)
@@ -104,9 +255,16 @@ def retrieve_object(obj, current_size, graph=None, session=None):
             if not session:
                 session = requests
             try:
+                if headers:
+                    params = dict(params, headers=dict(
+                        params.get("headers") or {}, **headers
+                    ))
                 with session.get(
                     obj, stream=True, **params
                 ) as resp:
+                    if validators is not None and resp.status_code == 304:
+                        _update_validators(validators, resp.headers, True)
+                        return None
                     if resp.status_code != 200:
                         raise exceptions.ValidationError(
                             _("Retrieval failed: %(reason)s"),
@@ -115,17 +273,14 @@ def retrieve_object(obj, current_size, graph=None, session=None):
                         )
 
                     c_length = resp.headers.get("content-length", None)
-                    if (
-                        c_length is None or
-                        not verify_download_size(c_length, current_size[0])
-                    ):
+                    if c_length is None or not budget.reserve(c_length):
                         raise exceptions.ValidationError(
                             _("Content too big or size unset: %(size)s"),
                             params={"size": c_length},
                             code="invalid_size"
                         )
-                    c_length = int(c_length)
-                    current_size[0] += c_length
+                    if validators is not None:
+                        _update_validators(validators, resp.headers)
                     if graph is not None:
                         graph.parse(resp.raw, format="turtle")
                     else:
@@ -156,7 +311,345 @@ def retrieve_object(obj, current_size, graph=None, session=None):
     return ret
 
 
-def validate(ob, hostpart, task=None, info_filters=None):
+def retrieve_pages(
+    view_url, pages, budget, session, progress=None, validators=None
+):
+    """
+        Retrieve pages 2..pages of view_url concurrently.
+        Returns graphs in page order; progress is reported from the calling
+        thread as pages complete.
+        validators: optional list of validator dicts for pages 2..pages
+    """
+    from rdflib import Graph
+    urls = [
+        merge_get_url(view_url, raw="embed", page=str(page))
+        for page in range(2, pages+1)
+    ]
+    graphs = [Graph() for url in urls]
+    if validators is None:
+        validators = [None] * len(urls)
+
+    def _report(done):
+        if progress:
+            progress.update(
+                'RETRIEVING', done=done, total=pages,
+                page=done, num_pages=pages
+            )
+    if not urls:
+        return graphs
+    # inline requests use the db connection of this thread
+    if get_requests_params(urls[0])[1]:
+        for count, args in enumerate(zip(urls, graphs, validators), start=2):
+            retrieve_object(
+                args[0], budget, graph=args[1], session=session,
+                validators=args[2]
+            )
+            _report(count)
+        return graphs
+
+    semaphore = threading.BoundedSemaphore(get_max_concurrency(view_url))
+
+    def _retrieve(url, pg, page_validators):
+        with semaphore:
+            retrieve_object(
+                url, budget, graph=pg, session=session,
+                validators=page_validators
+            )
+
+    max_workers = max(1, min(get_max_workers(), len(urls)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_retrieve, *args)
+            for args in zip(urls, graphs, validators)
+        ]
+        try:
+            for count, future in enumerate(as_completed(futures), start=2):
+                future.result()
+                _report(count)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return graphs
+
+
+def retrieve_hashes(urls, budget, session, progress=None, memo=None):
+    """
+        Download and hash urls concurrently (bounded per host).
+        Unchanged resources (conditional request) use the cached digest.
+        memo: optional dict url: hash shared between validations (batches)
+        Returns dict url: hash
+    """
+    if memo:
+        known = {url: memo[url] for url in urls if url in memo}
+        urls = [url for url in urls if url not in known]
+    else:
+        known = {}
+    results = {}
+    remote = []
+    semaphores = {}
+    cached = {
+        ob.url: ob for ob in ResourceDigest.objects.filter(url__in=urls)
+    }
+    validators = {
+        url: {
+            "etag": cached[url].etag,
+            "last_modified": cached[url].last_modified
+        } if url in cached else {}
+        for url in urls
+    }
+    for url in urls:
+        if get_requests_params(url)[1]:
+            # inline requests use the db connection of this thread
+            results[url] = retrieve_object(
+                url, budget, session=session, validators=validators[url]
+            )
+            continue
+        host = host_tld_matcher.match(url).group("host")
+        if host not in semaphores:
+            semaphores[host] = threading.BoundedSemaphore(
+                get_max_concurrency(url)
+            )
+        remote.append((url, semaphores[host]))
+
+    def _report():
+        if progress:
+            progress.update(
+                'HASHING', done=len(results), total=len(urls),
+                resources_hashed=len(results), num_resources=len(urls)
+            )
+    _report()
+
+    def _retrieve(url, semaphore):
+        with semaphore:
+            return retrieve_object(
+                url, budget, session=session, validators=validators[url]
+            )
+
+    if remote:
+        max_workers = min(get_max_workers(), len(remote))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(_retrieve, url, semaphore): url
+                for url, semaphore in remote
+            }
+            try:
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+                    _report()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    update_digest_cache(results, validators, cached)
+    if memo is not None:
+        memo.update(results)
+    results.update(known)
+    return results
+
+
+def update_digest_cache(results, validators, cached):
+    """ fill in cached digests and store digests of cacheable resources """
+    with _write_lock:
+        _update_digest_cache(results, validators, cached)
+
+
+def _update_digest_cache(results, validators, cached):
+    create = []
+    update = []
+    for url, validator in validators.items():
+        if url in cached:
+            cache_requests.inc(
+                cache="digest",
+                result="hit" if validator.get("not_modified") else "miss"
+            )
+        if validator.get("not_modified"):
+            results[url] = bytes.fromhex(cached[url].digest)
+            continue
+        if not validator.get("etag") and not validator.get("last_modified"):
+            continue
+        ob = cached.get(url) or ResourceDigest(url=url)
+        ob.etag = validator["etag"][:255]
+        ob.last_modified = validator["last_modified"][:40]
+        ob.digest = results[url].hex()
+        if ob.id:
+            # bulk_update skips auto_now
+            ob.modified = timezone.now()
+            update.append(ob)
+        else:
+            create.append(ob)
+    if update:
+        ResourceDigest.objects.bulk_update(
+            update, ["etag", "last_modified", "digest", "modified"]
+        )
+    if create:
+        ResourceDigest.objects.bulk_create(create, ignore_conflicts=True)
+
+
+def get_resource_urls(hashable_nodes):
+    """ hashableURI values of hashable_nodes, returns dict uri: url """
+    from rdflib import URIRef
+    resource_urls = {}
+    for val in hashable_nodes:
+        if (
+            isinstance(val.value, URIRef) or
+            val.value.datatype != spkcgraph["hashableURI"]
+        ):
+            continue
+        # value of literals with unknown datatype is None
+        uri = str(val.value)
+        if uri in resource_urls:
+            continue
+        resource_urls[uri] = merge_get_url(uri, raw="embed")
+    return resource_urls
+
+
+def resources_unchanged(result, info_filters, budget, session):
+    """
+        checks the hashableURI resources of the graph of result
+        (conditional requests via digest cache), True if no hash changed
+    """
+    from rdflib import Graph, URIRef
+    g = Graph()
+    with result.dvfile.open("rb") as f:
+        g.parse(f, format="turtle")
+    resource_urls = get_resource_urls(get_hashable_nodes(g, info_filters))
+    if not resource_urls:
+        return True
+    url_hashes = retrieve_hashes(
+        set(resource_urls.values()), budget, session
+    )
+    for uri, url in resource_urls.items():
+        if str(g.value(URIRef(uri), spkcgraph["hash"]) or "") != \
+                url_hashes[url].hex():
+            return False
+    return True
+
+
+def get_unchanged_result(
+    view_url, source, cached, budget, session, info_filters=()
+):
+    """
+        checks pages 2.. with conditional requests (page 1 is unchanged)
+        and the linked resources, returns the DataVerificationTag of the
+        last validation if nothing was changed
+    """
+    validators = [
+        {"etag": etag, "last_modified": last_modified}
+        for etag, last_modified in cached[1:]
+    ]
+    retrieve_pages(
+        view_url, len(cached), budget, session, validators=validators
+    )
+    if not all(v.get("not_modified") for v in validators):
+        return None
+    result = DataVerificationTag.objects.filter(
+        hash=source.last_hash
+    ).first()
+    if not result or not resources_unchanged(
+        result, info_filters, budget, session
+    ):
+        return None
+    return result
+
+
+def update_source_fingerprint(source, page_validators, info_filters, digest):
+    validators = [
+        [v.get("etag", ""), v.get("last_modified", "")]
+        for v in page_validators
+    ]
+    # cacheable only if every page can be checked
+    if all(etag or last_modified for etag, last_modified in validators):
+        source.page_validators = validators
+        source.fingerprint = source.calc_fingerprint(
+            validators, info_filters
+        )
+        source.last_hash = digest
+    else:
+        source.page_validators = []
+        source.fingerprint = ""
+        source.last_hash = ""
+    with _write_lock:
+        source.save(
+            update_fields=["page_validators", "fingerprint", "last_hash"]
+        )
+
+
+def update_source(url, get_params):
+    """ update/create source object, safe for concurrent validations """
+    with _write_lock:
+        try:
+            with transaction.atomic():
+                return VerifySourceObject.objects.update_or_create(
+                    url=url, defaults={"get_params": get_params}
+                )[0]
+        except IntegrityError:
+            # created by another process meanwhile
+            VerifySourceObject.objects.filter(url=url).update(
+                get_params=get_params
+            )
+            return VerifySourceObject.objects.get(url=url)
+
+
+def store_verification(digest, dvfile, source, data_type):
+    """
+        get or create DataVerificationTag of digest and update it,
+        safe for concurrent validations
+    """
+    with _write_lock:
+        try:
+            with transaction.atomic():
+                result, created = DataVerificationTag.objects.get_or_create(
+                    defaults={
+                        "dvfile": File(dvfile),
+                        "source": source,
+                        "data_type": data_type
+                    },
+                    hash=digest
+                )
+        except IntegrityError:
+            # created by another process meanwhile
+            result = DataVerificationTag.objects.get(hash=digest)
+            created = False
+        update_fields = set()
+        # and source, cannot remove source without replacement
+        if not created and source and source != result.source:
+            result.source = source
+            update_fields.add("source")
+        if data_type != result.data_type:
+            result.data_type = data_type
+            update_fields.add("data_type")
+        result.save(update_fields=update_fields)
+    return result
+
+
+def validate(
+    ob, hostpart, task=None, info_filters=None, session=None,
+    resource_memo=None
+):
+    """
+        session: optional shared session,
+        resource_memo: optional dict url: hash shared with other validations
+    """
+    start = time.perf_counter()
+    result = "failure"
+    try:
+        ret = _validate(
+            ob, hostpart, task=task, info_filters=info_filters,
+            session=session, resource_memo=resource_memo
+        )
+        result = "success"
+        return ret
+    finally:
+        verifier_jobs.observe(time.perf_counter() - start, result=result)
+
+
+def _validate(
+    ob, hostpart, task=None, info_filters=None, session=None,
+    resource_memo=None
+):
+    from rdflib import Graph, Literal, URIRef
+    from rdflib.namespace import XSD
     dvfile = None
     source = None
     if not info_filters:
@@ -164,37 +657,60 @@ def validate(ob, hostpart, task=None, info_filters=None):
     info_filters = set(info_filters)
     g = Graph()
     g.namespace_manager.bind("spkc", spkcgraph, replace=True)
-    with requests.session() as session:
+    # validators of retrieved pages, None if not retrieved via url
+    page_validators = None
+    progress = ProgressReporter(task)
+    with use_session(session) as session:
         view_url = None
         if isinstance(ob, tuple):
-            current_size = ob[1]
+            budget = progress.budget = DownloadBudget(ob[1])
             with open(ob[0], "rb") as f:
-                retrieve_object(f, [current_size], graph=g, session=session)
+                retrieve_object(f, budget, graph=g, session=session)
             if ob[2]:
                 try:
                     os.unlink(ob[0])
                 except FileNotFoundError:
                     pass
         else:
-            current_size = 0
+            budget = progress.budget = DownloadBudget()
             view_url = ob
-            retrieve_object(ob, [current_size], graph=g, session=session)
-
-        tmp = list(g.query(
-            """
-                SELECT ?base ?scope ?pages ?view
-                WHERE {
-                    ?base spkc:scope ?scope ;
-                          spkc:pages.num_pages ?pages ;
-                          spkc:pages.current_page ?current_page ;
-                          spkc:action:view ?view .
+            source = VerifySourceObject.objects.filter(
+                url=view_url.split("?", 1)[0]
+            ).first()
+            cached = source and source.get_cached_validators(info_filters)
+            page_validators = [{}]
+            if cached:
+                page_validators[0] = {
+                    "etag": cached[0][0], "last_modified": cached[0][1]
                 }
-            """,
-            initNs={"spkc": spkcgraph},
-            initBindings={
-                "current_page": Literal(1, datatype=XSD.positiveInteger)
-            }
-        ))
+            retrieve_object(
+                ob, budget, graph=g, session=session,
+                validators=page_validators[0]
+            )
+            if page_validators[0]["not_modified"]:
+                # short-circuit if graph is unchanged
+                result = get_unchanged_result(
+                    view_url, source, cached, budget, session,
+                    info_filters=info_filters
+                )
+                cache_requests.inc(
+                    cache="verification", result="hit" if result else "miss"
+                )
+                if result:
+                    verify_tag(result, task=task, ffrom="validate")
+                    if task:
+                        task.update_state(
+                            state='SUCCESS'
+                        )
+                    return result
+                # changed, retrieve first page again
+                page_validators[0] = {}
+                retrieve_object(
+                    ob, budget, graph=g, session=session,
+                    validators=page_validators[0]
+                )
+
+        tmp = get_main_nodes(g)
 
         if len(tmp) != 1:
             raise exceptions.ValidationError(
@@ -213,48 +729,24 @@ def validate(ob, hostpart, task=None, info_filters=None):
         if len(splitted) != 2:
             splitted = [splitted[0], ""]
         # update/create source object
-        source = VerifySourceObject.objects.update_or_create(
-            url=splitted[0], defaults={"get_params": splitted[1]}
-        )[0]
-
-        # create internal info filter (only those contents are checked)
-        # differs from info field
-        _filter_info = ""
-        for filt in info_filters:
-            fchar = filt[0]
-            if fchar == "\x1e":
-                _filter_info = \
-                    f"{_filter_info}FILTER CONTAINS(?info, {filt})\n"
-            elif fchar == "!" and not filt[1] == "!":
-                _filter_info = \
-                    f"{_filter_info}FILTER NOT CONTAINS(?info, {filt[1:]})\n"
-            else:
-                raise ValueError("Invalid filter")
-
-        if task:
-            task.update_state(
-                state='RETRIEVING',
-                meta={
-                    'page': 1,
-                    'num_pages': pages
-                }
-            )
+        source = update_source(splitted[0], splitted[1])
 
-        # retrieve further pages
-        for page in range(2, pages+1):
-            url = merge_get_url(
-                view_url, raw="embed", page=str(page)
-            )
-            retrieve_object(url, [current_size], graph=g, session=session)
-
-            if task:
-                task.update_state(
-                    state='RETRIEVING',
-                    meta={
-                        'page': page,
-                        'num_pages': pages
-                    }
-                )
+        # fail early on invalid info filters
+        parse_info_filters(info_filters)
+
+        progress.update(
+            'RETRIEVING', done=1, total=pages, page=1, num_pages=pages
+        )
+
+        if page_validators is not None:
+            page_validators += [{} for page in range(2, pages+1)]
+
+        # retrieve further pages, merge in page order
+        for pg in retrieve_pages(
+            view_url, pages, budget, session, progress=progress,
+            validators=page_validators and page_validators[1:]
+        ):
+            g += pg
 
         # check and clean graph
         data_type = get_settings_func(
@@ -268,42 +760,39 @@ def validate(ob, hostpart, task=None, info_filters=None):
             )
         g.remove((None, spkcgraph["csrftoken"], None))
 
-        hashable_nodes = g.query(
-            f"""
-                SELECT DISTINCT ?base ?info ?type ?name ?value
-                WHERE {{
-                    ?base  spkc:type ?type ;
-                           spkc:properties ?pinfo, ?pval .
-                    ?pinfo spkc:name "info"^^xsd:string ;
-                           spkc:value ?info .
-                    ?pval  spkc:hashable "true"^^xsd:boolean ;
-                           spkc:name ?name ;
-                           spkc:value ?value .
-                    OPTIONAL {{
-                        ?value spkc:properties ?prop2 ;
-                               spkc:name "info"^^xsd:string ;
-                               spkc:value ?val_info .
-                    }}
-                    {_filter_info}
-                }}
-            """,
-            initNs={"spkc": spkcgraph}
+        # only contents with matching info are checked
+        hashable_nodes = get_hashable_nodes(g, info_filters)
+
+        # collect external resources and hash them concurrently
+        resource_urls = get_resource_urls(hashable_nodes)
+        for url in resource_urls.values():
+            if not get_settings_func(
+                "SPIDER_URL_VALIDATOR",
+                "spkcspider.apps.spider.functions.validate_url_default"
+            )(url):
+                raise exceptions.ValidationError(
+                    _('invalid url: %(url)s'),
+                    params={"url": url},
+                    code="invalid_url"
+                )
+        url_hashes = retrieve_hashes(
+            set(resource_urls.values()), budget, session, progress=progress,
+            memo=resource_memo
         )
+        resources_with_hash = {
+            uri: url_hashes[url] for uri, url in resource_urls.items()
+        }
 
-        if task:
-            task.update_state(
-                state='HASHING',
-                meta={
-                    'hashable_nodes_checked': 0
-                }
-            )
+        progress.update(
+            'HASHING', done=0, total=len(hashable_nodes), force=True,
+            hashable_nodes_checked=0, num_hashable_nodes=len(hashable_nodes)
+        )
         # make sure triples are linked to start
         # (user can provide arbitary data)
         g.remove((start, spkcgraph["hashed"], None))
         # MAYBE: think about logic for incoperating hashes
         g.remove((start, spkcgraph["hash"], None))
         nodes = {}
-        resources_with_hash = {}
         for count, val in enumerate(hashable_nodes, start=1):
             if isinstance(val.value, URIRef):
                 assert(val.val_info)
@@ -314,29 +803,14 @@ def validate(ob, hostpart, task=None, info_filters=None):
                 h.update(str(val.val_info).encode("utf8"))
                 _hash = h.finalize()
             elif val.value.datatype == spkcgraph["hashableURI"]:
-                _hash = resources_with_hash.get(val.value.value)
-                if not _hash:
-                    url = merge_get_url(val.value.value, raw="embed")
-                    if not get_settings_func(
-                        "SPIDER_URL_VALIDATOR",
-                        "spkcspider.apps.spider.functions.validate_url_default"
-                    )(url):
-                        raise exceptions.ValidationError(
-                            _('invalid url: %(url)s'),
-                            params={"url": url},
-                            code="invalid_url"
-                        )
-                    _hash = retrieve_object(
-                        url, [current_size], session=session
-                    )
-                    # do not use add as it could be corrupted by user
-                    # (user can provide arbitary data)
-                    _uri = URIRef(val.value.value)
-                    g.set((
-                        _uri,
-                        spkcgraph["hash"],
-                        Literal(_hash.hex())
-                    ))
+                _hash = resources_with_hash[str(val.value)]
+                # do not use add as it could be corrupted by user
+                # (user can provide arbitary data)
+                g.set((
+                    URIRef(str(val.value)),
+                    spkcgraph["hash"],
+                    Literal(_hash.hex())
+                ))
             else:
                 h = get_hashob()
                 if val.value.datatype == XSD.base64Binary:
@@ -355,20 +829,14 @@ def validate(ob, hostpart, task=None, info_filters=None):
             base = str(val.base)
             nodes.setdefault(base, ([], val.type))
             nodes[base][0].append(h.finalize())
-            if task:
-                task.update_state(
-                    state='HASHING',
-                    meta={
-                        'hashable_nodes_checked': count
-                    }
-                )
-    if task:
-        task.update_state(
-            state='HASHING',
-            meta={
-                'hashable_nodes_checked': "all"
-            }
-        )
+            progress.update(
+                'HASHING', done=count, total=len(hashable_nodes),
+                hashable_nodes_checked=count
+            )
+    progress.update(
+        'HASHING', done=len(hashable_nodes), total=len(hashable_nodes),
+        force=True, hashable_nodes_checked="all"
+    )
 
     # first sort hashes per node and create hash over sorted hashes
     # de-duplicate super-hashes (means: nodes are identical)
@@ -399,23 +867,11 @@ def validate(ob, hostpart, task=None, info_filters=None):
             dvfile, format="turtle"
         )
 
-        result, created = DataVerificationTag.objects.get_or_create(
-            defaults={
-                "dvfile": File(dvfile),
-                "source": source,
-                "data_type": data_type
-            },
-            hash=digest
+        result = store_verification(digest, dvfile, source, data_type)
+    if page_validators is not None:
+        update_source_fingerprint(
+            source, page_validators, info_filters, digest
         )
-    update_fields = set()
-    # and source, cannot remove source without replacement
-    if not created and source and source != result.source:
-        result.source = source
-        update_fields.add("source")
-    if data_type != result.data_type:
-        result.data_type = data_type
-        update_fields.add("data_type")
-    result.save(update_fields=update_fields)
     verify_tag(result, task=task, ffrom="validate")
     if task:
         task.update_state(
@@ -425,13 +881,116 @@ def validate(ob, hostpart, task=None, info_filters=None):
 
 
 if celery_app:
-    @celery_app.task(bind=True, name='async validation')
-    def async_validate(self, ob, hostpart, info_filters=None):
-        ret = validate(ob, hostpart, task=self, info_filters=info_filters)
-        return ret.get_absolute_url()
+    task_decorator = functools.partial(celery_app.task, bind=True)
 else:
-    def async_validate(self, ob, hostpart, async_validate=None):
-        raise Exception("no celery installed")
+    task_decorator = local_task
+
+
+@task_decorator(name='async validation')
+def async_validate(self, ob, hostpart, info_filters=None):
+    ret = validate(ob, hostpart, task=self, info_filters=info_filters)
+    return ret.get_absolute_url()
+
+
+def _get_batch_key(ob):
+    if isinstance(ob, str):
+        return ob
+    h = get_hashob()
+    with open(ob[0], "rb") as f:
+        for chunk in iter(lambda: f.read(BUFFER_SIZE), b''):
+            h.update(chunk)
+    return h.finalize()
+
+
+def validate_batch(obs, hostpart, task=None, info_filters=None):
+    """
+        Validate urls/files (like validate) with a shared session and
+        resource hashes. Identical sources are validated once, urls of the
+        same source object (differing GET parameters) sequentially.
+        Returns list with {"state", "result"} per item (in order)
+    """
+    keys = []
+    unique = {}
+    # source: keys of unique items
+    groups = {}
+    for ob in obs:
+        # serializers can convert tuples to lists
+        if not isinstance(ob, str):
+            ob = tuple(ob)
+        key = _get_batch_key(ob)
+        keys.append(key)
+        if key in unique:
+            # duplicate file, remove if temporary
+            if not isinstance(ob, str) and ob[2]:
+                try:
+                    os.unlink(ob[0])
+                except FileNotFoundError:
+                    pass
+        else:
+            unique[key] = ob
+            groups.setdefault(
+                ob.split("?", 1)[0] if isinstance(ob, str) else key, []
+            ).append(key)
+    progress = ProgressReporter(task)
+    resource_memo = {}
+    results = {}
+
+    def _validate(ob, session):
+        try:
+            tag = validate(
+                ob, hostpart, info_filters=info_filters, session=session,
+                resource_memo=resource_memo
+            )
+            return {"state": "SUCCESS", "result": tag.get_absolute_url()}
+        except exceptions.ValidationError as exc:
+            return {"state": "FAILURE", "result": "; ".join(exc.messages)}
+        except Exception as exc:
+            logger.exception("Validation of batch item failed")
+            return {"state": "FAILURE", "result": str(exc)}
+
+    def _report():
+        progress.update(
+            'VALIDATING', done=len(results), total=len(unique),
+            items_validated=len(results), num_items=len(unique)
+        )
+    _report()
+    max_workers = min(
+        getattr(settings, "VERIFIER_BATCH_WORKERS", 4), len(groups)
+    )
+    session = get_shared_session()
+    if max_workers <= 1:
+        for key, ob in unique.items():
+            results[key] = _validate(ob, session)
+            _report()
+    else:
+        report_lock = threading.Lock()
+
+        def _validate_thread(group):
+            try:
+                for key in group:
+                    ret = _validate(unique[key], session)
+                    with report_lock:
+                        results[key] = ret
+                        _report()
+            finally:
+                # db connections are thread local
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_validate_thread, group)
+                for group in groups.values()
+            ]
+            for future in as_completed(futures):
+                future.result()
+    return [results[key] for key in keys]
+
+
+@task_decorator(name='async batch validation')
+def async_validate_batch(self, obs, hostpart, info_filters=None):
+    return validate_batch(
+        obs, hostpart, task=self, info_filters=info_filters
+    )
 
 
 def verify_tag(tag, hostpart=None, ffrom="sync_call", task=None):
@@ -457,13 +1016,9 @@ def verify_tag(tag, hostpart=None, ffrom="sync_call", task=None):
         )
 
 
-if celery_app:
-    @celery_app.task(bind=True, name='async verification', ignore_results=True)
-    def async_verify_tag(self, tagid, hostpart=None, ffrom="async_call"):
-        verify_tag(
-            tag=DataVerificationTag.objects.get(id=tagid),
-            hostpart=hostpart, task=self, ffrom=ffrom
-        )
-else:
-    def async_verify_tag(self, tagid, hostpart=None, ffrom="async_call"):
-        raise Exception("no celery installed")
+@task_decorator(name='async verification', ignore_results=True)
+def async_verify_tag(self, tagid, hostpart=None, ffrom="async_call"):
+    verify_tag(
+        tag=DataVerificationTag.objects.get(id=tagid),
+        hostpart=hostpart, task=self, ffrom=ffrom
+    )
@@ -1,21 +1,19 @@
 """
 
-Requires celery
+Uses celery or without celery the local task backend
 
 """
-__all__ = ["InfoView", "CreateEntry", "VerifyEntry"]
+__all__ = ["InfoView", "CreateEntry", "CreateBatch", "VerifyEntry"]
 
 from urllib.parse import parse_qs, urlencode
 
-from rdflib import Literal
-
 import ratelimit
-from celery.exceptions import TimeoutError
 from django.conf import settings
 from django.contrib import messages
 from django.core.exceptions import NON_FIELD_ERRORS
 from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
 from django.shortcuts import redirect
+from django.urls import reverse
 from django.utils.decorators import method_decorator
 from django.utils.translation import gettext as _
 from django.views import View
@@ -25,9 +23,20 @@ from django.views.generic.edit import UpdateView
 from spkcspider.apps.spider.views import DefinitionsMixin
 from spkcspider.utils.settings import get_settings_func
 
-from .forms import CreateEntryForm
+from .forms import CreateBatchForm, CreateEntryForm
+from .localtasks import TimeoutError as LocalTimeoutError
 from .models import DataVerificationTag, VerifySourceObject
-from .validate import async_validate, valid_wait_states
+
+# celery and .validate (rdflib) are imported on use, loading the urls and
+# most requests don't require them
+
+
+def _get_timeout_errors():
+    try:
+        from celery.exceptions import TimeoutError
+    except ImportError:
+        return (LocalTimeoutError,)
+    return (TimeoutError, LocalTimeoutError)
 
 
 class CreateEntry(DefinitionsMixin, UpdateView):
@@ -42,6 +51,7 @@ class CreateEntry(DefinitionsMixin, UpdateView):
     def get_object(self):
         if self.task_id_field not in self.kwargs:
             return None
+        from .validate import async_validate
         return async_validate.AsyncResult(
             self.kwargs[self.task_id_field]
         )
@@ -86,9 +96,13 @@ class CreateEntry(DefinitionsMixin, UpdateView):
                 form = self.get_form()
                 form.add_error(NON_FIELD_ERRORS, res)
                 messages.error(self.request, _('Validation failed'))
-            except TimeoutError:
+            except _get_timeout_errors():
+                from .validate import valid_wait_states
                 if self.object.state in valid_wait_states:
                     self.template_name = "spider_verifier/dv_wait.html"
+                    # meta of ProgressReporter
+                    if isinstance(self.object.info, dict):
+                        kwargs["progress"] = self.object.info
                 else:
                     messages.error(self.request, _('Invalid Task'))
                     ret = redirect(
@@ -132,6 +146,7 @@ class CreateEntry(DefinitionsMixin, UpdateView):
             return self.form_invalid(form)
 
     def form_valid(self, form):
+        from .validate import async_validate
         task = async_validate.apply_async(
             args=(
                 form.save(),
@@ -152,6 +167,80 @@ class CreateEntry(DefinitionsMixin, UpdateView):
         return ret
 
 
+class CreateBatch(View):
+    """ schedule multiple urls/files as one job, status as json """
+    task_id_field = "task_id"
+
+    # exempt from csrf checks for API usage
+    @method_decorator(
+        [
+            csrf_exempt,
+            ratelimit.decorate(
+                key="user_or_ip",
+                group="create_verification_request",
+                rate=settings.VERIFIER_REQUEST_RATE,
+                block=True,
+                methods=ratelimit.UNSAFE
+            )
+        ]
+    )
+    def dispatch(self, request, *args, **kwargs):
+        ret = super().dispatch(request, *args, **kwargs)
+        ret["Access-Control-Allow-Origin"] = "*"
+        return ret
+
+    def get(self, request, *args, **kwargs):
+        if self.task_id_field not in self.kwargs:
+            return JsonResponse({"error": "missing task"}, status=404)
+        from .validate import async_validate_batch
+        res = async_validate_batch.AsyncResult(
+            self.kwargs[self.task_id_field]
+        )
+        state = res.state
+        ret = {"state": state}
+        if state == "SUCCESS":
+            # per item {"state", "result"}
+            ret["items"] = res.info
+        elif state == "FAILURE":
+            ret["error"] = str(res.info)
+        elif isinstance(res.info, dict):
+            ret["progress"] = res.info
+        return JsonResponse(ret)
+
+    def post(self, request, *args, **kwargs):
+        form = CreateBatchForm(data=request.POST, files=request.FILES)
+        if not get_settings_func(
+            "VERIFIER_REQUEST_VALIDATOR",
+            "spkcspider.apps.verifier.functions.validate_request_default"
+        )(self.request, form):
+            return JsonResponse({"errors": form.errors}, status=400)
+        from .validate import async_validate_batch
+        task = async_validate_batch.apply_async(
+            args=(
+                form.save(),
+                "{}://{}".format(
+                    self.request.scheme, self.request.get_host()
+                ),
+                getattr(
+                    settings,
+                    "VERIFIER_INFO_FILTERS",
+                    []
+                )
+            ), track_started=True
+        )
+        return JsonResponse(
+            {
+                "task_id": task.task_id,
+                "status": reverse(
+                    "spider_verifier:batch_task", kwargs={
+                        "task_id": task.task_id
+                    }
+                )
+            },
+            status=202
+        )
+
+
 class VerifyEntry(DefinitionsMixin, DetailView):
     model = DataVerificationTag
     slug_field = "hash"
@@ -159,6 +248,7 @@ class VerifyEntry(DefinitionsMixin, DetailView):
     template_name = "spider_verifier/dv_detail.html"
 
     def get_context_data(self, **kwargs):
+        from rdflib import Literal
         if self.object.verification_state == "verified":
             if self.object.checked:
                 kwargs["verified"] = Literal(self.object.checked)
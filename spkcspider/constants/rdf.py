@@ -3,10 +3,40 @@
 """
 
 __all__ = [
-    "spkcgraph",
+    "LazyNamespace", "spkcgraph",
 ]
 
-from rdflib.namespace import Namespace
+
+class LazyNamespace(object):
+    """
+        subset of rdflib Namespace, rdflib is imported on first term access
+        (most processes never need rdflib).
+        Not a str (like Namespace) so every attribute is a term,
+        str(namespace) returns the uri
+    """
+    __slots__ = ("_uri",)
+
+    def __init__(self, uri):
+        self._uri = uri
+
+    def __str__(self):
+        return self._uri
+
+    def __repr__(self):
+        return "LazyNamespace(%r)" % self._uri
+
+    def term(self, name):
+        from rdflib.term import URIRef
+        return URIRef(self._uri + (name if isinstance(name, str) else ""))
+
+    def __getitem__(self, key):
+        return self.term(key)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.term(name)
+
 
 # Literal allows arbitary datatypes, use this and don't bind
-spkcgraph = Namespace("https://spkcspider.net/static/schemes/spkcgraph#")
+spkcgraph = LazyNamespace("https://spkcspider.net/static/schemes/spkcgraph#")
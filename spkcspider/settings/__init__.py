@@ -58,6 +58,10 @@ except ImportError:
 
 
 MIDDLEWARE = [
+    # only active with SPIDER_METRICS
+    'spkcspider.apps.spider.middleware.RequestMetricsMiddleware',
+    # only active with SPIDER_REQUEST_STATS
+    'spkcspider.apps.spider.middleware.RequestStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -65,6 +69,8 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'spkcspider.apps.spider.middleware.TokenUserMiddleware',
+    # only active with SPIDER_REQUEST_PROFILER
+    'spkcspider.apps.spider.middleware.RequestProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django.contrib.flatpages.middleware.FlatpageFallbackMiddleware',
@@ -204,6 +210,8 @@ UPDATE_DYNAMIC_AFTER_MIGRATION = True
 
 # SPIDER_TAG_VERIFIER_VALIDATOR
 # SPIDER_TAG_VERIFY_REQUEST_VALIDATOR
+# compiled tag layout forms kept per process
+# SPIDER_TAG_FORM_CACHE_SIZE = 200
 
 # SPIDER_ANCHOR_DOMAIN
 # SPIDER_ANCHOR_SCHEME
@@ -224,6 +232,13 @@ UPDATE_DYNAMIC_AFTER_MIGRATION = True
 ## in units  # noqa: E266
 # SPIDER_USER_QUOTA_USERCOMPONENTS
 
+## compress AttachedBlobs (texts, keys, configs) with first available codec  # noqa: E266, E501
+## of list, "zstd" requires zstandard, empty/unset disables compression  # noqa: E266, E501
+## existing blobs can be converted with: manage.py compress_blobs  # noqa: E266, E501
+# SPIDER_BLOB_CODECS = ["zstd", "zlib"]
+## minimal size in bytes before compression is tried, default: 256  # noqa: E266, E501
+# SPIDER_BLOB_COMPRESS_MIN_SIZE
+
 # set seperate hash algorithm for verifier
 # VERIFIER_HASH_ALGORITHM
 # only look at contents with this info properties
@@ -256,6 +271,73 @@ SPIDER_BLACKLISTED_MODULES = []
 SPIDER_DOMAIN_UPDATE_RATE = "10/m"
 # maximal error rate for a domain before blocking requests
 SPIDER_DOMAIN_ERROR_RATE = "10/10m"
+# circuit breaker for outgoing requests to referrers/verifiers (per host)
+# open circuit after n consecutive host failures (connection, timeout, 5xx)
+# SPIDER_CIRCUIT_FAILURES = 3
+# initial seconds to fail fast, doubled after every failed probe
+# SPIDER_CIRCUIT_BACKOFF = 30
+# SPIDER_CIRCUIT_MAX_BACKOFF = 3600
+# cache alias for circuit state, should be shared between workers
+# SPIDER_CIRCUIT_CACHE = "default"
+# "sync": post token to referrer within request
+# "queue": queue post, redirect user to status page; requires celery or
+#          manage.py deliver_referrers --loop
+# SPIDER_REFERRER_DELIVERY = "sync"
+# retries and initial backoff in seconds (doubled every attempt)
+# SPIDER_REFERRER_DELIVERY_RETRIES = 5
+# SPIDER_REFERRER_DELIVERY_BACKOFF = 10
+# remove finished deliveries after seconds
+# SPIDER_REFERRER_DELIVERY_EXPIRES = 86400
+# build and freeze registries on startup instead of on first request
+# (build times are logged), feature urls are resolved on first use if not
+# cached in SPIDER_REGISTRY_MANIFEST
+# SPIDER_REGISTRY_WARMUP = False
+# json file caching resolved feature urls (without script prefix) and deletion
+# periods, rebuilt if installed apps, their versions or relevant settings
+# change
+# SPIDER_REGISTRY_MANIFEST = os.path.join(BASE_DIR, "registry_manifest.json")
+# cache alias and timeout (seconds) for component view-models (content list)
+# SPIDER_VIEWMODEL_CACHE = "default"
+# SPIDER_VIEWMODEL_TIMEOUT = 600
+# timeouts (seconds) of cached public index pages (same cache), search results
+# are cached shortly, timeouts end at latest on travel protection activation
+# SPIDER_PUBLIC_INDEX_TIMEOUT = 300
+# SPIDER_PUBLIC_INDEX_SEARCH_TIMEOUT = 30
+# remove expired entities via the public index at most every x seconds
+# SPIDER_PUBLIC_INDEX_SWEEP_INTERVAL = 60
+# directory (default storage) of sitemaps pre-generated by
+# "manage.py generate_sitemaps" (run periodically), urls per sitemap file
+# SPIDER_SITEMAP_DIR = "sitemaps"
+# SPIDER_SITEMAP_LIMIT = 50000
+# record per request stats (view, scope, sql queries, size), logged as json
+# to logger "spkcspider.request_stats"
+# SPIDER_REQUEST_STATS = False
+# warn if requests exceed query budget, keys: "<view name>[:<scope>]"
+# SPIDER_QUERY_BUDGETS = {"spider_base:ucontent-list": 30}
+# profile requests (cProfile, sql without parameters) of superusers with
+# header X-SPIDER-PROFILE or GET parameter spider_profile, view in admin
+# under admin/spider_profiles/
+# SPIDER_REQUEST_PROFILER = False
+# additionally profile random requests (0.0-1.0)
+# SPIDER_PROFILER_SAMPLE_RATE = 0.0
+# ring buffer: cache alias, amount and timeout (seconds) of kept profiles
+# SPIDER_PROFILER_CACHE = "default"
+# SPIDER_PROFILER_SIZE = 20
+# SPIDER_PROFILER_TIMEOUT = 86400
+# SPIDER_PROFILER_MAX_QUERIES = 500
+# stack sample interval (seconds) for collapsed stacks (flamegraphs)
+# SPIDER_PROFILER_INTERVAL = 0.001
+# record metrics (latencies, auth results, tokens, caches, uploads, verifier)
+# prometheus text format under metrics/ for staff
+# SPIDER_METRICS = False
+# additionally allow scraping from ips (without login)
+# behind a local reverse proxy every request has the proxy address
+# SPIDER_METRICS_ALLOWED_IPS = ["127.0.0.1", "::1"]
+# multiple processes (e.g. gunicorn workers): shared directory for values of
+# processes, written after SPIDER_METRICS_FLUSH_INTERVAL seconds and at exit
+# clear on deployment (counters of stopped processes are kept)
+# SPIDER_METRICS_DIR = os.path.join(BASE_DIR, "metrics")
+# SPIDER_METRICS_FLUSH_INTERVAL = 5
 # max description length (stripped)
 SPIDER_MAX_DESCRIPTION_LENGTH = 200
 # how many user components/contents per page
@@ -328,6 +410,12 @@ SPIDER_REQUEST_KWARGS_MAP = {
     #     "proxies": {}
     # }
 }
+# outgoing requests use shared keep-alive connection pools
+# (one per verify/cert/proxies combination)
+# amount of hosts with cached pools
+# SPIDER_HTTP_POOL_CONNECTIONS = 10
+# maximal idle connections per host
+# SPIDER_HTTP_POOL_MAXSIZE = 10
 
 
 # for sites
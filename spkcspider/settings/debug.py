@@ -13,6 +13,9 @@ INSTALLED_APPS += [
     'captcha'
 ]
 USE_CAPTCHAS = True
+# for query budgets in tests
+SPIDER_REQUEST_STATS = True
+SPIDER_REQUEST_PROFILER = True
 
 
 DOMAINAUTH_URL = 'spider_domainauth:domainauth-db'
@@ -31,6 +34,8 @@ SPIDER_REQUEST_KWARGS_MAP["localhost"] = {
 # * b"default": default parameters for request
 # why binary? Because it cannot clash with a "default" host this way
 # hierarchy: host > tld > b"default"
+# special key (not passed to requests):
+# * "max_concurrency": maximal parallel requests to host (default: 4)
 # NOTE: if VERIFIER_REQUEST_KWARGS_MAP is not specified
 #       SPIDER_REQUEST_KWARGS_MAP is used
 VERIFIER_REQUEST_KWARGS_MAP = {
@@ -52,6 +57,18 @@ VERIFIER_REQUEST_RATE = "10/m"
 VERIFIER_MAX_SIZE_ACCEPTED = 40000000
 # 2 mb, set to 0 to disable a direct file upload
 VERIFIER_MAX_SIZE_DIRECT_ACCEPTED = 2000000
+# worker threads for retrieving pages (shared connection pool size)
+VERIFIER_MAX_CONCURRENT_REQUESTS = 8
+# update progress of validation tasks at most every x items or seconds
+# VERIFIER_PROGRESS_ITEMS = 100
+# VERIFIER_PROGRESS_INTERVAL = 1.0
+# without celery: verification tasks run in a thread pool of the web process
+# VERIFIER_LOCAL_TASK_WORKERS = 2
+# remove finished local task results after seconds
+# VERIFIER_LOCAL_TASK_RESULT_EXPIRES = 86400
+# batch verification: max items per job, items validated in parallel
+# VERIFIER_BATCH_MAX_ITEMS = 100
+# VERIFIER_BATCH_WORKERS = 4
 # hook for verifing tag, return: should callback should be fired?, takes:
 #    tag, from_validate
 # arguments
@@ -79,6 +96,9 @@ DATABASES = {
     }
 }
 
+# compress blobs if possible
+SPIDER_BLOB_CODECS = ["zstd", "zlib"]
+
 # how many user contents/components per page
 SPIDER_OBJECTS_PER_PAGE = 3
 # how many raw/serialized results per page?
@@ -23,8 +23,13 @@ from django.urls import include, path
 from django.views.decorators.cache import cache_page
 from django.views.generic.base import RedirectView
 from spkcspider.apps.spider.functions import admin_login
-from spkcspider.apps.spider.sitemaps import sitemaps
-from spkcspider.apps.spider.views import ComponentPublicIndex
+from spkcspider.apps.spider.sitemaps import (
+    sitemap_chunk_view, sitemap_index_view, sitemaps
+)
+from spkcspider.apps.spider.views import (
+    ComponentPublicIndex, MetricsView, RequestProfileDownload,
+    RequestProfileIndex
+)
 from spkcspider.utils.settings import get_settings_func
 
 favicon_view = RedirectView.as_view(
@@ -45,7 +50,19 @@ admin.site.has_permission = lambda *args, **kwargs: get_settings_func(
 )(admin.site, *args, **kwargs)
 
 urlpatterns = [
+    # before admin urls, admin_view checks admin permission
+    path(
+        'admin/spider_profiles/',
+        admin.site.admin_view(RequestProfileIndex.as_view()),
+        name="spider-profiles"
+    ),
+    path(
+        'admin/spider_profiles/<int:id>/<slug:kind>/',
+        admin.site.admin_view(RequestProfileDownload.as_view()),
+        name="spider-profile-download"
+    ),
     path('admin/', admin.site.urls),
+    path('metrics/', MetricsView.as_view(), name="spider-metrics"),
     path(
         '',
         ComponentPublicIndex.as_view(
@@ -126,18 +143,18 @@ urlpatterns += [
     # daily
     path('favicon.ico', cache_page(86400)(favicon_view)),
     path('robots.txt', cache_page(86400)(robots_view)),
-    # daily
+    # pre-generated (generate_sitemaps) or daily
     path(
         'sitemap.xml',
-        cache_page(86400)(
-            sitemaps_views.index
-        ),
-        {
-            'sitemaps': sitemaps,
-            'sitemap_url_name': 'sitemaps'
-        },
+        sitemap_index_view,
         name='django.contrib.sitemaps.views.index'
     ),
+    # pre-generated chunks, conditional GET
+    path(
+        'sitemap-<slug:section>-<int:chunk>.xml',
+        sitemap_chunk_view,
+        name='spider-sitemap-chunk'
+    ),
     # hourly
     path(
         'sitemap-<section>.xml',
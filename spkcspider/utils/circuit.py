@@ -0,0 +1,107 @@
+__all__ = (
+    "CircuitBreaker", "is_host_failure"
+)
+
+import hashlib
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def is_host_failure(exc):
+    """ errors which indicate an unreachable/broken host """
+    if isinstance(
+        exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    ):
+        return True
+    if (
+        isinstance(exc, requests.exceptions.HTTPError) and
+        exc.response is not None and exc.response.status_code >= 500
+    ):
+        return True
+    return False
+
+
+class CircuitBreaker(object):
+    """
+        Circuit breaker per host, state is stored in cache (shared between
+        workers).
+        closed: requests allowed, failures are counted
+        open: requests fail fast until backoff expired
+        half_open: one probe request is allowed, success closes the circuit,
+                   failure opens it again with doubled backoff
+    """
+    host = None
+
+    def __init__(self, url):
+        self.host = urlsplit(url).netloc or url
+        key = hashlib.sha256(self.host.encode("utf8")).hexdigest()
+        self.key = "spkc_circuit:%s" % key
+        self.probe_key = "spkc_circuit_probe:%s" % key
+        self.cache = caches[
+            getattr(settings, "SPIDER_CIRCUIT_CACHE", "default")
+        ]
+
+    @property
+    def failure_threshold(self):
+        return getattr(settings, "SPIDER_CIRCUIT_FAILURES", 3)
+
+    @property
+    def base_backoff(self):
+        return getattr(settings, "SPIDER_CIRCUIT_BACKOFF", 30)
+
+    @property
+    def max_backoff(self):
+        return getattr(settings, "SPIDER_CIRCUIT_MAX_BACKOFF", 3600)
+
+    def get_state(self):
+        return self.cache.get(self.key) or {
+            "state": "closed", "failures": 0, "opened": 0, "backoff": 0
+        }
+
+    def _set_state(self, state):
+        # keep long enough to remember the backoff
+        self.cache.set(self.key, state, self.max_backoff * 2)
+
+    @property
+    def state(self):
+        state = self.get_state()
+        if (
+            state["state"] == "open" and
+            time.time() >= state["opened"] + state["backoff"]
+        ):
+            return "half_open"
+        return state["state"]
+
+    def allow(self):
+        """ should a request be made? """
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open":
+            # only one probe per backoff period
+            return self.cache.add(
+                self.probe_key, True, max(self.base_backoff, 1)
+            )
+        return False
+
+    def record_success(self):
+        self.cache.delete_many([self.key, self.probe_key])
+
+    def record_failure(self):
+        state = self.get_state()
+        state["failures"] += 1
+        if state["state"] == "open":
+            # failed probe
+            state["backoff"] = min(state["backoff"] * 2, self.max_backoff)
+            state["opened"] = time.time()
+        elif state["failures"] >= self.failure_threshold:
+            state["state"] = "open"
+            state["backoff"] = self.base_backoff
+            state["opened"] = time.time()
+        self._set_state(state)
+        self.cache.delete(self.probe_key)
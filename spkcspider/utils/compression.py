@@ -0,0 +1,88 @@
+__all__ = (
+    "Codec", "codecs", "get_codec", "get_preferred_codec", "accepts_encoding"
+)
+
+import zlib
+from collections import namedtuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# name: stored codec marker (max 10 chars)
+# content_encoding: matching http Content-Encoding token
+Codec = namedtuple(
+    "Codec", ["name", "compress", "decompress", "content_encoding"]
+)
+
+# zlib stream format is what http calls "deflate"
+codecs = {
+    "zlib": Codec(
+        "zlib", lambda data: zlib.compress(data, 6), zlib.decompress,
+        "deflate"
+    )
+}
+
+if zstandard:
+    codecs["zstd"] = Codec(
+        "zstd",
+        lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+        # frames written by compress contain the content size
+        lambda data: zstandard.ZstdDecompressor().decompress(data),
+        "zstd"
+    )
+
+
+def get_codec(name):
+    """ returns codec or None for uncompressed data, raises on unknown """
+    if not name:
+        return None
+    try:
+        return codecs[name]
+    except KeyError:
+        raise ValueError("Codec not available: %s" % name)
+
+
+def get_preferred_codec(preference):
+    """ first available codec of preference list (or None) """
+    if isinstance(preference, str):
+        preference = [preference]
+    for name in preference or ():
+        if name in codecs:
+            return codecs[name]
+    return None
+
+
+def _parse_accept_encoding(header):
+    """ {coding: q-value} of Accept-Encoding header """
+    ret = {}
+    for item in header.split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+        ret[coding] = q
+    return ret
+
+
+def accepts_encoding(request, content_encoding):
+    """
+        checks Accept-Encoding header of request for content_encoding,
+        respects q-values (q=0: not acceptable) and "*"
+    """
+    if not request:
+        return False
+    accepted = _parse_accept_encoding(
+        request.META.get('HTTP_ACCEPT_ENCODING', '')
+    )
+    q = accepted.get(content_encoding.lower(), accepted.get("*", 0.0))
+    return q > 0
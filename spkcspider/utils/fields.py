@@ -9,10 +9,10 @@ from functools import reduce
 
 from django.conf import settings
 from django.forms import BoundField, Field
-from rdflib import RDF, XSD, BNode, Literal, URIRef
-from rdflib.term import Identifier
 from spkcspider.constants import spkcgraph
 
+# rdflib is imported in the functions using it (slow import)
+
 # for not spamming sets
 _empty_set = frozenset()
 
@@ -32,6 +32,7 @@ def field_to_python(value):
 def literalize(
     ob=None, datatype=None, use_uriref=None, domain_base=""
 ):
+    from rdflib import RDF, XSD, BNode, Literal, URIRef
     if isinstance(ob, BoundField):
         # if datatype is None or Field: overwrite
         if isinstance(datatype, (BoundField, Field, int)):
@@ -130,6 +131,8 @@ def add_property(
     graph, name, ref=None, ob=None, literal=None, datatype=None,
     iterate=False
 ):
+    from rdflib import RDF, XSD, BNode, Literal
+    from rdflib.term import Identifier
     value_node = BNode()
     if ref:
         graph.add((
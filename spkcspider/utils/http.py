@@ -0,0 +1,127 @@
+__all__ = (
+    "get_session", "get_pool_stats", "close_sessions", "instrument_session",
+    "disable_cookies", "outbound_duration"
+)
+
+import json
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from django.conf import settings
+
+from .metrics import Histogram
+
+# keep-alive sessions, one per connection relevant parameter set
+# (urllib3 pools are per host and thread-safe)
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# parameters which change the connection (others are per request)
+_connection_params = ("verify", "cert", "proxies")
+
+
+def _get_key(params):
+    return json.dumps(
+        {key: params.get(key) for key in _connection_params},
+        sort_keys=True, default=str
+    )
+
+
+outbound_duration = Histogram(
+    "spider_outbound_request_duration_seconds",
+    "Latency of outgoing requests (until response headers)", ["host"]
+)
+
+
+def _record_response(response, *args, **kwargs):
+    outbound_duration.observe(
+        response.elapsed.total_seconds(),
+        host=urlsplit(response.url).hostname or ""
+    )
+
+
+def instrument_session(session):
+    """ record latency of responses by host """
+    session.hooks["response"].append(_record_response)
+    return session
+
+
+def disable_cookies(session):
+    """
+        refuse all cookies, sessions are shared between users and requests
+        (cookies of a referrer would be sent in requests of other users)
+    """
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+def get_session(params=None, pool_maxsize=None):
+    """
+        Shared keep-alive session for params (entry of
+        SPIDER_REQUEST_KWARGS_MAP), params must still be passed per request
+    """
+    key = _get_key(params or {})
+    session = _sessions.get(key)
+    if session and (not pool_maxsize or session.pool_maxsize >= pool_maxsize):
+        return session
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session and (
+            not pool_maxsize or session.pool_maxsize >= pool_maxsize
+        ):
+            return session
+        maxsize = max(
+            pool_maxsize or 0,
+            getattr(settings, "SPIDER_HTTP_POOL_MAXSIZE", 10)
+        )
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=getattr(
+                settings, "SPIDER_HTTP_POOL_CONNECTIONS", 10
+            ),
+            pool_maxsize=maxsize
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.pool_maxsize = maxsize
+        disable_cookies(session)
+        instrument_session(session)
+        # replaced sessions are still usable by current users
+        _sessions[key] = session
+    return session
+
+
+def get_pool_stats():
+    """ list of host pools with connections and requests """
+    ret = []
+    for key, session in list(_sessions.items()):
+        seen = set()
+        for adapter in session.adapters.values():
+            if id(adapter) in seen:
+                continue
+            seen.add(id(adapter))
+            for pool_key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(pool_key)
+                if not pool:
+                    continue
+                ret.append({
+                    "params": key,
+                    "scheme": pool.scheme,
+                    "host": pool.host,
+                    "port": pool.port,
+                    "connections": pool.num_connections,
+                    "requests": pool.num_requests,
+                    "idle": pool.pool.qsize() if pool.pool else 0
+                })
+    return ret
+
+
+def close_sessions():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
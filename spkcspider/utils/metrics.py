@@ -0,0 +1,275 @@
+"""
+Metrics registry (counters, histograms) with prometheus text exposition
+values are only recorded with SPIDER_METRICS
+multi-process (e.g. gunicorn workers): every process dumps its values into
+SPIDER_METRICS_DIR (after SPIDER_METRICS_FLUSH_INTERVAL seconds and at exit),
+the exposition merges the dumps of all processes
+"""
+
+__all__ = (
+    "Counter", "Histogram", "MetricsRegistry", "registry", "DEFAULT_BUCKETS"
+)
+
+import atexit
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# replaces label values of series exceeding max_series
+OVERFLOW_LABEL = "_other"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace(
+        '"', '\\"'
+    )
+
+
+def _format_labels(labelnames, labelvalues, extra=()):
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ""
+    return "{%s}" % ",".join(
+        '%s="%s"' % (name, _escape(value)) for name, value in pairs
+    )
+
+
+def _get_default_registry():
+    return registry
+
+
+class Metric(object):
+    type = None
+
+    def __init__(
+        self, name, documentation, labelnames=(), registry=None,
+        max_series=1000
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self.registry = registry if registry is not None else \
+            _get_default_registry()
+        self.registry.register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                "%s: expected labels %s" % (self.name, self.labelnames)
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _update(self, labels, func):
+        if not getattr(settings, "SPIDER_METRICS", False):
+            return
+        key = self._key(labels)
+        with self.registry.lock:
+            values = self.registry.values.setdefault(self.name, {})
+            if key not in values and len(values) >= self.max_series:
+                key = (OVERFLOW_LABEL,) * len(key)
+            values[key] = func(values.get(key))
+        self.registry.maybe_flush()
+
+    def merge(self, old, new):
+        raise NotImplementedError()
+
+    def expose(self, values):
+        raise NotImplementedError()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        self._update(labels, lambda old: (old or 0) + amount)
+
+    def merge(self, old, new):
+        return (old or 0) + new
+
+    def expose(self, values):
+        for key, value in sorted(values.items()):
+            yield "%s%s %s" % (
+                self.name, _format_labels(self.labelnames, key),
+                _format_value(value)
+            )
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets=DEFAULT_BUCKETS, **kwargs):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(*args, **kwargs)
+
+    def observe(self, value, **labels):
+        def _func(old):
+            # non-cumulative bucket counts + overflow, sum
+            if not old:
+                old = [[0] * (len(self.buckets) + 1), 0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    break
+            else:
+                index = len(self.buckets)
+            old[0][index] += 1
+            old[1] += value
+            return old
+        self._update(labels, _func)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def merge(self, old, new):
+        if not old:
+            return [list(new[0]), new[1]]
+        return [[a + b for a, b in zip(old[0], new[0])], old[1] + new[1]]
+
+    def expose(self, values):
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(
+                (*self.buckets, math.inf), counts
+            ):
+                cumulative += count
+                yield "%s_bucket%s %s" % (
+                    self.name, _format_labels(
+                        self.labelnames, key, (("le", _format_value(bound)),)
+                    ), cumulative
+                )
+            labels = _format_labels(self.labelnames, key)
+            yield "%s_sum%s %s" % (self.name, labels, _format_value(total))
+            yield "%s_count%s %s" % (self.name, labels, cumulative)
+
+
+class MetricsRegistry(object):
+    def __init__(self):
+        self.metrics = {}
+        # name: {label values: value}
+        self.reset_process()
+
+    def reset_process(self):
+        """ new dump file, forked processes start with empty values """
+        self.filename = "%s-%s.json" % (os.getpid(), uuid.uuid4().hex)
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError("metric already registered: %s" % metric.name)
+        self.metrics[metric.name] = metric
+
+    def get_dir(self):
+        return getattr(settings, "SPIDER_METRICS_DIR", None)
+
+    def maybe_flush(self):
+        if not self.get_dir():
+            return
+        if time.monotonic() - self.last_flush >= getattr(
+            settings, "SPIDER_METRICS_FLUSH_INTERVAL", 5
+        ):
+            self.flush()
+
+    def dump(self):
+        with self.lock:
+            return {
+                name: [
+                    # copy histogram values, can be changed meanwhile
+                    [list(key), [list(value[0]), value[1]]]
+                    if isinstance(value, list) else [list(key), value]
+                    for key, value in values.items()
+                ] for name, values in self.values.items()
+            }
+
+    def flush(self):
+        """ write values of this process into SPIDER_METRICS_DIR """
+        directory = self.get_dir()
+        if not directory:
+            return
+        self.last_flush = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        fd, tmppath = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.dump(), f)
+            # atomic
+            os.replace(tmppath, os.path.join(directory, self.filename))
+        except BaseException:
+            os.unlink(tmppath)
+            raise
+
+    def collect(self):
+        """ merged values of all processes """
+        merged = {}
+        dumps = [self.dump()]
+        directory = self.get_dir()
+        if directory and os.path.isdir(directory):
+            for filename in os.listdir(directory):
+                if filename == self.filename or \
+                        not filename.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(directory, filename)) as f:
+                        dumps.append(json.load(f))
+                except (OSError, ValueError):
+                    # removed meanwhile or broken
+                    continue
+        for dump in dumps:
+            for name, values in dump.items():
+                metric = self.metrics.get(name)
+                if not metric:
+                    continue
+                target = merged.setdefault(name, {})
+                for key, value in values:
+                    key = tuple(key)
+                    target[key] = metric.merge(target.get(key), value)
+        return merged
+
+    def exposition(self):
+        """ prometheus text format (version 0.0.4) """
+        merged = self.collect()
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append("# HELP %s %s" % (
+                name, metric.documentation.replace("\\", "\\\\").replace(
+                    "\n", "\\n"
+                )
+            ))
+            lines.append("# TYPE %s %s" % (name, metric.type))
+            lines.extend(metric.expose(merged.get(name, {})))
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self.lock:
+            self.values.clear()
+
+
+registry = MetricsRegistry()
+atexit.register(registry.flush)
+# e.g. gunicorn --preload: don't count values of parent twice
+os.register_at_fork(after_in_child=registry.reset_process)
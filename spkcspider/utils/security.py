@@ -11,8 +11,6 @@ from statistics import mean
 
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils.encoding import force_bytes
@@ -46,6 +44,9 @@ def aesgcm_scrypt_cryptor(pw, salt=None, params=_Scrypt_params):
     if salt is None:
         salt = settings.SECRET_KEY
     salt = force_bytes(salt)
+    # slow imports
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
 
     return AESGCM(
         Scrypt(
@@ -60,6 +61,7 @@ def aesgcm_pbkdf2_cryptor(pw, salt=None, params=_pbkdf2_params):
     if salt is None:
         salt = settings.SECRET_KEY
     salt = force_bytes(salt)
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
     return AESGCM(
         pbkdf2_hmac(
@@ -1,7 +1,12 @@
-__all__ = ["LiveDjangoTestApp", "MockAsyncValidate", "MockAsyncVerifyTag"]
+__all__ = [
+    "LiveDjangoTestApp", "MockAsyncValidate", "MockAsyncVerifyTag",
+    "QueryBudgetMixin"
+]
 
 from celery import uuid
 from django_webtest import DjangoTestApp
+from spkcspider.apps.spider.middleware import get_query_budget
+from spkcspider.apps.spider.signals import request_stats
 from spkcspider.apps.verifier.validate import validate, verify_tag
 
 
@@ -51,3 +56,36 @@ class MockAsyncVerifyTag(object):
         self = cls()
         verify_tag(**kwargs["kwargs"])
         return self
+
+
+class QueryBudgetMixin(object):
+    """
+        records stats of requests (requires SPIDER_REQUEST_STATS)
+        fails test if a request exceeds its budget in query_budgets,
+        keys: "<view name>:<scope>" or "<view name>"
+    """
+    query_budgets = {}
+
+    def _pre_setup(self):
+        # setUp is often overwritten without calling super
+        super()._pre_setup()
+        self.request_stats = []
+        request_stats.connect(self._record_request_stats)
+        self.addCleanup(self.assertQueryBudgets)
+        self.addCleanup(
+            request_stats.disconnect, self._record_request_stats
+        )
+
+    def _record_request_stats(self, sender, stats, **kwargs):
+        self.request_stats.append(stats)
+
+    def assertQueryBudgets(self, budgets=None):
+        if budgets is None:
+            budgets = self.query_budgets
+        for stats in self.request_stats:
+            budget = get_query_budget(budgets, stats)
+            if budget is not None:
+                self.assertLessEqual(
+                    stats["queries"], budget,
+                    "query budget exceeded: %s" % stats
+                )
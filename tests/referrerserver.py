@@ -15,6 +15,8 @@ class ReferrerServer(HTTPServer):
         super().__init__(*args, **kwargs)
         self.tokens = {}
         self.unverified = {}
+        # Cookie header of last request
+        self.last_cookie = None
         self.runthread = threading.Thread(target=self.serve_forever)
         self.runthread.daemon = True
 
@@ -22,7 +24,13 @@ class ReferrerServer(HTTPServer):
 class ReferrerHandler(BaseHTTPRequestHandler):
     query = None
 
+    def send_response(self, *args, **kwargs):
+        super().send_response(*args, **kwargs)
+        # like a session of a referrer, must not be replayed by the spider
+        self.send_header("Set-Cookie", "sessionid=referrer; Path=/")
+
     def do_POST(self):
+        self.server.last_cookie = self.headers.get("Cookie")
         length = self.headers.get('content-length')
         if not length:
             self.send_error(400)
@@ -70,6 +78,7 @@ class ReferrerHandler(BaseHTTPRequestHandler):
             self.end_headers()
 
     def do_GET(self):
+        self.server.last_cookie = self.headers.get("Cookie")
         sp = urlsplit(self.path)
         self.query = parse_qs(sp.query)
         # check secret
@@ -13,11 +13,15 @@ from spkcspider.apps.spider.signals import update_dynamic
 from spkcspider.apps.spider_accounts.models import SpiderUser
 from spkcspider.constants import spkcgraph
 from spkcspider.utils.security import create_b64_id_token
+from tests.helpers import QueryBudgetMixin
+from tests.test_spider.querybudgets import query_budgets
 
 # Create your tests here.
 
 
-class BasicComponentTest(TransactionTestCase):
+class BasicComponentTest(QueryBudgetMixin, TransactionTestCase):
+    query_budgets = query_budgets
+
     def setUp(self):
         self.client = Client(secure=True, enforce_csrf_checks=True)
         self.user = SpiderUser.objects.create_user(
@@ -131,7 +135,8 @@ class BasicComponentTest(TransactionTestCase):
         )
 
 
-class AdvancedComponentTest(TransactionWebTest):
+class AdvancedComponentTest(QueryBudgetMixin, TransactionWebTest):
+    query_budgets = query_budgets
     fixtures = ['test_default.json']
 
     def setUp(self):
@@ -479,3 +484,27 @@ class AdvancedComponentTest(TransactionWebTest):
                 )
             with self.assertRaises(content.DoesNotExist):
                 AssignedContent.objects.from_url_part("7_8383", info=[])
+
+    def test_export(self):
+        self.assertEqual(
+            reverse(
+                "spider_base:ucomponent-export", kwargs={"user": "testuser1"}
+            ),
+            "/spider/components/testuser1/export/"
+        )
+        self.app.set_user(user="testuser1")
+        response = self.app.get(reverse("spider_base:ucomponent-export"))
+        self.assertEqual(response.status_code, 200)
+        # superusers can view and export the components of other users
+        SpiderUser.objects.create_superuser(
+            username="testsuperuser", password="abc"
+        )
+        self.app.set_user(user="testsuperuser")
+        response = self.app.get(reverse(
+            "spider_base:ucomponent-list", kwargs={"user": "testuser1"}
+        ))
+        self.assertEqual(response.status_code, 200)
+        response = self.app.get(reverse(
+            "spider_base:ucomponent-export", kwargs={"user": "testuser1"}
+        ))
+        self.assertEqual(response.status_code, 200)
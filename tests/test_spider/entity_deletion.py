@@ -9,9 +9,12 @@ from rdflib import RDF, XSD, Graph, Literal, URIRef
 from spkcspider.apps.spider.signals import update_dynamic
 from spkcspider.apps.spider_accounts.models import SpiderUser
 from spkcspider.constants.rdf import spkcgraph
+from tests.helpers import QueryBudgetMixin
+from tests.test_spider.querybudgets import query_budgets
 
 
-class DeletionTest(TransactionWebTest):
+class DeletionTest(QueryBudgetMixin, TransactionWebTest):
+    query_budgets = query_budgets
     fixtures = ['test_default.json']
 
     def setUp(self):
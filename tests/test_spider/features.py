@@ -1,22 +1,49 @@
+import json
+import os
+import pstats
 import re
+import socket
+import tempfile
+import time
+from unittest import mock
 from urllib.parse import parse_qs, urlsplit
 
 import requests
-from rdflib import RDF, XSD, Graph, Literal
+from rdflib import RDF, XSD, Graph, Literal, URIRef
 
-from django.test import override_settings
-from django.urls import reverse
+from django.test import Client, SimpleTestCase, override_settings
+from django.urls import reverse, set_script_prefix
+from django.utils import timezone
 from django_webtest import TransactionWebTest
-from spkcspider.apps.spider.models import AuthToken, ContentVariant
+from spkcspider.apps.spider.models import (
+    AssignedContent, AttachedBlob, AuthToken, ContentVariant,
+    ReferrerDelivery, UserComponent
+)
+from spkcspider.apps.spider import registry
 from spkcspider.apps.spider.signals import update_dynamic
 from spkcspider.apps.spider_accounts.models import SpiderUser
+from spkcspider.apps.spider_filets.models import TextFilet
 from spkcspider.constants import ProtectionStateType, VariantType, spkcgraph
+from spkcspider.utils.circuit import CircuitBreaker, is_host_failure
+from spkcspider.utils.http import close_sessions, get_pool_stats, get_session
+from spkcspider.utils.metrics import Counter, Histogram, MetricsRegistry
+from spkcspider.utils.metrics import registry as metrics_registry
+from spkcspider.utils.security import create_b64_id_token
+from tests.helpers import QueryBudgetMixin
 from tests.referrerserver import create_referrer_server
+from tests.test_spider.querybudgets import query_budgets
 
 # Create your tests here.
 
 
-class FeaturesTest(TransactionWebTest):
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FeaturesTest(QueryBudgetMixin, TransactionWebTest):
+    query_budgets = query_budgets
     fixtures = ['test_default.json']
 
     @classmethod
@@ -292,3 +319,588 @@ class FeaturesTest(TransactionWebTest):
                 ),
                 g
             )
+
+    def test_queued_delivery(self):
+        from spkcspider.apps.spider.delivery import process_deliveries
+        home = self.user.usercomponent_set.filter(name="home").first()
+        self.app.set_user("testuser1")
+        with override_settings(
+            DEBUG=True, RATELIMIT_ENABLE=False,
+            SPIDER_REFERRER_DELIVERY="queue",
+            SPIDER_REFERRER_DELIVERY_RETRIES=1
+        ), mock.patch("spkcspider.apps.spider.delivery._schedule"):
+            with self.subTest(msg="delivered"):
+                purl = "{}?referrer=http://{}:{}".format(
+                    home.get_absolute_url(),
+                    *self.refserver.socket.getsockname()
+                )
+                response = self.app.get(purl)
+                response = response.forms["SPKCReferringForm"].submit(
+                    "action", value="confirm"
+                )
+                statusurl = response.location
+                self.assertIn("/token/delivery/", statusurl)
+                response = self.app.get(statusurl)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(process_deliveries(), 1)
+                response = self.app.get(statusurl)
+                query = parse_qs(urlsplit(response.location).query)
+                self.assertEqual(query.get("status"), ["success"])
+                self.assertIn(query["hash"][0], self.refserver.unverified)
+                self.assertEqual(
+                    AuthToken.objects.get(
+                        token=self.refserver.unverified[
+                            query["hash"][0]
+                        ]["token"]
+                    ).usercomponent, home
+                )
+            with self.subTest(msg="failed"):
+                tokencount = AuthToken.objects.count()
+                # nothing listens there
+                purl = "{}?referrer=http://127.0.0.1:{}".format(
+                    home.get_absolute_url(), closed_port()
+                )
+                response = self.app.get(purl)
+                response = response.forms["SPKCReferringForm"].submit(
+                    "action", value="confirm"
+                )
+                statusurl = response.location
+                self.assertEqual(AuthToken.objects.count(), tokencount + 1)
+                self.assertEqual(process_deliveries(), 1)
+                response = self.app.get(statusurl)
+                query = parse_qs(urlsplit(response.location).query)
+                self.assertEqual(query.get("status"), ["post_failed"])
+                self.assertEqual(AuthToken.objects.count(), tokencount)
+            with self.subTest(msg="superseded"):
+                purl = "{}?referrer=http://{}:{}".format(
+                    home.get_absolute_url(),
+                    *self.refserver.socket.getsockname()
+                )
+                response = self.app.get(purl)
+                response = response.forms["SPKCReferringForm"].submit(
+                    "action", value="confirm"
+                )
+                statusurl = response.location
+                token = ReferrerDelivery.objects.latest("created").token
+                # renewed before the worker ran
+                token.token = create_b64_id_token(token.id, "_")
+                token.save(update_fields=["token"])
+                unverified = len(self.refserver.unverified)
+                self.assertEqual(process_deliveries(), 1)
+                self.assertEqual(len(self.refserver.unverified), unverified)
+                response = self.app.get(statusurl)
+                query = parse_qs(urlsplit(response.location).query)
+                self.assertEqual(query.get("status"), ["post_failed"])
+                self.assertEqual(query.get("error"), ["superseded"])
+                # still valid, only the delivery is dropped
+                self.assertTrue(AuthToken.objects.filter(id=token.id))
+
+    def test_component_viewmodel(self):
+        from spkcspider.apps.spider.models import AssignedContent
+        from spkcspider.apps.spider.viewmodels import get_component_viewmodel
+        home = self.user.usercomponent_set.filter(name="home").first()
+        travel = AssignedContent.travel.get_active()
+        viewmodel = get_component_viewmodel(home, travel, True)
+        self.assertIn(
+            "DefaultActions", {f.name for f in viewmodel["active_features"]}
+        )
+        self.assertTrue(viewmodel["content_variants"])
+        # only the travel protection lookup
+        with self.assertNumQueries(1):
+            get_component_viewmodel(home, travel, True)
+        self.assertNotIn(
+            "content_variants", get_component_viewmodel(home, travel, False)
+        )
+        with self.subTest(msg="invalidate on feature change"):
+            home.features.add(ContentVariant.objects.get(name="Persistence"))
+            viewmodel = get_component_viewmodel(home, travel, True)
+            self.assertIn(
+                "Persistence",
+                {f.name for f in viewmodel["active_features"]}
+            )
+        with self.subTest(msg="invalidate on content save"):
+            variant = next(
+                v for v in viewmodel["content_variants"]
+                if v not in viewmodel["content_variants_used"]
+            )
+            AssignedContent.objects.create(
+                usercomponent=home, ctype=variant,
+                info="\x1eunlisted\x1e"
+            )
+            viewmodel = get_component_viewmodel(home, travel, True)
+            self.assertIn(variant, viewmodel["content_variants_used"])
+            self.assertTrue(viewmodel["has_unlisted"])
+
+    def test_request_stats(self):
+        home = self.user.usercomponent_set.filter(name="home").first()
+        self.app.set_user("testuser1")
+        self.app.get("{}?raw=true".format(home.get_absolute_url()))
+        stats = self.request_stats[-1]
+        self.assertEqual(stats["view"], "spider_base:ucontent-list")
+        self.assertEqual(stats["scope"], "list")
+        self.assertEqual(stats["access"], "owner")
+        self.assertTrue(stats["raw"])
+        self.assertGreater(stats["triples"], 0)
+        self.assertGreater(stats["bytes"], 0)
+        self.assertGreater(stats["queries"], 0)
+        with self.assertRaises(AssertionError):
+            self.assertQueryBudgets({"spider_base:ucontent-list:list": 1})
+
+    def test_request_profiler(self):
+        admin = SpiderUser.objects.create_user(
+            username="testadmin", password="abc", is_active=True,
+            is_staff=True, is_superuser=True
+        )
+        home = self.user.usercomponent_set.filter(name="home").first()
+        url = "{}?raw=true".format(home.get_absolute_url())
+        # only superusers can trigger profiling
+        self.client.force_login(self.user)
+        response = self.client.get(url, HTTP_X_SPIDER_PROFILE="1")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-SPIDER-PROFILE-ID", response)
+        response = self.client.get(reverse("spider-profiles"))
+        self.assertEqual(response.status_code, 302)
+
+        self.client.force_login(admin)
+        response = self.client.get(url, HTTP_X_SPIDER_PROFILE="1")
+        self.assertEqual(response.status_code, 200)
+        profile_id = response["X-SPIDER-PROFILE-ID"]
+        response = self.client.get(reverse("spider-profiles"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "spider_base:ucontent-list")
+        # no tokens/paths
+        self.assertNotContains(response, home.token)
+        response = self.client.get(reverse(
+            "spider-profile-download",
+            kwargs={"id": profile_id, "kind": "pstats"}
+        ))
+        self.assertEqual(response.status_code, 200)
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(response.content)
+            f.flush()
+            self.assertGreater(pstats.Stats(f.name).total_calls, 0)
+        response = self.client.get(reverse(
+            "spider-profile-download",
+            kwargs={"id": profile_id, "kind": "collapsed"}
+        ))
+        self.assertRegex(
+            response.content.decode("utf8"), r"(?m)^\S+;\S+ [0-9]+$"
+        )
+        response = self.client.get(reverse(
+            "spider-profile-download",
+            kwargs={"id": profile_id, "kind": "sql"}
+        ))
+        self.assertIn("SELECT", response.content.decode("utf8"))
+        # travel protected: no admin permission
+        session = self.client.session
+        session["is_travel_protected"] = True
+        session.save()
+        response = self.client.get(url, HTTP_X_SPIDER_PROFILE="1")
+        self.assertNotIn("X-SPIDER-PROFILE-ID", response)
+        response = self.client.get(reverse("spider-profiles"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_public_index_cache(self):
+        public = self.user.usercomponent_set.get(name="public")
+        public.featured = True
+        public.save()
+        url = reverse("spider_base:ucomponent-listpublic")
+        self.assertContains(self.client.get(url), "public")
+        self.assertContains(self.client.get(reverse("home")), "public")
+        # bypasses signals: cached
+        UserComponent.objects.filter(id=public.id).update(
+            description="uncached description"
+        )
+        self.assertNotContains(self.client.get(url), "uncached description")
+        self.assertNotContains(
+            self.client.get(reverse("home")), "uncached description"
+        )
+        # logged in users share cached results, not the rendered list
+        client = Client()
+        client.force_login(self.user)
+        self.assertContains(client.get(url), "uncached description")
+        # search is computed
+        response = self.client.get(url, {"search": "public"})
+        self.assertContains(response, "uncached description")
+        # invalidated by save of public component
+        public.description = "new description"
+        public.save()
+        self.assertContains(self.client.get(url), "new description")
+        self.assertContains(
+            self.client.get(reverse("home")), "new description"
+        )
+        # and by unpublishing
+        public.public = False
+        public.save()
+        self.assertNotContains(self.client.get(url), "new description")
+
+    def test_conditional_get(self):
+        home = self.user.usercomponent_set.filter(name="home").first()
+        client = Client()
+        client.force_login(self.user)
+        url = "{}?raw=true".format(home.get_absolute_url())
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["Access-Control-Allow-Origin"], "*")
+        # 304 before serialization
+        self.assertEqual(
+            client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+            ).status_code, 304
+        )
+        # other representations have other validators
+        self.assertEqual(
+            client.get(
+                "%s&search=home" % url, HTTP_IF_NONE_MATCH=etag
+            ).status_code, 200
+        )
+        self.assertNotIn("ETag", client.get(home.get_absolute_url()))
+        # changed by new content
+        text = TextFilet.static_create(associated_kwargs={
+            "usercomponent": home,
+            "ctype": ContentVariant.objects.get(name="Text")
+        })
+        text.prepared_attachements = {
+            "attachedblobs": [AttachedBlob(
+                unique=True, name="text", blob=b"abc",
+                content=text.associated
+            )]
+        }
+        text.clean()
+        text.save()
+        content = text.associated
+        content_url = "{}?raw=true".format(content.get_absolute_url())
+        response = client.get(content_url)
+        self.assertEqual(
+            client.get(
+                content_url, HTTP_IF_NONE_MATCH=response["ETag"]
+            ).status_code, 304
+        )
+        AssignedContent.objects.filter(id=content.id).update(
+            modified=timezone.now()
+        )
+        self.assertEqual(
+            client.get(
+                content_url, HTTP_IF_NONE_MATCH=response["ETag"]
+            ).status_code, 200
+        )
+        self.assertEqual(
+            client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+
+    @override_settings(SPIDER_METRICS=True)
+    def test_metrics(self):
+        metrics_registry.clear()
+        home = self.user.usercomponent_set.filter(name="home").first()
+        public = self.user.usercomponent_set.filter(public=True).first()
+        # client loads middlewares (with metrics) on first request
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(home.get_absolute_url(), {"raw": "true"})
+        self.assertEqual(response.status_code, 200)
+        Client().get(public.get_absolute_url())
+        metrics_url = reverse("spider-metrics")
+        response = Client(REMOTE_ADDR="10.0.0.1").get(metrics_url)
+        self.assertEqual(response.status_code, 403)
+        with override_settings(SPIDER_METRICS_ALLOWED_IPS=["10.0.0.1"]):
+            response = Client(REMOTE_ADDR="10.0.0.1").get(metrics_url)
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode("utf8")
+        self.assertIn(
+            'spider_request_duration_seconds_count{'
+            'view="spider_base:ucontent-list",scope="list"} 2',
+            text
+        )
+        self.assertRegex(
+            text, r'spider_serialized_triples_total\{view="spider_base:'
+                  r'ucontent-list"\} [1-9]'
+        )
+        self.assertIn(
+            'spider_auth_total{ptype="access_control",result="success"}',
+            text
+        )
+        self.assertIn(
+            'spider_cache_requests_total{cache="viewmodel",result="miss"}',
+            text
+        )
+        # staff
+        response = client.get(metrics_url)
+        self.assertEqual(response.status_code, 403)
+        self.user.is_staff = True
+        self.user.save(update_fields=["is_staff"])
+        response = client.get(metrics_url)
+        self.assertEqual(response.status_code, 200)
+        with override_settings(SPIDER_METRICS=False):
+            response = client.get(metrics_url)
+            self.assertEqual(response.status_code, 404)
+
+
+class MetricsTest(SimpleTestCase):
+    @override_settings(SPIDER_METRICS=True)
+    def test_exposition(self):
+        reg = MetricsRegistry()
+        counter = Counter(
+            "test_total", "Test", ["name"], registry=reg, max_series=2
+        )
+        histogram = Histogram(
+            "test_seconds", "Test", registry=reg, buckets=(0.1, 1)
+        )
+        counter.inc(name='a"b')
+        counter.inc(2, name="c")
+        # exceeds max_series
+        counter.inc(name="d")
+        with self.assertRaises(ValueError):
+            counter.inc(foo="a")
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+        text = reg.exposition()
+        self.assertIn("# TYPE test_total counter", text)
+        self.assertIn('test_total{name="a\\"b"} 1', text)
+        self.assertIn('test_total{name="c"} 2', text)
+        self.assertIn('test_total{name="_other"} 1', text)
+        self.assertIn('test_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('test_seconds_bucket{le="1"} 2', text)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("test_seconds_sum 5.55", text)
+        self.assertIn("test_seconds_count 3", text)
+        with override_settings(SPIDER_METRICS=False):
+            counter.inc(name="c")
+        self.assertIn('test_total{name="c"} 2', reg.exposition())
+
+    @override_settings(SPIDER_METRICS=True)
+    def test_multiprocess(self):
+        registries = [MetricsRegistry(), MetricsRegistry()]
+        counters = [
+            Counter("test_total", "Test", registry=reg)
+            for reg in registries
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with override_settings(SPIDER_METRICS_DIR=tmpdir):
+                counters[0].inc(2)
+                counters[1].inc(3)
+                registries[0].flush()
+                # own values are used instead of the (old) dump
+                counters[0].inc(1)
+                self.assertIn("test_total 5", registries[1].exposition())
+                self.assertIn("test_total 3", registries[0].exposition())
+                registries[1].flush()
+                self.assertEqual(len(os.listdir(tmpdir)), 2)
+                self.assertIn("test_total 6", registries[0].exposition())
+
+
+class HttpPoolTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.refserver = create_referrer_server(("127.0.0.1", 0))
+        cls.refserver.runthread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.refserver.shutdown()
+        close_sessions()
+        super().tearDownClass()
+
+    def test_shared_session(self):
+        params = {"timeout": 3, "proxies": {}}
+        session = get_session(params)
+        self.assertIs(get_session(dict(params, timeout=10)), session)
+        self.assertIsNot(get_session(dict(params, verify=False)), session)
+        url = "http://127.0.0.1:%s/?foo" % self.refserver.server_port
+        for i in range(2):
+            with session.get(url, **params) as resp:
+                resp.raise_for_status()
+        stats = [
+            pool for pool in get_pool_stats()
+            if pool["port"] == self.refserver.server_port
+        ]
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]["requests"], 2)
+
+    def test_no_cookies(self):
+        params = {"timeout": 3, "proxies": {}}
+        session = get_session(params)
+        # don't influence pool stats of other tests
+        self.addCleanup(close_sessions)
+        url = "http://127.0.0.1:%s/?foo" % self.refserver.server_port
+        for i in range(2):
+            with session.get(url, **params) as resp:
+                resp.raise_for_status()
+                self.assertIn("Set-Cookie", resp.headers)
+            # cookie of referrer is not sent again
+            self.assertIsNone(self.refserver.last_cookie)
+        self.assertFalse(session.cookies)
+
+
+@override_settings(SPIDER_CIRCUIT_FAILURES=2, SPIDER_CIRCUIT_BACKOFF=10)
+class CircuitBreakerTest(SimpleTestCase):
+    def test_states(self):
+        circuit = CircuitBreaker("https://unreachable.example/foo?bar")
+        self.addCleanup(circuit.record_success)
+        self.assertEqual(circuit.host, "unreachable.example")
+        self.assertTrue(circuit.allow())
+        circuit.record_failure()
+        self.assertEqual(circuit.state, "closed")
+        circuit.record_failure()
+        self.assertEqual(circuit.state, "open")
+        self.assertFalse(circuit.allow())
+        # same host shares the circuit
+        self.assertFalse(CircuitBreaker("https://unreachable.example").allow())
+        self.assertTrue(CircuitBreaker("https://other.example").allow())
+        now = time.time()
+        with mock.patch("time.time", return_value=now + 11):
+            self.assertEqual(circuit.state, "half_open")
+            # only one probe
+            self.assertTrue(circuit.allow())
+            self.assertFalse(circuit.allow())
+            circuit.record_failure()
+            self.assertEqual(circuit.state, "open")
+            self.assertEqual(circuit.get_state()["backoff"], 20)
+        with mock.patch("time.time", return_value=now + 35):
+            self.assertTrue(circuit.allow())
+            circuit.record_success()
+            self.assertEqual(circuit.state, "closed")
+            self.assertTrue(circuit.allow())
+
+    def test_host_failure(self):
+        self.assertTrue(
+            is_host_failure(requests.exceptions.ConnectTimeout())
+        )
+        self.assertFalse(is_host_failure(ValueError()))
+        response = requests.Response()
+        response.status_code = 404
+        self.assertFalse(
+            is_host_failure(requests.exceptions.HTTPError(response=response))
+        )
+        response.status_code = 503
+        self.assertTrue(
+            is_host_failure(requests.exceptions.HTTPError(response=response))
+        )
+
+
+class LazyNamespaceTest(SimpleTestCase):
+    def test_terms(self):
+        uri = "https://spkcspider.net/static/schemes/spkcgraph#"
+        self.assertEqual(str(spkcgraph), uri)
+        self.assertEqual(spkcgraph["type"], URIRef("%stype" % uri))
+        # names of str methods are terms too
+        for name in ("title", "format", "index"):
+            self.assertEqual(
+                getattr(spkcgraph, name), URIRef("%s%s" % (uri, name))
+            )
+        g = Graph()
+        g.namespace_manager.bind("spkc", spkcgraph, replace=True)
+        self.assertIn(
+            ("spkc", URIRef(uri)), list(g.namespace_manager.namespaces())
+        )
+
+
+class RegistryWarmupTest(SimpleTestCase):
+    registries = [
+        registry.protections, registry.contents, registry.feature_urls,
+        registry.content_deletion_periods
+    ]
+
+    def setUp(self):
+        # warmup freezes the process wide registries, restore them
+        for reg in self.registries:
+            state = {
+                key: value.copy() if isinstance(value, (dict, set)) else value
+                for key, value in vars(reg).items()
+            }
+            self.addCleanup(self.restore_registry, reg, state)
+
+    @staticmethod
+    def restore_registry(reg, state):
+        vars(reg).clear()
+        vars(reg).update(state)
+
+    def test_warmup(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manifest = os.path.join(tmpdir, "manifest.json")
+            timings = registry.warmup(manifest)
+            self.assertEqual(set(timings.keys()), {
+                "protections", "contents", "feature_urls",
+                "content_deletion_periods"
+            })
+            self.assertIn("login", registry.protections)
+            with self.assertRaises(TypeError):
+                registry.feature_urls[("foo", "bar")] = frozenset()
+            feature_urls = dict(registry.feature_urls.items())
+            periods = dict(registry.content_deletion_periods.items())
+            self.assertIn("renew-token", {
+                action.name for value in feature_urls.values()
+                for action in value
+            })
+            with open(manifest) as f:
+                data = json.load(f)
+            self.assertEqual(
+                data["signature"], registry.get_manifest_signature()
+            )
+            # loaded from manifest
+            registry.warmup(manifest)
+            self.assertEqual(dict(registry.feature_urls.items()), feature_urls)
+            self.assertEqual(
+                dict(registry.content_deletion_periods.items()), periods
+            )
+            # outdated manifest is replaced
+            data["signature"] = "outdated"
+            data["feature_urls"] = []
+            with open(manifest, "w") as f:
+                json.dump(data, f)
+            registry.warmup(manifest)
+            self.assertEqual(dict(registry.feature_urls.items()), feature_urls)
+            with open(manifest) as f:
+                self.assertNotEqual(json.load(f)["signature"], "outdated")
+
+    def test_warmup_deferred_urls(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manifest = os.path.join(tmpdir, "manifest.json")
+            with mock.patch(
+                "spkcspider.apps.spider.registry.resolve_url",
+                side_effect=lambda x: x
+            ) as resolve:
+                timings = registry.warmup(manifest, defer_urls=True)
+                self.assertNotIn("feature_urls", timings)
+                self.assertFalse(resolve.called)
+                self.assertFalse(os.path.exists(manifest))
+                self.assertIn("renew-token", {
+                    action.name
+                    for value in registry.feature_urls.values()
+                    for action in value
+                })
+                self.assertTrue(resolve.called)
+            with self.assertRaises(TypeError):
+                registry.feature_urls[("foo", "bar")] = frozenset()
+            with open(manifest) as f:
+                data = json.load(f)
+            self.assertTrue(data["feature_urls"])
+            self.assertIn("content_deletion_periods", data)
+
+    def test_warmup_script_prefix(self):
+        # e.g. cgi handler, warmup runs outside of requests
+        self.addCleanup(set_script_prefix, "/")
+        set_script_prefix("/sub/")
+        registry.warmup()
+        key = next(
+            key for key, value in registry.feature_urls.items()
+            if "renew-token" in {action.name for action in value}
+        )
+        set_script_prefix("/")
+        renew_url = reverse("spider_base:token-renew")
+        self.assertIn(
+            ("renew-token", renew_url), registry.feature_urls.get_urls(key)
+        )
+        # request with prefix
+        set_script_prefix("/sub/")
+        self.assertEqual(
+            reverse("spider_base:token-renew"), "/sub%s" % renew_url
+        )
+        self.assertIn(
+            ("renew-token", "/sub%s" % renew_url),
+            registry.feature_urls.get_urls(key)
+        )
@@ -1,11 +1,19 @@
+import copy
+import json
+import os
+import tempfile
 from io import StringIO
 
-from django.core.management import call_command
-from django.test import TransactionTestCase
+from django.core.management import CommandError, call_command
+from django.test import TransactionTestCase, override_settings
+from spkcspider.apps.spider.benchmarks import compare_results
 from spkcspider.apps.spider.models import (
-    AuthToken, ReferrerObject, UserComponent
+    AssignedContent, AttachedBlob, AuthToken, ReferrerObject, UserComponent
 )
+from spkcspider.apps.spider.signals import update_dynamic
+from spkcspider.apps.spider.sitemaps import load_manifest
 from spkcspider.apps.spider_accounts.models import SpiderUser
+from spkcspider.apps.verifier.models import DataVerificationTag
 
 
 class ManagementTests(TransactionTestCase):
@@ -19,6 +27,14 @@ class ManagementTests(TransactionTestCase):
         call_command('update_dynamic_content', stdout=out)
         self.assertNotIn('failed', out.getvalue())
 
+    def test_profile_imports(self):
+        out = StringIO()
+        call_command('profile_imports', "--limit=1", stdout=out)
+        self.assertIn('total:', out.getvalue())
+        # startup and url configuration don't require rdflib and celery
+        self.assertIn('rdflib: no', out.getvalue())
+        self.assertIn('celery: no', out.getvalue())
+
     def test_revoke_persistent_auth_tokens(self):
         uc = UserComponent.objects.get(
             name="home"
@@ -157,3 +173,232 @@ class ManagementTests(TransactionTestCase):
         self.assertTrue(AuthToken.objects.get(
             referrer__url="http://example2.com/test",
         ))
+
+    @override_settings(SPIDER_BLOB_CODECS=[])
+    def test_compress_blobs(self):
+        update_dynamic.send(self)
+        uc = UserComponent.objects.get(
+            name="home"
+        )
+        content = AssignedContent.objects.create(
+            usercomponent=uc, ctype="Text",
+            info="\x1etype=Text\x1eid=\x1e"
+        )
+        blob = AttachedBlob.objects.create(
+            content=content, name="text", blob=b"a" * 2000
+        )
+        AttachedBlob.objects.create(
+            content=content, name="small", blob=b"b"
+        )
+        self.assertEqual(blob.codec, "")
+
+        out = StringIO()
+        call_command(
+            'compress_blobs', '--codec=zlib', '--batch-size=1', stdout=out
+        )
+        self.assertTrue(out.getvalue().endswith("count: 1\n"))
+        blob.refresh_from_db()
+        self.assertEqual(blob.codec, "zlib")
+        self.assertLess(len(blob.blob), 2000)
+        self.assertEqual(blob.get_size(), 2000)
+        self.assertEqual(blob.as_bytes, b"a" * 2000)
+
+        out = StringIO()
+        call_command('compress_blobs', '--decompress', stdout=out)
+        self.assertTrue(out.getvalue().endswith("count: 1\n"))
+        blob.refresh_from_db()
+        self.assertEqual(blob.codec, "")
+        self.assertEqual(bytes(blob.blob), b"a" * 2000)
+
+    def test_generate_dataset(self):
+        update_dynamic.send(self)
+        out = StringIO()
+        call_command(
+            'generate_dataset', '--users=3', '--contents=6', '--seed=4',
+            '--prefix=a', stdout=out
+        )
+        self.assertIn("users: 3/3", out.getvalue())
+        users = SpiderUser.objects.filter(username__startswith="a4_")
+        self.assertEqual(users.count(), 3)
+        contents = AssignedContent.objects.filter(
+            usercomponent__user__in=users
+        )
+        # 2 default components, one travel protection per user
+        self.assertEqual(contents.count(), 3 * (2 * 6 + 1))
+        self.assertEqual(
+            AuthToken.objects.filter(usercomponent__user__in=users).count(),
+            3 * 2 * 2
+        )
+        # same seed, same data (names don't contain ids)
+        call_command(
+            'generate_dataset', '--users=3', '--contents=6', '--seed=4',
+            '--prefix=b', stdout=StringIO()
+        )
+        stable_types = ["Text", "File", "PublicKey", "SpiderTag"]
+        self.assertEqual(
+            list(contents.filter(ctype__name__in=stable_types).order_by(
+                "id"
+            ).values_list("name", flat=True)),
+            list(AssignedContent.objects.filter(
+                usercomponent__user__username__startswith="b4_",
+                ctype__name__in=stable_types
+            ).order_by("id").values_list("name", flat=True))
+        )
+        # generated data is usable
+        user = users.first()
+        self.client.force_login(user)
+        home = user.usercomponent_set.get(name="home")
+        response = self.client.get(home.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(
+            "{}?raw=true".format(home.get_absolute_url())
+        )
+        self.assertEqual(response.status_code, 200)
+        for content in contents.filter(usercomponent=home):
+            response = self.client.get(content.get_absolute_url())
+            self.assertEqual(response.status_code, 200, content.ctype.name)
+
+    def test_generate_sitemaps(self):
+        SpiderUser.objects.create_user(
+            username="testuser2", password="abc", is_active=True
+        )
+        UserComponent.objects.filter(name="home").update(public=True)
+        count = UserComponent.objects.filter(public=True).count()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with override_settings(
+                MEDIA_ROOT=tmpdir, SPIDER_SITEMAP_LIMIT=1
+            ):
+                # not generated: live sitemaps
+                response = self.client.get("/sitemap.xml")
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(b"sitemap-components.xml", response.content)
+                out = StringIO()
+                call_command(
+                    'generate_sitemaps', '--hostpart=https://a.test',
+                    stdout=out
+                )
+                # component chunks, home, index
+                self.assertIn("files: %s" % (count + 2), out.getvalue())
+                response = self.client.get("/sitemap.xml")
+                self.assertEqual(response.status_code, 200)
+                index = b"".join(response.streaming_content)
+                self.assertIn(
+                    b"https://a.test/sitemap-components-%d.xml" % count,
+                    index
+                )
+                response = self.client.get("/sitemap-components-1.xml")
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    b"".join(response.streaming_content).count(b"<url>"), 1
+                )
+                # conditional GET
+                response = self.client.get(
+                    "/sitemap-components-1.xml",
+                    HTTP_IF_NONE_MATCH=response["ETag"]
+                )
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(
+                    self.client.get(
+                        "/sitemap-components-%s.xml" % (count + 1)
+                    ).status_code, 404
+                )
+                first = load_manifest()
+                # shrunken sections are removed
+                UserComponent.objects.filter(
+                    user__username="testuser2"
+                ).update(public=False)
+                self.assertGreater(count, UserComponent.objects.filter(
+                    public=True
+                ).count())
+                call_command(
+                    'generate_sitemaps', '--hostpart=https://a.test',
+                    stdout=StringIO()
+                )
+                self.assertEqual(
+                    self.client.get(
+                        "/sitemap-components-%s.xml" % count
+                    ).status_code, 404
+                )
+                # unchanged chunks keep etag and modification date
+                second = load_manifest()
+                self.assertEqual(
+                    {
+                        key: val
+                        for key, val in second["files"][
+                            "sitemap-home-1.xml"
+                        ].items() if key != "path"
+                    },
+                    {
+                        key: val
+                        for key, val in first["files"][
+                            "sitemap-home-1.xml"
+                        ].items() if key != "path"
+                    }
+                )
+                # previous generation is kept for running requests
+                path = first["files"][
+                    "sitemap-components-%s.xml" % count
+                ]["path"]
+                self.assertTrue(os.path.exists(os.path.join(tmpdir, path)))
+                call_command(
+                    'generate_sitemaps', '--hostpart=https://a.test',
+                    stdout=StringIO()
+                )
+                self.assertFalse(os.path.exists(os.path.join(tmpdir, path)))
+                # missing file: 404
+                os.unlink(os.path.join(
+                    tmpdir, load_manifest()["files"]["sitemap-home-1.xml"][
+                        "path"
+                    ]
+                ))
+                self.assertEqual(
+                    self.client.get("/sitemap-home-1.xml").status_code, 404
+                )
+
+    def test_run_benchmarks(self):
+        update_dynamic.send(self)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "results.json")
+            out = StringIO()
+            call_command(
+                'run_benchmarks', '--in-place', '--users=1', '--contents=4',
+                '--repeat=2', '--benchmark=filter', '--benchmark=auth',
+                '--benchmark=save.Text', '--benchmark=verify',
+                '--output=%s' % path, stdout=out
+            )
+            with open(path, "r") as f:
+                results = json.load(f)
+            # different dataset
+            with self.assertRaises(CommandError):
+                call_command(
+                    'run_benchmarks', '--in-place', '--users=2',
+                    '--benchmark=auth', '--compare=%s' % path,
+                    stdout=StringIO()
+                )
+        self.assertEqual(
+            set(results["benchmarks"].keys()),
+            {
+                "filter.contents", "filter.components", "auth.test_token",
+                "auth.component", "auth.index", "save.Text",
+                "verify.validate"
+            }
+        )
+        result = results["benchmarks"]["save.Text"]
+        self.assertEqual(result["repeat"], 2)
+        self.assertGreater(result["queries"]["max"], 0)
+        self.assertGreater(result["peak_memory_kib"], 0)
+        self.assertTrue(DataVerificationTag.objects.exists())
+        # regression check
+        self.assertEqual(compare_results(results, results), [])
+        changed = copy.deepcopy(results)
+        changed["benchmarks"]["save.Text"]["queries"]["max"] += 1
+        changed["benchmarks"]["save.Text"]["time_ms"]["p50"] = max(
+            10, result["time_ms"]["p50"] * 2
+        )
+        self.assertEqual(
+            {
+                metric for name, metric, old, new in
+                compare_results(changed, results)
+            },
+            {"queries.max", "time_ms.p50"}
+        )
@@ -0,0 +1,14 @@
+# max sql queries per request, keys: "<view name>:<scope>" or "<view name>"
+# (see QueryBudgetMixin)
+query_budgets = {
+    "spider_base:ucomponent-listpublic": 20,
+    "spider_base:ucomponent-update": 80,
+    "spider_base:ucontent-list": 40,
+    "spider_base:ucontent-add": 45,
+    "spider_base:ucontent-access:view": 30,
+    "spider_base:ucontent-access:update": 80,
+    "spider_base:entity-delete": 50,
+    "spider_base:token-owner-delete": 30,
+    "spider_base:token-renew": 6,
+    "spider_base:referrer-delivery": 8,
+}
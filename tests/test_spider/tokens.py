@@ -10,10 +10,13 @@ from spkcspider.apps.spider.models import AuthToken, ContentVariant
 from spkcspider.apps.spider.signals import update_dynamic
 from spkcspider.apps.spider_accounts.models import SpiderUser
 from spkcspider.constants import VariantType
+from tests.helpers import QueryBudgetMixin
 from tests.referrerserver import create_referrer_server
+from tests.test_spider.querybudgets import query_budgets
 
 
-class RemoteTokenTest(TransactionWebTest):
+class RemoteTokenTest(QueryBudgetMixin, TransactionWebTest):
+    query_budgets = query_budgets
     fixtures = ['test_default.json']
 
     @classmethod
@@ -138,7 +141,8 @@ class RemoteTokenTest(TransactionWebTest):
         self.assertEqual(newtoken, token.token)
 
 
-class OwnerTokenManagementTest(TransactionWebTest):
+class OwnerTokenManagementTest(QueryBudgetMixin, TransactionWebTest):
+    query_budgets = query_budgets
     fixtures = ['test_default.json']
 
     def setUp(self):
@@ -1,6 +1,7 @@
-from django.test import override_settings
+from django.test import RequestFactory, override_settings
 from django.urls import reverse
 from django_webtest import TransactionWebTest
+from spkcspider.apps.spider.models import AttachedBlob
 from spkcspider.apps.spider.signals import update_dynamic
 from spkcspider.apps.spider_accounts.models import SpiderUser
 from webtest import Upload
@@ -80,6 +81,67 @@ class TextFiletTest(TransactionWebTest):
             "nope"
         )
 
+    @override_settings(
+        SPIDER_BLOB_CODECS=["zlib"], SPIDER_BLOB_COMPRESS_MIN_SIZE=0
+    )
+    def test_compressed(self):
+        home = self.user.usercomponent_set.get(name="home")
+        text = "foooo" * 200
+
+        createurl = reverse(
+            "spider_base:ucontent-add",
+            kwargs={
+                "token": home.token,
+                "type": "Text"
+            }
+        )
+        self.app.set_user(user="testuser1")
+        form = self.app.get(createurl).forms["main_form"]
+        form.set("content_control-name", "foo")
+        form.set("text", text)
+        response = form.submit()
+        updateurl = response.location
+        form = self.app.get(updateurl).forms["main_form"]
+        self.assertEqual(form["text"].value, text)
+
+        textob = home.contents.first()
+        blob = AttachedBlob.objects.get(content=textob, name="text")
+        self.assertEqual(blob.codec, "zlib")
+        self.assertLess(len(blob.blob), len(text))
+        # quota uses logical size
+        self.assertEqual(blob.get_size(), len(text))
+        self.assertEqual(blob.as_bytes, text.encode("utf8"))
+
+        durl = textob.get_absolute_url("download")
+        with self.subTest(msg="Download compressed"):
+            # webtest decodes Content-Encoding transparently
+            response = self.app.get(
+                durl, headers={"Accept-Encoding": "gzip, deflate"}
+            )
+            self.assertEqual(response.body, text.encode("utf8"))
+            response = blob.get_response(RequestFactory().get(
+                durl, HTTP_ACCEPT_ENCODING="gzip, deflate"
+            ))
+            self.assertEqual(response["Content-Encoding"], "deflate")
+            self.assertEqual(response.content, bytes(blob.blob))
+        with self.subTest(msg="Download uncompressed"):
+            response = self.app.get(durl, headers={"Accept-Encoding": ""})
+            self.assertNotIn("Content-Encoding", response.headers)
+            self.assertEqual(response.body, text.encode("utf8"))
+            for header in (
+                "deflate;q=0", "gzip, *;q=0", "*;q=0.5, deflate;q=0"
+            ):
+                response = blob.get_response(RequestFactory().get(
+                    durl, HTTP_ACCEPT_ENCODING=header
+                ))
+                self.assertNotIn("Content-Encoding", response, header)
+                self.assertEqual(response.content, text.encode("utf8"))
+        with self.subTest(msg="Download compressed, wildcard"):
+            response = blob.get_response(RequestFactory().get(
+                durl, HTTP_ACCEPT_ENCODING="gzip;q=1.0, *;q=0.5"
+            ))
+            self.assertEqual(response["Content-Encoding"], "deflate")
+
 
 class FileFiletTest(TransactionWebTest):
     fixtures = ['test_default.json']
@@ -117,3 +179,29 @@ class FileFiletTest(TransactionWebTest):
                 response = self.app.get(durl)
                 self.assertEqual(response.status_code, 302)
                 # no server so skip, as redirect won't work
+
+    def test_serialize_guest(self):
+        home = self.user.usercomponent_set.get(name="home")
+        createurl = reverse(
+            "spider_base:ucontent-add",
+            kwargs={
+                "token": home.token,
+                "type": "File"
+            }
+        )
+        self.app.set_user(user="testuser1")
+        form = self.app.get(createurl).forms["main_form"]
+        form["file"] = Upload("fooo", b"[]", "application/json")
+        form.submit().follow()
+        home.public = True
+        home.save()
+        viewurl = home.contents.first().get_absolute_url()
+        # serializing builds the form of non-owners
+        self.app.set_user(user="testuser2")
+        response = self.app.get(viewurl)
+        self.assertEqual(response.status_code, 200)
+        response = self.app.get("{}?raw=true".format(viewurl))
+        self.assertEqual(response.status_code, 200)
+        self.app.set_user(user=None)
+        response = self.app.get("{}?raw=embed".format(viewurl))
+        self.assertEqual(response.status_code, 200)
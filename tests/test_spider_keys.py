@@ -1,4 +1,6 @@
 import binascii
+import json
+from datetime import timedelta as td
 
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
@@ -8,10 +10,12 @@ from rdflib import XSD, Graph, Literal
 from django.conf import settings
 # import unittest
 from django.urls import reverse
+from django.utils import timezone
 from django_webtest import TransactionWebTest
+from spkcspider.apps.spider.models import AssignedContent
 from spkcspider.apps.spider.signals import update_dynamic
 from spkcspider.apps.spider_accounts.models import SpiderUser
-from spkcspider.apps.spider_keys.models import PublicKey
+from spkcspider.apps.spider_keys.models import KeyFingerprint, PublicKey
 
 # Create your tests here.
 
@@ -97,6 +101,131 @@ class KeyTest(TransactionWebTest):
                 g
             )
 
+    def test_key_fingerprint(self):
+        public = self.user.usercomponent_set.get(name="public")
+        privkey = rsa.generate_private_key(
+            public_exponent=65537,
+            key_size=2048,
+            backend=default_backend()
+        )
+        pempub = privkey.public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        ).strip()
+
+        self.app.set_user(user="testuser1")
+        createurl = reverse(
+            "spider_base:ucontent-add",
+            kwargs={
+                "token": public.token,
+                "type": "PublicKey"
+            }
+        )
+        response = self.app.get(createurl)
+        form = response.forms["main_form"]
+        form["key"] = pempub
+        form["content_control-description"] = "valid"
+        form.submit().follow()
+        key = PublicKey.objects.get(associated__description="valid")
+        fingerprint = KeyFingerprint.objects.get(content=key.associated)
+        pubkeyhash = key.associated.getlist("pubkeyhash", 1)[0]
+        self.assertEqual(
+            "%s=%s" % (fingerprint.algorithm, fingerprint.pubkeyhash),
+            pubkeyhash
+        )
+        self.app.set_user(user=None)
+        with self.subTest(msg="lookup"):
+            for val in (
+                pubkeyhash, fingerprint.pubkeyhash.upper(), fingerprint.hash
+            ):
+                self.assertEqual(
+                    KeyFingerprint.objects.lookup(val).get(), fingerprint
+                )
+            self.assertFalse(KeyFingerprint.objects.lookup(
+                fingerprint.hash, algorithm="unknown"
+            ))
+
+        with self.subTest(msg="resolve"):
+            url = reverse(
+                "spider_keys:key-fingerprint",
+                kwargs={"fingerprint": pubkeyhash}
+            )
+            response = self.app.get(url)
+            self.assertEqual(response.status_code, 302)
+            self.assertEqual(
+                response.location, key.associated.get_absolute_url()
+            )
+            response = self.app.get(url, params={"raw": "true"})
+            self.assertEqual(
+                response.location,
+                "%s?raw=true" % key.associated.get_absolute_url()
+            )
+            self.app.get(reverse(
+                "spider_keys:key-fingerprint",
+                kwargs={"fingerprint": "abc"}
+            ), status=404)
+
+        with self.subTest(msg="hidden by travel protection"):
+            index = self.user.usercomponent_set.get(name="index")
+            self.app.set_user(user="testuser1")
+            response = self.app.get(reverse(
+                "spider_base:ucontent-add",
+                kwargs={
+                    "token": index.token,
+                    "type": "TravelProtection"
+                }
+            ))
+            form = response.forms["main_form"]
+            form["timeplans"].force_value([
+                json.dumps({
+                    "start": (timezone.now()-td(days=1)).isoformat()
+                })
+            ])
+            form.set("protect_components", (public.name,))
+            form.set("master_pw", "abc")
+            form.submit().follow()
+            self.app.set_user(user=None)
+            self.app.get(url, status=404)
+            AssignedContent.objects.filter(
+                ctype__name="TravelProtection"
+            ).delete()
+            self.assertEqual(self.app.get(url).status_code, 302)
+
+        with self.subTest(msg="only public components"):
+            public.public = False
+            public.save()
+            self.app.get(url, status=404)
+
+        with self.subTest(msg="unchanged key keeps its fingerprint"):
+            key = PublicKey.objects.get(pk=key.pk)
+            key.save()
+            self.assertEqual(
+                KeyFingerprint.objects.get(content=key.associated).pk,
+                fingerprint.pk
+            )
+            key.free_data["thirdparty"] = True
+            key.save()
+            self.assertTrue(
+                KeyFingerprint.objects.get(content=key.associated).thirdparty
+            )
+
+        with self.subTest(msg="info without hash"):
+            info = key.associated.info
+            key.associated.info = "\x1etype=PublicKey\x1e"
+            key.save()
+            self.assertFalse(
+                KeyFingerprint.objects.filter(content=key.associated)
+            )
+            key.associated.info = info
+            key.save()
+            self.assertTrue(
+                KeyFingerprint.objects.filter(content=key.associated)
+            )
+
+        with self.subTest(msg="removed with content"):
+            key.associated.delete()
+            self.assertFalse(KeyFingerprint.objects.all())
+
     def test_anchor_server(self):
         home = self.user.usercomponent_set.get(name="home")
         self.app.set_user(user="testuser1")
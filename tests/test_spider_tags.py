@@ -6,11 +6,19 @@ from rdflib import XSD, Graph, Literal, URIRef
 
 from django.test import override_settings
 from django.urls import reverse
+from django.utils import translation
 from django_webtest import TransactionWebTest
-from spkcspider.apps.spider.models import AuthToken, ContentVariant
+from spkcspider.apps.spider.models import (
+    AssignedContent, AuthToken, ContentVariant, UserComponent
+)
+from spkcspider.apps.spider.queryfilters import (
+    filter_components, filter_contents
+)
 from spkcspider.apps.spider.signals import update_dynamic
 from spkcspider.apps.spider_accounts.models import SpiderUser
-from spkcspider.apps.spider_tags.models import SpiderTag, TagLayout
+from spkcspider.apps.spider_tags.models import (
+    SpiderTag, TagFieldIndex, TagLayout
+)
 from spkcspider.constants import VariantType, spkcgraph
 from tests.referrerserver import create_referrer_server
 
@@ -131,6 +139,121 @@ class TagTest(TransactionWebTest):
         self.assertIn("tag/name", form.fields)
         self.assertIn("tag/ab", form.fields)
 
+    def test_tag_field_index(self):
+        home = self.user.usercomponent_set.filter(name="home").first()
+        self.app.set_user(user="testuser1")
+        createurl = reverse(
+            "spider_base:ucontent-add",
+            kwargs={
+                "token": home.token,
+                "type": "SpiderTag"
+            }
+        )
+        for city, country in (("Berlin", "de"), ("Paris", "fr")):
+            response = self.app.get(createurl)
+            form = response.forms["main_form"]
+            form["layout"].value = "address"
+            response = form.submit().follow()
+            form = response.forms["main_form"]
+            form["tag/name"] = "Alouis Alchemie AG"
+            form["tag/place"] = "Holdenstreet"
+            form["tag/city"] = city
+            form["tag/country_code"] = country
+            response = form.submit()
+            self.assertEqual(response.status_code, 200)
+        q, counter = filter_contents(
+            ["tag:address/country_code=DE"], filter_unlisted=False
+        )
+        self.assertEqual(counter, 1)
+        contents = AssignedContent.objects.filter(q)
+        self.assertEqual(contents.count(), 1)
+        self.assertEqual(contents.get().content.tagdata["city"], "Berlin")
+        q = filter_contents(
+            ["!tag:*/country_code=de", "tag:address/city"],
+            filter_unlisted=False
+        )[0]
+        self.assertEqual(
+            AssignedContent.objects.filter(q).get().content.tagdata["city"],
+            "Paris"
+        )
+        self.assertFalse(AssignedContent.objects.filter(filter_contents(
+            ["tag:person_official/country_code=de"], filter_unlisted=False
+        )[0]))
+        # index follows updates
+        tag = contents.get().content
+        tag.tagdata["country_code"] = "at"
+        tag.save()
+        self.assertFalse(AssignedContent.objects.filter(filter_contents(
+            ["tag:address/country_code=de"], filter_unlisted=False
+        )[0]))
+        # search of component list
+        response = self.app.get(home.get_absolute_url(), params={
+            "search": "tag:address/country_code=FR"
+        })
+        self.assertNotIn(tag.associated.token, response.text)
+        self.assertIn(
+            AssignedContent.objects.get(filter_contents(
+                ["tag:address/city=paris"], filter_unlisted=False
+            )[0]).token,
+            response.text
+        )
+        # components with matching contents
+        components = UserComponent.objects.filter(filter_components(
+            ["tag:address/city=paris"], filter_unlisted=False
+        )[0])
+        self.assertEqual(list(components), [home])
+        self.assertNotIn(home, UserComponent.objects.filter(
+            filter_components(
+                ["!tag:address/city=paris"], filter_unlisted=False
+            )[0]
+        ))
+        # ignored without contents
+        self.assertEqual(
+            UserComponent.objects.filter(filter_components(
+                ["tag:address/city=paris"], filter_unlisted=False,
+                use_contents=False
+            )[0]).count(),
+            UserComponent.objects.count()
+        )
+        response = self.app.get(
+            reverse("spider_base:ucomponent-list"),
+            params={"search": "tag:address/city=paris"}
+        )
+        self.assertIn(home.get_absolute_url(), response.text)
+        self.assertNotIn(
+            self.user.usercomponent_set.get(name="public").get_absolute_url(),
+            response.text
+        )
+        tag.associated.delete()
+        self.assertEqual(
+            TagFieldIndex.objects.filter(content_id=tag.associated_id).count(),
+            0
+        )
+
+    def test_layout_form_cache(self):
+        layout = TagLayout.objects.get(name="address", usertag=None)
+        form = layout.get_form()
+        # same compiled class, also for a new instance
+        self.assertIs(form, TagLayout.objects.get(id=layout.id).get_form())
+        # forms deep-copy fields
+        form1 = form(SpiderTag())
+        form1.fields["tag/name"].label = "changed"
+        self.assertNotEqual(
+            form(SpiderTag()).fields["tag/name"].label, "changed"
+        )
+        # localized labels
+        with translation.override("de"):
+            self.assertIsNot(layout.get_form(), form)
+        # invalidated on save
+        layout.layout = layout.layout + [
+            {"key": "extra", "field": "CharField"}
+        ]
+        layout.save()
+        form2 = layout.get_form()
+        self.assertIsNot(form2, form)
+        self.assertIn("tag/extra", form2.base_fields)
+        self.assertNotIn("tag/extra", form.base_fields)
+
     def test_referenced_by(self):
         home = self.user.usercomponent_set.filter(name="home").first()
         self.assertTrue(home)
@@ -108,12 +108,28 @@ class WebCfgTest(TransactionWebTest):
             "spider_webcfg:webconfig-view",
         ), token)
 
+        # not allowed methods don't create a WebConfig
+        self.app.put(webcfgurl, b"content", status=405)
+        self.app.delete(webcfgurl, status=405)
+        self.assertFalse(AssignedContent.objects.filter(
+            usercomponent=home, ctype__name="WebConfig"
+        ))
         response = self.app.get(webcfgurl)
         self.assertEqual(response.text, "")
         response = self.app.post(webcfgurl, b"content")
         self.assertEqual(response.text, "")
         response = self.app.get(webcfgurl)
         self.assertEqual(response.text, "content")
+        etag = response.headers["ETag"]
+        response = self.app.get(
+            webcfgurl, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 304)
+        self.app.post(webcfgurl, b"content2")
+        response = self.app.get(
+            webcfgurl, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.text, "content2")
         atoken = AuthToken.objects.get(token=token)
 
         # works because WebConfig is also a feature
@@ -1,29 +1,467 @@
 
 # import unittest
 import re
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from unittest.mock import patch
 
-from rdflib import XSD, Graph, Literal
+from rdflib import XSD, BNode, Graph, Literal, URIRef
+from webtest import Upload
 
 from django.conf import settings
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.staticfiles.testing import LiveServerTestCase
-from django.test import override_settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.test import (
+    SimpleTestCase, TestCase, TransactionTestCase, override_settings
+)
 from django.urls import reverse
-from django_webtest import WebTestMixin
+from django_webtest import TransactionWebTest, WebTestMixin
 from spkcspider.apps.spider.signals import update_dynamic
 from spkcspider.apps.spider_accounts.models import SpiderUser
 from spkcspider.apps.spider_tags.models import SpiderTag, TagLayout
-from spkcspider.apps.verifier.functions import get_anchor_domain
-from spkcspider.apps.verifier.models import DataVerificationTag
+from spkcspider.apps.verifier.functions import (
+    get_anchor_domain, get_hashable_nodes, get_hashob, get_main_nodes
+)
+from spkcspider.apps.verifier.management.commands.benchmark_graph_extraction import (  # noqa: E501
+    create_synthetic_graph, query_hashable_nodes_sparql
+)
+from spkcspider.apps.verifier.localtasks import (
+    LocalAsyncResult, local_task
+)
+from spkcspider.apps.verifier.localtasks import \
+    TimeoutError as LocalTimeoutError
+from spkcspider.apps.verifier.models import (
+    DataVerificationTag, ResourceDigest, VerifySourceObject
+)
+from spkcspider.apps.verifier.validate import (
+    DownloadBudget, ProgressReporter, create_session, get_unchanged_result,
+    retrieve_hashes, retrieve_pages, store_verification, update_source,
+    validate, validate_batch
+)
 from spkcspider.constants import spkcgraph
+from spkcspider.utils.urls import merge_get_url
 from tests.helpers import LiveDjangoTestApp, MockAsyncValidate
 from tests.referrerserver import create_referrer_server
 
 # Create your tests here.
 
 
+class PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        page = re.search("page=([0-9]+)", self.path).group(1)
+        etag = '"page%s"' % page
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        body = (
+            '<http://example.org/%s> <http://example.org/page> "%s" .\n' %
+            (page, page)
+        ).encode("utf8")
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class GraphExtractionTest(SimpleTestCase):
+    def test_hashable_nodes(self):
+        g = create_synthetic_graph(10)
+        # hashable reference node with two info values
+        ref = min(
+            node.value for node in get_hashable_nodes(g)
+            if isinstance(node.value, URIRef)
+        )
+        g.add((ref, spkcgraph["value"], Literal(
+            "\x1eid=second\x1e", datatype=XSD.string
+        )))
+        for info_filters in [[], ["\x1eunlisted\x1e", "!id=3\x1e"]]:
+            expected = {
+                tuple(node)
+                for node in query_hashable_nodes_sparql(g, info_filters)
+            }
+            nodes = get_hashable_nodes(g, info_filters)
+            self.assertTrue(expected)
+            self.assertEqual(len(nodes), len(expected))
+            self.assertEqual({tuple(node) for node in nodes}, expected)
+            for node in nodes:
+                if isinstance(node.value, URIRef):
+                    self.assertTrue(node.val_info)
+        # both info values are returned
+        self.assertEqual(
+            len({
+                node.val_info for node in get_hashable_nodes(g)
+                if node.value == ref
+            }), 2
+        )
+        with self.assertRaises(ValueError):
+            get_hashable_nodes(g, ["id=3"])
+
+    def test_main_nodes(self):
+        g = Graph()
+        base = URIRef("https://example.org/view/")
+        g.add((base, spkcgraph["scope"], Literal("list")))
+        g.add((base, spkcgraph["pages.num_pages"], Literal(
+            2, datatype=XSD.positiveInteger
+        )))
+        g.add((base, spkcgraph["action:view"], Literal(str(base))))
+        self.assertEqual(get_main_nodes(g), [])
+        g.add((base, spkcgraph["pages.current_page"], Literal(
+            1, datatype=XSD.positiveInteger
+        )))
+        nodes = get_main_nodes(g)
+        self.assertEqual(len(nodes), 1)
+        self.assertEqual(nodes[0].base, base)
+        self.assertEqual(nodes[0].pages.toPython(), 2)
+
+
+class ProgressReporterTest(SimpleTestCase):
+    class Task(object):
+        def __init__(self):
+            self.states = []
+
+        def update_state(self, state, meta):
+            self.states.append((state, meta))
+
+    def test_throttle(self):
+        task = self.Task()
+        budget = DownloadBudget(100)
+        progress = ProgressReporter(task, budget, every=10, interval=3600)
+        for count in range(1, 26):
+            progress.update(
+                "HASHING", done=count, total=25, hashable_nodes_checked=count
+            )
+        # first update (state change) and every 10 items
+        self.assertEqual(len(task.states), 3)
+        self.assertEqual(task.states[-1][1]["hashable_nodes_checked"], 21)
+        self.assertEqual(task.states[-1][1]["bytes_downloaded"], 100)
+        self.assertIn("eta", task.states[-1][1])
+        progress.update("VERIFY", force=True)
+        self.assertEqual(
+            task.states[-1], ("VERIFY", {"bytes_downloaded": 100})
+        )
+        # no task, no error
+        ProgressReporter(None).update("HASHING")
+
+
+class BatchTest(TestCase):
+    def test_view(self):
+        response = self.client.post(reverse("spider_verifier:create_batch"))
+        self.assertEqual(response.status_code, 400)
+        with patch(
+            "spkcspider.apps.verifier.validate.async_validate_batch",
+            new=MockAsyncValidate
+        ):
+            response = self.client.post(
+                reverse("spider_verifier:create_batch"),
+                {"url": ["https://example.org/foo/"] * 2}
+            )
+        self.assertEqual(response.status_code, 202)
+        self.assertIn(
+            response.json()["task_id"], MockAsyncValidate.tasks
+        )
+        self.assertEqual(
+            MockAsyncValidate.tasks[
+                response.json()["task_id"]
+            ].value_captured[0],
+            [
+                "https://example.org/foo/?raw=embed",
+                "https://example.org/foo/?raw=embed"
+            ]
+        )
+
+
+class ConcurrentBatchTest(TransactionTestCase):
+    @override_settings(VERIFIER_BATCH_WORKERS=4)
+    def test_duplicate_items(self):
+        lock = threading.Lock()
+        active = set()
+
+        def _validate(ob, hostpart, **kwargs):
+            url = ob.split("?", 1)[0]
+            with lock:
+                # same source is never validated concurrently
+                assert url not in active
+                active.add(url)
+            try:
+                time.sleep(0.05)
+                source = update_source(url, "")
+                with tempfile.NamedTemporaryFile() as f:
+                    f.write(b"data")
+                    f.seek(0)
+                    # all items result in the same graph
+                    return store_verification("samehash", f, source, "layout")
+            finally:
+                with lock:
+                    active.discard(url)
+
+        urls = [
+            "https://a.example.org/view/?page=1",
+            "https://a.example.org/view/?page=2",
+            "https://a.example.org/view/?page=1",
+            "https://b.example.org/view/?page=1",
+            "https://c.example.org/view/"
+        ]
+        with patch(
+            "spkcspider.apps.verifier.validate.validate", new=_validate
+        ):
+            results = validate_batch(urls, "http://localhost")
+        self.assertEqual(len(results), len(urls))
+        for result in results:
+            self.assertEqual(result["state"], "SUCCESS", result["result"])
+        self.assertEqual(len({result["result"] for result in results}), 1)
+        self.assertEqual(DataVerificationTag.objects.count(), 1)
+        self.assertEqual(VerifySourceObject.objects.count(), 3)
+
+
+class LocalTaskTest(TransactionTestCase):
+    def test_local_task(self):
+        @local_task(name="test task")
+        def add(self, a, b):
+            self.update_state(state="HASHING", meta={"a": a})
+            return a + b
+
+        @local_task(name="failing task")
+        def fail(self):
+            raise ValidationError("broken")
+
+        res = add.apply_async(args=(1, 2), track_started=True)
+        self.assertEqual(res.get(timeout=10), 3)
+        self.assertTrue(res.successful())
+        self.assertEqual(add.AsyncResult(res.task_id).state, "SUCCESS")
+
+        res = fail.apply_async()
+        self.assertEqual(res.get(timeout=10), "broken")
+        self.assertFalse(res.successful())
+        self.assertEqual(res.state, "FAILURE")
+        with self.assertRaises(LocalTimeoutError):
+            LocalAsyncResult("unknown").get(timeout=0)
+
+
+class RetrievePagesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pageserver = HTTPServer(("127.0.0.1", 0), PageHandler)
+        cls.pagethread = threading.Thread(
+            target=cls.pageserver.serve_forever, daemon=True
+        )
+        cls.pagethread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pageserver.shutdown()
+        cls.pageserver.server_close()
+        super().tearDownClass()
+
+    def test_budget(self):
+        budget = DownloadBudget(10)
+        with self.settings(VERIFIER_MAX_SIZE_ACCEPTED=30):
+            self.assertTrue(budget.reserve("15"))
+            self.assertFalse(budget.reserve(6))
+            self.assertTrue(budget.reserve(5))
+        self.assertEqual(budget.current_size, 30)
+
+    def test_retrieve_pages(self):
+        url = "http://127.0.0.1:%s/view/" % self.pageserver.server_port
+        with create_session() as session:
+            graphs = retrieve_pages(url, 6, DownloadBudget(), session)
+        self.assertEqual(len(graphs), 5)
+        for page, pg in enumerate(graphs, start=2):
+            self.assertEqual(
+                [str(o) for o in pg.objects()], [str(page)]
+            )
+        with self.settings(VERIFIER_MAX_SIZE_ACCEPTED=100):
+            with create_session() as session:
+                with self.assertRaises(ValidationError):
+                    retrieve_pages(url, 6, DownloadBudget(), session)
+
+    @override_settings(VERIFIER_BATCH_WORKERS=1)
+    def test_validate_batch(self):
+        url = "http://127.0.0.1:%s/view/?page=1" % (
+            self.pageserver.server_port
+        )
+        results = validate_batch(
+            [url, "http://127.0.0.1:1/view/?page=1", url],
+            "http://localhost"
+        )
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0], results[2])
+        # no valid spkcspider graph
+        self.assertEqual(results[0]["state"], "FAILURE")
+        self.assertIn("Invalid graph", results[0]["result"])
+        self.assertEqual(results[1]["state"], "FAILURE")
+
+    def test_retrieve_hashes(self):
+        urls = {
+            "http://127.0.0.1:%s/file/?page=%s" % (
+                self.pageserver.server_port, page
+            )
+            for page in range(10)
+        }
+        budget = DownloadBudget()
+        with create_session() as session:
+            hashes = retrieve_hashes(urls, budget, session)
+        self.assertEqual(set(hashes.keys()), urls)
+        body = '<http://example.org/3> <http://example.org/page> "3" .\n'
+        h = get_hashob()
+        h.update(XSD.base64Binary.encode("utf8"))
+        h.update(body.encode("utf8"))
+        self.assertEqual(
+            hashes["http://127.0.0.1:%s/file/?page=3" % (
+                self.pageserver.server_port
+            )],
+            h.finalize()
+        )
+        # budget is shared between all downloads
+        self.assertEqual(budget.current_size, 10 * len(body))
+        self.assertEqual(
+            ResourceDigest.objects.filter(url__in=urls).count(), 10
+        )
+        # memo skips requests
+        memo = {}
+        with create_session() as session:
+            retrieve_hashes(urls, DownloadBudget(), session, memo=memo)
+            with patch(
+                "spkcspider.apps.verifier.validate.retrieve_object"
+            ) as mock:
+                self.assertEqual(
+                    retrieve_hashes(
+                        urls, DownloadBudget(), session, memo=memo
+                    ),
+                    hashes
+                )
+                mock.assert_not_called()
+        # unchanged resources are not downloaded again
+        budget = DownloadBudget()
+        with create_session() as session:
+            self.assertEqual(
+                retrieve_hashes(urls, budget, session), hashes
+            )
+        self.assertEqual(budget.current_size, 0)
+
+    def test_unchanged_result(self):
+        resource = "http://127.0.0.1:%s/file/?page=3" % (
+            self.pageserver.server_port
+        )
+        body = '<http://example.org/3> <http://example.org/page> "3" .\n'
+        h = get_hashob()
+        h.update(XSD.base64Binary.encode("utf8"))
+        h.update(body.encode("utf8"))
+        view_url = "http://127.0.0.1:%s/view/" % self.pageserver.server_port
+
+        def create_result(digest, resource_hash):
+            g = Graph()
+            base = URIRef("https://example.org/spider/ucontent/1/view/")
+            g.add((base, spkcgraph["type"], Literal(
+                "File", datatype=XSD.string
+            )))
+            pinfo = BNode()
+            g.add((base, spkcgraph["properties"], pinfo))
+            g.add((pinfo, spkcgraph["name"], Literal(
+                "info", datatype=XSD.string
+            )))
+            g.add((pinfo, spkcgraph["value"], Literal(
+                "\x1etype=File\x1e", datatype=XSD.string
+            )))
+            pval = BNode()
+            g.add((base, spkcgraph["properties"], pval))
+            g.add((pval, spkcgraph["hashable"], Literal(True)))
+            g.add((pval, spkcgraph["name"], Literal(
+                "file", datatype=XSD.string
+            )))
+            g.add((pval, spkcgraph["value"], Literal(
+                resource, datatype=spkcgraph["hashableURI"]
+            )))
+            g.add((URIRef(resource), spkcgraph["hash"], Literal(
+                resource_hash
+            )))
+            source = VerifySourceObject.objects.create(
+                url="%s%s" % (view_url, digest), last_hash=digest
+            )
+            DataVerificationTag.objects.create(
+                hash=digest, source=source, dvfile=ContentFile(
+                    g.serialize(format="turtle"), name="%s.ttl" % digest
+                )
+            )
+            return source
+
+        cached = [['"page1"', ""]]
+        with create_session() as session:
+            source = create_result("unchanged", h.finalize().hex())
+            result = get_unchanged_result(
+                view_url, source, cached, DownloadBudget(), session
+            )
+            self.assertEqual(result.hash, "unchanged")
+            # resource is revalidated with a conditional request
+            budget = DownloadBudget()
+            self.assertTrue(get_unchanged_result(
+                view_url, source, cached, budget, session
+            ))
+            self.assertEqual(budget.current_size, 0)
+            # resource changed since the last validation
+            source = create_result("changed", "00")
+            self.assertIsNone(get_unchanged_result(
+                view_url, source, cached, DownloadBudget(), session
+            ))
+
+
+class CachedVerificationTest(TransactionWebTest):
+    fixtures = ['test_default.json']
+
+    def setUp(self):
+        super().setUp()
+        self.user = SpiderUser.objects.get(
+            username="testuser1"
+        )
+        update_dynamic.send(self)
+
+    # DEBUG: the inline requests use http
+    @override_settings(DEBUG=True, MAX_EMBED_SIZE=0)
+    def test_verify_twice(self):
+        public = self.user.usercomponent_set.get(name="public")
+        self.app.set_user(user="testuser1")
+        form = self.app.get(reverse(
+            "spider_base:ucontent-add",
+            kwargs={
+                "token": public.token,
+                "type": "File"
+            }
+        )).forms["main_form"]
+        form["file"] = Upload("fooo", b"[]", "application/json")
+        form.submit().follow()
+        self.app.set_user(user=None)
+        content = public.contents.first()
+        for url in [public.get_absolute_url(), content.get_absolute_url()]:
+            with self.subTest(url=url):
+                url = merge_get_url(
+                    "https://testserver%s" % url, raw="embed"
+                )
+                result = validate(url, "https://testserver")
+                # file is linked (hashableURI) and cached by its validators
+                self.assertTrue(ResourceDigest.objects.filter(
+                    url__contains=content.get_absolute_url("download")
+                ))
+                with patch(
+                    "spkcspider.apps.verifier.validate.get_unchanged_result",
+                    wraps=get_unchanged_result
+                ) as unchanged:
+                    self.assertEqual(
+                        validate(url, "https://testserver"), result
+                    )
+                    self.assertEqual(unchanged.call_count, 1)
+
+
 class VerifyTest(WebTestMixin, LiveServerTestCase):
     fixtures = ['test_default.json']
     app_class = LiveDjangoTestApp
@@ -70,7 +508,7 @@ class VerifyTest(WebTestMixin, LiveServerTestCase):
 
     # @unittest.expectedFailure
     @patch(
-        "spkcspider.apps.verifier.views.async_validate",
+        "spkcspider.apps.verifier.validate.async_validate",
         new=MockAsyncValidate
     )
     @override_settings(RATELIMIT_ENABLE=False)
@@ -209,7 +647,7 @@ class VerifyTest(WebTestMixin, LiveServerTestCase):
         )
 
     @patch(
-        "spkcspider.apps.verifier.views.async_validate",
+        "spkcspider.apps.verifier.validate.async_validate",
         new=MockAsyncValidate
     )
     @override_settings(RATELIMIT_ENABLE=False)